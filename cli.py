@@ -6,16 +6,56 @@ Compare any files - PDF, DOCX, XLSX, PPTX, images, and text files.
 """
 
 import argparse
+import functools
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from converters import get_converter
+from converters import get_converter, ConversionCache, MemoryCache, ConvertedDocument
+from converters.base import block_lines
+from converters.ocr import PreprocessOptions
+from converters.package import unchanged_parts
 from diff import DiffEngine
 from renderers import get_renderer, RENDERERS
 
 
+def _is_placeholder(doc) -> bool:
+    """True for images converted without OCR text, which only pixels can tell apart."""
+    content = [b for b in doc.blocks if b.metadata.get('type') != 'frame_header']
+    return (doc.source_type == 'image' and bool(content)
+            and all(b.metadata.get('type') == 'image_placeholder' for b in content))
+
+
+def _region(value: str):
+    """Parse ``X,Y,WIDTH,HEIGHT`` for ``--ocr-roi``."""
+    try:
+        region = tuple(int(p) for p in value.split(','))
+    except ValueError:
+        region = ()
+    if len(region) != 4 or min(region) < 0 or 0 in region[2:]:
+        raise argparse.ArgumentTypeError(f"invalid region: {value} (expected X,Y,WIDTH,HEIGHT)")
+    return region
+
+
+def _source_document(path: str) -> ConvertedDocument:
+    """Stand-in document for modes that stream the source file instead of converting it."""
+    return ConvertedDocument(
+        blocks=[],
+        full_text="",
+        page_count=1,
+        source_path=path,
+        source_type=os.path.splitext(path)[1].lstrip('.').lower()
+    )
+
+
+def _line_source(converter, path: str):
+    """Callable returning a fresh stream of the file's lines, read as it converts."""
+    if hasattr(converter, 'iter_lines'):
+        return functools.partial(converter.iter_lines, path)
+    return lambda: block_lines(converter.iter_blocks(path))
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog='uni-diff',
@@ -28,6 +68,13 @@ Examples:
   uni-diff a.txt b.txt -f png -o diff.png     # Compare text files, PNG output
   uni-diff doc.xlsx doc2.xlsx -f tui          # Compare Excel files in TUI
   uni-diff old.md new.md -f json              # Compare Markdown, JSON output
+  uni-diff old.xml new.xml --tree             # Structural XML diff with XPaths
+  uni-diff old.png new.png --pixel            # Changed regions between screenshots
+  uni-diff old.tiff new.tiff --pages          # Page-aligned diff of multi-page faxes
+  uni-diff a.xlsx b.xlsx --sheets Q3 --columns id,total  # Compare part of a workbook
+  uni-diff a.csv b.csv --rtol 1e-6            # Cell diff ignoring float noise
+  uni-diff a.csv b.csv --key id --memory 512  # Match rows by key, any order, any size
+  uni-diff allow.txt allow2.txt --unordered   # Added/removed lines, order ignored
 
 Supported input formats:
   PDF (.pdf), Word (.docx), Excel (.xlsx), PowerPoint (.pptx)
@@ -71,6 +118,107 @@ Supported output formats:
         action='store_true',
         help='Use block-level diff for better positioning (PDF, DOCX)'
     )
+    parser.add_argument(
+        '--tree',
+        action='store_true',
+        help='Structural diff for XML/HTML, reporting XPath locations'
+    )
+    parser.add_argument(
+        '--pages',
+        action='store_true',
+        help='Diff page by page (PDF pages, slides, TIFF/GIF frames)'
+    )
+    parser.add_argument(
+        '--pixel',
+        action='store_true',
+        help='Compare images pixel by pixel and report changed regions'
+    )
+    parser.add_argument(
+        '--no-align',
+        action='store_true',
+        help='Do not register shifted or rescaled images before the pixel comparison'
+    )
+    parser.add_argument(
+        '--hash-threshold',
+        type=int,
+        default=2,
+        help='Skip OCR for images within this perceptual-hash distance, -1 to always OCR (default: 2)'
+    )
+    parser.add_argument(
+        '--ocr-dpi',
+        type=int,
+        default=200,
+        help='Downscale images declaring a higher DPI to this before OCR, 0 to keep (default: 200)'
+    )
+    parser.add_argument(
+        '--ocr-scale',
+        type=float,
+        default=1.0,
+        help='Further scale images before OCR, e.g. 0.5 for HiDPI screenshots (default: 1)'
+    )
+    parser.add_argument(
+        '--ocr-binarize',
+        action='store_true',
+        help='Threshold images to black and white before OCR'
+    )
+    parser.add_argument(
+        '--ocr-roi',
+        type=_region,
+        help='Only OCR the region X,Y,WIDTH,HEIGHT, in original pixels'
+    )
+    parser.add_argument(
+        '--sheets',
+        help='Comma-separated sheet names to compare (XLSX); other sheets are not read'
+    )
+    parser.add_argument(
+        '--columns',
+        help='Comma-separated columns to compare by header name, number or letter (XLSX, CSV)'
+    )
+    parser.add_argument(
+        '--unordered',
+        action='store_true',
+        help='Ignore line order: report only added and removed lines, with counts'
+    )
+    parser.add_argument(
+        '--tables',
+        action='store_true',
+        help='Compare XLSX/CSV cell by cell, numbers within --rtol/--atol count as equal'
+    )
+    parser.add_argument(
+        '--rtol',
+        type=float,
+        help='Relative tolerance for numeric cells, implies --tables (default: 1e-9)'
+    )
+    parser.add_argument(
+        '--atol',
+        type=float,
+        help='Absolute tolerance for numeric cells, implies --tables (default: 0)'
+    )
+    parser.add_argument(
+        '--key',
+        help='Comma-separated key columns (XLSX, CSV); rows are matched by key regardless of order'
+    )
+    parser.add_argument(
+        '--memory',
+        type=int,
+        default=256,
+        help='Memory budget in MB for --key and --unordered, spilling to disk beyond it (default: 256)'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Worker processes for conversion, 0 for all cores (default: 1)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the conversion cache'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        help='Conversion cache directory (default: ~/.cache/uni-diff)'
+    )
     parser.add_argument(
         '-q', '--quiet',
         action='store_true',
@@ -98,20 +246,98 @@ Supported output formats:
         sys.exit(1)
 
     try:
-        old_converter = get_converter(args.old_file)
-        new_converter = get_converter(args.new_file)
+        old_converter = get_converter(args.old_file, tree=args.tree)
+        new_converter = get_converter(args.new_file, tree=args.tree)
+        cache = None if args.no_cache else ConversionCache(args.cache_dir)
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        preprocess = PreprocessOptions(dpi=args.ocr_dpi, scale=args.ocr_scale,
+                                       binarize=args.ocr_binarize, roi=args.ocr_roi)
+
+        # Office packages: parts whose CRC and size match in both files are
+        # converted once and shared, even without the persistent cache.
+        part_cache = cache
+        if cache is None and unchanged_parts(args.old_file, args.new_file):
+            part_cache = MemoryCache()
+
+        for converter in (old_converter, new_converter):
+            if hasattr(converter, 'jobs'):
+                converter.jobs = jobs
+            if hasattr(converter, 'cache'):
+                converter.cache = part_cache
+            if args.sheets and hasattr(converter, 'sheets'):
+                converter.sheets = [name.strip() for name in args.sheets.split(',')]
+            if args.columns and hasattr(converter, 'columns'):
+                converter.columns = [name.strip() for name in args.columns.split(',')]
+            if hasattr(converter, 'preprocess'):
+                converter.preprocess = preprocess
+
+        if args.pixel:
+            for converter in (old_converter, new_converter):
+                if hasattr(converter, 'use_ocr'):
+                    converter.use_ocr = False
+        elif (old_converter.__class__ is new_converter.__class__
+                and getattr(old_converter, 'use_ocr', False)
+                and args.hash_threshold >= 0):
+            distance = old_converter.near_identical(args.old_file, args.new_file,
+                                                    args.hash_threshold)
+            if distance is not None:
+                old_converter.use_ocr = new_converter.use_ocr = False
+                if not args.quiet:
+                    print(f"Images match by perceptual hash (distance {distance}), skipping OCR",
+                          file=sys.stderr)
+
+        tables = ((args.key or args.tables or args.rtol is not None or args.atol is not None)
+                  and hasattr(old_converter, 'iter_tables') and hasattr(new_converter, 'iter_tables'))
+
+        streamed = args.unordered and not tables and old_converter.streaming and new_converter.streaming
+
+        def convert(converter, path):
+            if tables or streamed:
+                return _source_document(path)
+            if cache is None:
+                return converter.convert(path)
+            return cache.convert(converter, path)
 
         if not args.quiet:
             print(f"Converting {os.path.basename(args.old_file)}...", file=sys.stderr)
-        old_doc = old_converter.convert(args.old_file)
+        old_doc = convert(old_converter, args.old_file)
 
         if not args.quiet:
             print(f"Converting {os.path.basename(args.new_file)}...", file=sys.stderr)
-        new_doc = new_converter.convert(args.new_file)
+        new_doc = convert(new_converter, args.new_file)
 
         engine = DiffEngine(context_lines=args.context)
 
-        if args.block_diff:
+        if args.tree:
+            diff_result = engine.diff_tree(old_doc, new_doc)
+        elif tables and args.key:
+            diff_result = engine.diff_keyed(old_doc, new_doc,
+                                            old_converter.iter_tables(args.old_file),
+                                            new_converter.iter_tables(args.new_file),
+                                            [name.strip() for name in args.key.split(',')],
+                                            memory_limit=args.memory * 1024 * 1024)
+        elif tables:
+            tolerance = {}
+            if args.rtol is not None:
+                tolerance['rtol'] = args.rtol
+            if args.atol is not None:
+                tolerance['atol'] = args.atol
+            diff_result = engine.diff_tables(old_doc, new_doc,
+                                             old_converter.iter_tables(args.old_file),
+                                             new_converter.iter_tables(args.new_file),
+                                             **tolerance)
+        elif args.unordered:
+            lines = {}
+            if streamed:
+                lines = {'old_lines': _line_source(old_converter, args.old_file),
+                         'new_lines': _line_source(new_converter, args.new_file)}
+            diff_result = engine.diff_unordered(old_doc, new_doc, memory_limit=args.memory * 1024 * 1024,
+                                                **lines)
+        elif args.pixel or (_is_placeholder(old_doc) and _is_placeholder(new_doc)):
+            diff_result = engine.diff_pixels(old_doc, new_doc, align=not args.no_align, jobs=jobs)
+        elif args.pages:
+            diff_result = engine.diff_pages(old_doc, new_doc)
+        elif args.block_diff:
             diff_result = engine.diff_blocks(old_doc, new_doc)
         else:
             diff_result = engine.diff(old_doc, new_doc)
@@ -1,10 +1,13 @@
-from .base import BaseConverter, ConvertedDocument, TextBlock
+from .base import BaseConverter, BlockStore, ConvertedDocument, PageBreak, TextBlock
 from .pdf import PDFConverter
 from .docx import DOCXConverter
 from .xlsx import XLSXConverter
 from .pptx import PPTXConverter
 from .image import ImageConverter
 from .text import TextConverter
+from .xml_converter import XMLConverter
+from .csv_converter import CSVConverter
+from .cache import ConversionCache, MemoryCache
 
 CONVERTERS = {
     '.pdf': PDFConverter,
@@ -17,6 +20,7 @@ CONVERTERS = {
     '.gif': ImageConverter,
     '.bmp': ImageConverter,
     '.tiff': ImageConverter,
+    '.tif': ImageConverter,
     '.txt': TextConverter,
     '.md': TextConverter,
     '.markdown': TextConverter,
@@ -33,21 +37,36 @@ CONVERTERS = {
     '.conf': TextConverter,
     '.cfg': TextConverter,
     '.log': TextConverter,
-    '.csv': TextConverter,
+    '.csv': CSVConverter,
+    '.tsv': CSVConverter,
 }
 
-def get_converter(file_path: str) -> BaseConverter:
-    """Get appropriate converter based on file extension."""
+TREE_CONVERTERS = {
+    '.xml': XMLConverter,
+    '.html': XMLConverter,
+    '.htm': XMLConverter,
+    '.xhtml': XMLConverter,
+    '.svg': XMLConverter,
+}
+
+def get_converter(file_path: str, tree: bool = False) -> BaseConverter:
+    """Get appropriate converter based on file extension.
+
+    With ``tree=True``, markup files get a structural converter for use
+    with ``DiffEngine.diff_tree`` instead of the plain text one.
+    """
     import os
     ext = os.path.splitext(file_path)[1].lower()
-    converter_class = CONVERTERS.get(ext)
+    converter_class = TREE_CONVERTERS.get(ext) if tree else None
+    if converter_class is None:
+        converter_class = CONVERTERS.get(ext)
     if converter_class is None:
         converter_class = TextConverter
     return converter_class()
 
 __all__ = [
-    'BaseConverter', 'ConvertedDocument', 'TextBlock',
+    'BaseConverter', 'BlockStore', 'ConvertedDocument', 'PageBreak', 'TextBlock',
     'PDFConverter', 'DOCXConverter', 'XLSXConverter',
     'PPTXConverter', 'ImageConverter', 'TextConverter',
-    'CONVERTERS', 'get_converter'
+    'XMLConverter', 'CSVConverter', 'ConversionCache', 'MemoryCache', 'CONVERTERS', 'TREE_CONVERTERS', 'get_converter'
 ]
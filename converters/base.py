@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from itertools import accumulate
+from operator import add
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Union
 
 
 @dataclass
@@ -22,11 +27,213 @@ class TextBlock:
             'metadata': self.metadata
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TextBlock':
+        x, y, width, height = data.get('bbox', [0.0, 0.0, 0.0, 0.0])
+        return cls(
+            text=data['text'],
+            page=data.get('page', 0),
+            x=x,
+            y=y,
+            width=width,
+            height=height,
+            metadata=data.get('metadata', {})
+        )
+
+
+@dataclass
+class PageBreak:
+    """Marks the start of page ``page`` in a block stream from ``iter_blocks``."""
+    page: int
+
+
+def block_lines(items: Iterable[Union[TextBlock, PageBreak]]) -> Iterator[str]:
+    """Yield the lines of a block stream's text, as ``full_text`` would hold them."""
+    for item in items:
+        if not isinstance(item, PageBreak):
+            yield from item.text.split('\n')
+
+
+class BlockStore(Sequence):
+    """Blocks stored column by column, usable wherever a list of TextBlock is.
+
+    Pages, positions and line numbers live in ``array`` columns, block
+    texts are spans of one string, and equal metadata dicts are stored
+    once, so a block costs a few dozen bytes rather than an object, a
+    string and a dict. Indexing and iteration build TextBlock objects on
+    demand; changing those copies does not change the store.
+    """
+
+    def __init__(self, text: str = ""):
+        self._text = text
+        # Texts added since the backing string was last extended.
+        self._pending: List[str] = []
+        self._size = len(text)
+        self.starts = array('q')
+        self.ends = array('q')
+        self.pages = array('i')
+        self.xs = array('d')
+        self.ys = array('d')
+        self.widths = array('d')
+        self.heights = array('d')
+        # 0 where a block has no line number.
+        self.line_numbers = array('q')
+        self.metadata_ids = array('i')
+        self._metadata: List[Dict[str, Any]] = []
+        self._metadata_index: Dict[Any, int] = {}
+        self.lines_sorted = True
+        # (line height, lines, block indices) sorted by line, for stores
+        # not in line order.
+        self._line_index = None
+
+    @classmethod
+    def from_lines(cls, text: str, line_height: float = 12.0, char_width: float = 7.0) -> 'BlockStore':
+        """One block per ``'\\n'``-separated line of ``text``, stacked top down.
+
+        Blocks are spans of ``text`` itself and carry their line number.
+        """
+        store = cls(text)
+        lengths = array('q', map(len, text.split('\n')))
+        count = len(lengths)
+        store.starts = array('q', accumulate((length + 1 for length in lengths), initial=0))
+        store.starts.pop()
+        store.ends = array('q', map(add, store.starts, lengths))
+        store.pages = array('i', bytes(store.pages.itemsize * count))
+        store.xs = array('d', bytes(store.xs.itemsize * count))
+        store.ys = array('d', (i * line_height for i in range(count)))
+        store.widths = array('d', (length * char_width for length in lengths))
+        store.heights = array('d', [line_height]) * count
+        store.line_numbers = array('q', range(1, count + 1))
+        store.metadata_ids = array('i', [store._intern({})]) * count
+        return store
+
+    @property
+    def text(self) -> str:
+        """The string all block texts are spans of."""
+        if self._pending:
+            self._text += ''.join(self._pending)
+            self._pending = []
+        return self._text
+
+    def _intern(self, metadata: Dict[str, Any]) -> int:
+        try:
+            key = tuple(sorted(metadata.items()))
+            index = self._metadata_index.get(key)
+        except TypeError:
+            # Unhashable values: stored as is, not shared.
+            key = index = None
+        if index is None:
+            index = len(self._metadata)
+            self._metadata.append(dict(metadata))
+            if key is not None:
+                self._metadata_index[key] = index
+        return index
+
+    def add_text(self, text: str):
+        """Extend the backing string without adding a block."""
+        self._pending.append(text)
+        self._size += len(text)
+
+    def add_span(self, start: int, end: int, page: int = 0, x: float = 0.0, y: float = 0.0,
+                 width: float = 0.0, height: float = 0.0, metadata: Optional[Dict[str, Any]] = None):
+        """Add a block whose text is ``text[start:end]`` of the backing string."""
+        metadata = metadata or {}
+        line_number = metadata.get('line_number', 0)
+        if type(line_number) is int and line_number > 0:
+            metadata = {k: v for k, v in metadata.items() if k != 'line_number'}
+        else:
+            line_number = 0
+        if not line_number or (self.line_numbers and line_number < self.line_numbers[-1]):
+            self.lines_sorted = False
+        self._line_index = None
+        self.starts.append(start)
+        self.ends.append(end)
+        self.pages.append(page)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.widths.append(width)
+        self.heights.append(height)
+        self.line_numbers.append(line_number)
+        self.metadata_ids.append(self._intern(metadata))
+
+    def add(self, text: str, page: int = 0, x: float = 0.0, y: float = 0.0,
+            width: float = 0.0, height: float = 0.0, metadata: Optional[Dict[str, Any]] = None):
+        """Add a block, appending its text to the backing string."""
+        start = self._size
+        self._pending.append(text)
+        self._size += len(text)
+        self.add_span(start, self._size, page, x, y, width, height, metadata)
+
+    def append(self, block: TextBlock):
+        self.add(block.text, block.page, block.x, block.y, block.width, block.height, block.metadata)
+
+    def extend(self, blocks):
+        for block in blocks:
+            self.append(block)
+
+    def line_range(self, start_line: int, end_line: int, line_height: float = 12.0) -> List[TextBlock]:
+        """Blocks with ``start_line < line_number <= end_line``, in store order.
+
+        A block without a line number is placed on line
+        ``int(y / line_height) + 1``. Unless ``lines_sorted``, the lines
+        are sorted once into an index that later calls bisect as well.
+        """
+        if self.lines_sorted:
+            lo = bisect_right(self.line_numbers, start_line)
+            hi = bisect_right(self.line_numbers, end_line, lo)
+            return [self._block(i) for i in range(lo, hi)]
+
+        if self._line_index is None or self._line_index[0] != line_height:
+            lines = [number or int(y / line_height) + 1 for number, y in zip(self.line_numbers, self.ys)]
+            order = sorted(range(len(lines)), key=lines.__getitem__)
+            self._line_index = (line_height, [lines[i] for i in order], order)
+        _, lines, order = self._line_index
+        lo = bisect_right(lines, start_line)
+        hi = bisect_right(lines, end_line, lo)
+        return [self._block(i) for i in sorted(order[lo:hi])]
+
+    def _block(self, index: int) -> TextBlock:
+        metadata = dict(self._metadata[self.metadata_ids[index]])
+        if self.line_numbers[index]:
+            metadata['line_number'] = self.line_numbers[index]
+        return TextBlock(
+            text=self.text[self.starts[index]:self.ends[index]],
+            page=self.pages[index],
+            x=self.xs[index],
+            y=self.ys[index],
+            width=self.widths[index],
+            height=self.heights[index],
+            metadata=metadata
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._block(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('block index out of range')
+        return self._block(index)
+
+    def __iter__(self) -> Iterator[TextBlock]:
+        for index in range(len(self)):
+            yield self._block(index)
+
+    def __repr__(self) -> str:
+        return f"BlockStore({len(self)} blocks)"
+
 
 @dataclass
 class ConvertedDocument:
-    """Unified intermediate format for all document types."""
-    blocks: List[TextBlock] = field(default_factory=list)
+    """Unified intermediate format for all document types.
+
+    ``blocks`` is a list of TextBlock or, for large documents, a
+    ``BlockStore`` with the same read-only interface.
+    """
+    blocks: Union[List[TextBlock], BlockStore] = field(default_factory=list)
     full_text: str = ""
     page_count: int = 1
     metadata: Dict[str, Any] = field(default_factory=dict)
@@ -43,19 +250,82 @@ class ConvertedDocument:
             'metadata': self.metadata
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ConvertedDocument':
+        """Rebuild a ConvertedDocument from the output of ``to_dict``."""
+        blocks = BlockStore()
+        for b in data.get('blocks', []):
+            x, y, width, height = b.get('bbox', [0.0, 0.0, 0.0, 0.0])
+            blocks.add(b['text'], b.get('page', 0), x, y, width, height, b.get('metadata', {}))
+        return cls(
+            blocks=blocks,
+            full_text=data.get('full_text', ''),
+            page_count=data.get('page_count', 1),
+            metadata=data.get('metadata', {}),
+            source_path=data.get('source_path', ''),
+            source_type=data.get('source_type', '')
+        )
+
+    @classmethod
+    def from_blocks(cls, items: Iterable[Union[TextBlock, PageBreak]], final_newline: bool = True,
+                    page_gap: bool = False, **fields) -> 'ConvertedDocument':
+        """Collect a stream from ``BaseConverter.iter_blocks`` into a document.
+
+        Each block's text is a line of ``full_text``, which is the blocks'
+        backing string itself, so the text is held once. ``page_gap`` adds
+        a blank line after every page; without ``final_newline`` the last
+        line has no line end. ``fields`` are passed on to the constructor.
+        """
+        blocks = BlockStore()
+        pages = 0
+        for item in items:
+            if isinstance(item, PageBreak):
+                if page_gap and pages:
+                    blocks.add_text('\n')
+                pages += 1
+                continue
+            if len(blocks):
+                blocks.add_text('\n')
+            blocks.append(item)
+        if page_gap and pages:
+            blocks.add_text('\n')
+        if final_newline and len(blocks):
+            blocks.add_text('\n')
+        return cls(blocks=blocks, full_text=blocks.text, page_count=max(1, pages), **fields)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], source_path: str = "", source_type: str = "text",
+                   line_height: float = 12.0) -> 'ConvertedDocument':
+        """Create a ConvertedDocument from lines as they stream in, such as a tool's output.
+
+        ``full_text`` is the lines joined with ``'\\n'``; blank lines take
+        up space but get no block.
+        """
+        blocks = BlockStore()
+        for i, line in enumerate(lines):
+            if i:
+                blocks.add_text('\n')
+            if line.strip():
+                blocks.add(line, page=0, y=i * line_height, width=len(line) * 7.0, height=line_height)
+            else:
+                blocks.add_text(line)
+        return cls(
+            blocks=blocks,
+            full_text=blocks.text,
+            page_count=1,
+            source_path=source_path,
+            source_type=source_type
+        )
+
     @classmethod
     def from_text(cls, text: str, source_path: str = "", source_type: str = "text"):
         """Create a ConvertedDocument from plain text."""
-        lines = text.split('\n')
-        blocks = []
-        for i, line in enumerate(lines):
+        blocks = BlockStore(text)
+        start = 0
+        for i, line in enumerate(text.split('\n')):
             if line.strip():
-                blocks.append(TextBlock(
-                    text=line,
-                    page=0,
-                    y=i * 12.0,
-                    height=12.0
-                ))
+                blocks.add_span(start, start + len(line), page=0, y=i * 12.0, height=12.0)
+            start += len(line) + 1
         return cls(
             blocks=blocks,
             full_text=text,
@@ -68,6 +338,21 @@ class ConvertedDocument:
 class BaseConverter(ABC):
     """Abstract base class for all document converters."""
 
+    # Bump when a change alters conversion output, invalidating cached results.
+    version = 1
+
+    # Whether results are worth storing in the conversion cache.
+    cacheable = True
+
+    # Whether ``iter_blocks`` produces blocks during conversion rather than
+    # after it, so consumers can work on a file without holding all of it.
+    streaming = False
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        """Settings that affect conversion output, used in cache keys."""
+        return {}
+
     @property
     @abstractmethod
     def supported_extensions(self) -> List[str]:
@@ -79,6 +364,23 @@ class BaseConverter(ABC):
         """Convert a file to the unified intermediate format."""
         pass
 
+    def iter_blocks(self, file_path: str) -> Iterator[Union[TextBlock, PageBreak]]:
+        """Yield a file's blocks as they are produced, each page opened by a PageBreak.
+
+        The default converts the whole file first; converters that set
+        ``streaming`` yield blocks while the file is still being read.
+        """
+        doc = self.convert(file_path)
+        page = -1
+        for block in doc.blocks:
+            while page < block.page:
+                page += 1
+                yield PageBreak(page)
+            yield block
+        while page < doc.page_count - 1:
+            page += 1
+            yield PageBreak(page)
+
     def can_convert(self, file_path: str) -> bool:
         """Check if this converter can handle the given file."""
         import os
@@ -0,0 +1,194 @@
+import os
+import json
+import hashlib
+import tempfile
+from typing import Any, Dict, Optional
+
+from .base import BaseConverter, ConvertedDocument
+
+
+def default_cache_dir() -> str:
+    """Return the per-user cache directory for conversion results."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'uni-diff')
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """Persistent, size-bounded cache of conversion results.
+
+    Entries are JSON files named by a key derived from the file content
+    hash, the converter class, its version and its options. Reads refresh
+    an entry's mtime, and writes evict the least recently used entries
+    once the directory grows beyond ``max_size`` bytes.
+
+    The directory is walked once to learn its size, which writes then keep
+    up to date, so it is only walked again when eviction is due. Eviction
+    goes down to ``LOW_WATER`` of the limit, leaving room for later writes.
+    """
+
+    DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+    # Fraction of max_size the cache is trimmed to once it is over the limit.
+    LOW_WATER = 0.9
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_size = max_size
+        # Bytes in the directory, or None until it has been walked.
+        self._size: Optional[int] = None
+
+    def key_for(self, converter: BaseConverter, file_path: str) -> str:
+        """Build the cache key for converting ``file_path`` with ``converter``."""
+        parts = [
+            file_digest(file_path),
+            f"{type(converter).__module__}.{type(converter).__name__}",
+            str(converter.version),
+            json.dumps(converter.options, sort_keys=True, default=str),
+        ]
+        return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def convert(self, converter: BaseConverter, file_path: str) -> ConvertedDocument:
+        """Convert ``file_path``, reusing a cached result when one exists."""
+        if not converter.cacheable:
+            return converter.convert(file_path)
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        key = self.key_for(converter, file_path)
+        data = self.get(key)
+        if data is not None:
+            doc = ConvertedDocument.from_dict(data)
+            doc.source_path = file_path
+            return doc
+
+        doc = converter.convert(file_path)
+        self.put(key, doc.to_dict())
+        return doc
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key``, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value under ``key``."""
+        self._grow(self._write(key, value))
+
+    def put_many(self, items: Dict[str, Any]) -> None:
+        """Store several values, checking the size limit once at the end."""
+        self._grow(sum(self._write(key, value) for key, value in items.items()))
+
+    def _grow(self, written: int) -> None:
+        """Account for ``written`` bytes and evict if over the limit."""
+        if self._size is None:
+            self.evict()
+            return
+        self._size += written
+        if self._size > self.max_size:
+            self.evict()
+
+    def _write(self, key: str, value: Any) -> int:
+        """Write one entry and return by how many bytes the cache grew."""
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        except OSError:
+            return 0
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False, separators=(',', ':'))
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            return os.path.getsize(path) - replaced
+        except (OSError, TypeError, ValueError):
+            self._remove(tmp_path)
+            return 0
+
+    def evict(self) -> None:
+        """Delete least recently used entries once over ``max_size``.
+
+        Walks the directory, which also resynchronizes the tracked size
+        with entries written or removed by other processes.
+        """
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        if total > self.max_size:
+            target = self.max_size * self.LOW_WATER
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                self._remove(path)
+                total -= size
+        self._size = total
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                self._remove(os.path.join(root, name))
+        self._size = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class MemoryCache:
+    """In-process stand-in for ``ConversionCache`` with the same get/put interface.
+
+    Lets the two converters of one comparison share per-part results when
+    the persistent cache is disabled.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, Any] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.entries.get(key)
+
+    def put(self, key: str, value: Any) -> None:
+        self.entries[key] = value
+
+    def put_many(self, items: Dict[str, Any]) -> None:
+        self.entries.update(items)
@@ -1,10 +1,61 @@
 import os
-from typing import List
-from .base import BaseConverter, ConvertedDocument, TextBlock
+import zipfile
+import posixpath
+from typing import Iterator, List, Dict, Optional, Tuple, Union
+from xml.etree.ElementTree import iterparse, ParseError
+from .base import BaseConverter, ConvertedDocument, PageBreak, TextBlock
+from .package import part_digests, part_key, relationships, rels_part, media_text
+from .process import output_lines
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+WP_NS = '{http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing}'
+A_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+R_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+MC_NS = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+OFFICE_DOCUMENT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+EMU_PER_POINT = 12700
+
+# Characters that run-level elements contribute to paragraph text.
+RUN_CHARACTERS = {
+    W_NS + 'tab': '\t',
+    W_NS + 'br': '\n',
+    W_NS + 'cr': '\n',
+    W_NS + 'noBreakHyphen': '-',
+}
+
+# Built-in styles stored under lower-case names, shown as Word displays them.
+STYLE_ALIASES = dict(
+    [('caption', 'Caption'), ('footer', 'Footer'), ('header', 'Header')]
+    + [(f'heading {n}', f'Heading {n}') for n in range(1, 10)]
+)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
 
 
 class DOCXConverter(BaseConverter):
-    """Converter for Microsoft Word DOCX files."""
+    """Converter for Microsoft Word DOCX files.
+
+    The main document part is streamed from the package with ``iterparse``,
+    so paragraphs and table rows come out in body order and parsed
+    elements are dropped as soon as they are read. Pages are estimated from
+    explicit page breaks, the page breaks Word recorded when the file was
+    last rendered, and next-page section breaks. Pictures become ``image``
+    blocks after their paragraph, identified by the CRC and size of their
+    media part without reading it.
+
+    With a ``cache``, the result is also stored under a key built from the
+    CRCs of the document, styles and media parts, so a package whose other
+    parts changed (properties, thumbnails) is not parsed again.
+    """
+
+    version = 4
+    streaming = True
+
+    def __init__(self, cache=None):
+        self.cache = cache
 
     @property
     def supported_extensions(self) -> List[str]:
@@ -14,18 +65,320 @@ class DOCXConverter(BaseConverter):
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        blocks = []
-        full_text = ""
+        if zipfile.is_zipfile(file_path):
+            try:
+                return self._convert_cached(file_path)
+            except (KeyError, ParseError):
+                pass
+
+        try:
+            return self._convert_python_docx(file_path)
+        except ImportError:
+            return self._convert_pandoc(file_path)
+
+    def _convert_cached(self, file_path: str) -> ConvertedDocument:
+        if self.cache is None:
+            return self._convert_xml(file_path)
+        with zipfile.ZipFile(file_path) as zf:
+            part = self._document_part(zf)
+        digests = part_digests(file_path)
+        styles = posixpath.join(posixpath.dirname(part), 'styles.xml')
+        media = sorted(name for name in digests if name.startswith(posixpath.join(posixpath.dirname(part), 'media/')))
+        key = part_key('docx-body', digests, [part, rels_part(part), styles] + media, self.version)
 
+        data = self.cache.get(key)
+        if data is not None:
+            doc = ConvertedDocument.from_dict(data)
+            doc.source_path = file_path
+            return doc
+        doc = self._convert_xml(file_path)
+        self.cache.put(key, doc.to_dict())
+        return doc
+
+    @staticmethod
+    def _document_part(zf: zipfile.ZipFile) -> str:
+        """Path of the main document part, as named by the package relationships."""
         try:
-            from docx import Document
-            doc = Document(file_path)
-
-            y_offset = 0
-            for para in doc.paragraphs:
-                text = para.text
-                if text.strip():
-                    full_text += text + "\n"
+            with zf.open('_rels/.rels') as f:
+                for _, elem in iterparse(f):
+                    if _local_name(elem.tag) == 'Relationship' and elem.get('Type') == OFFICE_DOCUMENT:
+                        return posixpath.normpath(elem.get('Target', '').lstrip('/'))
+        except KeyError:
+            pass
+        return 'word/document.xml'
+
+    @staticmethod
+    def _style_names(zf: zipfile.ZipFile, part: str) -> Dict[str, str]:
+        """Paragraph style ids mapped to display names; ``None`` holds the default."""
+        names: Dict[Optional[str], str] = {None: 'Normal'}
+        styles = posixpath.join(posixpath.dirname(part), 'styles.xml')
+        try:
+            f = zf.open(styles)
+        except KeyError:
+            return names
+        with f:
+            for _, elem in iterparse(f):
+                if elem.tag != W_NS + 'style' or elem.get(W_NS + 'type') != 'paragraph':
+                    continue
+                name = elem.find(W_NS + 'name')
+                style_id = elem.get(W_NS + 'styleId')
+                display = name.get(W_NS + 'val') if name is not None else style_id
+                display = STYLE_ALIASES.get(display, display)
+                names[style_id] = display
+                if elem.get(W_NS + 'default') in ('1', 'true'):
+                    names[None] = display
+                elem.clear()
+        return names
+
+    def iter_blocks(self, file_path: str) -> Iterator[Union[TextBlock, PageBreak]]:
+        """Yield blocks in body order while the document part is parsed.
+
+        With a ``cache`` the document is converted or loaded whole, so the
+        result can be stored for reuse.
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        if self.cache is None and zipfile.is_zipfile(file_path):
+            started = False
+            try:
+                for item in self._xml_blocks(file_path, {}):
+                    started = True
+                    yield item
+                return
+            except (KeyError, ParseError) as e:
+                if started:
+                    raise RuntimeError(f"Could not parse {file_path}: {e}")
+        yield from super().iter_blocks(file_path)
+
+    def _convert_xml(self, file_path: str) -> ConvertedDocument:
+        info: Dict[str, int] = {}
+        return ConvertedDocument.from_blocks(
+            self._xml_blocks(file_path, info),
+            metadata=info,
+            source_path=file_path,
+            source_type='docx'
+        )
+
+    def _xml_blocks(self, file_path: str, info: Dict[str, int]) -> Iterator[Union[TextBlock, PageBreak]]:
+        """Stream the main document part, then set ``info['sections']``."""
+        # Blocks and page breaks produced by the element just parsed.
+        ready: List[Union[TextBlock, PageBreak]] = []
+        page = 0
+        section = 0
+        y_offset = 0
+        # Whether anything was emitted on the current page, so breaks that
+        # follow each other do not count as several pages.
+        page_used = False
+
+        # One entry per open paragraph (text boxes nest them), each a list
+        # of text pieces plus its style id.
+        paragraphs: List[List[str]] = []
+        styles: List[Optional[str]] = []
+        # One entry per open table cell: its paragraph texts.
+        cells: List[List[str]] = []
+        # One entry per open table row: its cell texts.
+        rows: List[List[str]] = []
+        # Pictures waiting for their top-level paragraph or table row to end,
+        # as (media part, width, height, name).
+        drawings: List[Tuple[str, float, float, str]] = []
+        paragraph_number = 0
+        # Kind of a section break that ends with the current paragraph.
+        pending_section: Optional[str] = None
+        # A page break after text starts the page after that paragraph or row.
+        pending_page = False
+        body = None
+        depth = 0
+        body_depth = -1
+        # Open mc:Fallback elements; their content repeats the mc:Choice
+        # before them (such as a VML copy of a text box) and is skipped.
+        fallback = 0
+
+        def new_page():
+            nonlocal page, y_offset, page_used
+            if page_used:
+                page += 1
+                y_offset = 0
+                page_used = False
+                ready.append(PageBreak(page))
+
+        def page_break():
+            nonlocal pending_page
+            if (paragraphs and any(p.strip() for p in paragraphs[-1])) or (cells and any(cells[-1])):
+                pending_page = True
+            else:
+                new_page()
+
+        def emit(text: str, metadata: Dict, width: Optional[float] = None, height: float = 14):
+            nonlocal y_offset, page_used
+            ready.append(TextBlock(
+                text=text,
+                page=page,
+                x=0,
+                y=y_offset,
+                width=len(text) * 7 if width is None else width,
+                height=height,
+                metadata=dict(metadata, section=section)
+            ))
+            y_offset += height
+            page_used = True
+
+        def emit_drawings(location: Dict):
+            for target, width, height, name in drawings:
+                emit(media_text(target, digests[target]),
+                     dict(location, type='image', name=name, part=target, media_hash=digests[target]),
+                     width=width, height=height or 14)
+            drawings.clear()
+
+        digests = part_digests(file_path)
+        with zipfile.ZipFile(file_path) as zf:
+            part = self._document_part(zf)
+            style_names = self._style_names(zf, part)
+            media = {rel_id: target for rel_id, (kind, target) in relationships(zf, part).items()
+                     if kind == 'image' and target in digests}
+
+            with zf.open(part) as f:
+                yield PageBreak(0)
+                for event, elem in iterparse(f, events=('start', 'end')):
+                    tag = elem.tag
+                    if event == 'start':
+                        depth += 1
+                        if tag == MC_NS + 'Fallback':
+                            fallback += 1
+                        elif fallback:
+                            pass
+                        elif tag == W_NS + 'body':
+                            body = elem
+                            body_depth = depth
+                        elif tag == W_NS + 'p':
+                            paragraphs.append([])
+                            styles.append(None)
+                        elif tag == W_NS + 'tr':
+                            rows.append([])
+                        elif tag == W_NS + 'tc':
+                            cells.append([])
+                        continue
+
+                    depth -= 1
+                    if tag == MC_NS + 'Fallback':
+                        fallback -= 1
+                    elif fallback:
+                        pass
+                    elif tag == W_NS + 't':
+                        if paragraphs:
+                            paragraphs[-1].append(elem.text or '')
+                    elif tag in RUN_CHARACTERS:
+                        break_type = elem.get(W_NS + 'type') if tag == W_NS + 'br' else None
+                        if break_type == 'page':
+                            page_break()
+                        elif break_type not in (None, 'textWrapping'):
+                            pass
+                        elif paragraphs:
+                            paragraphs[-1].append(RUN_CHARACTERS[tag])
+                    elif tag == W_NS + 'lastRenderedPageBreak':
+                        page_break()
+                    elif tag == W_NS + 'pStyle' and styles:
+                        styles[-1] = elem.get(W_NS + 'val')
+                    elif tag == W_NS + 'drawing':
+                        blip = next(elem.iter(A_NS + 'blip'), None)
+                        target = media.get(blip.get(R_NS + 'embed')) if blip is not None else None
+                        if target is not None:
+                            extent = next(elem.iter(WP_NS + 'extent'), None)
+                            properties = next(elem.iter(WP_NS + 'docPr'), None)
+                            drawings.append((
+                                target,
+                                int(extent.get('cx', 0)) / EMU_PER_POINT if extent is not None else 0,
+                                int(extent.get('cy', 0)) / EMU_PER_POINT if extent is not None else 0,
+                                properties.get('name', '') if properties is not None else ''
+                            ))
+                    elif tag == W_NS + 'p':
+                        text = ''.join(paragraphs.pop())
+                        style = styles.pop()
+                        if cells:
+                            cells[-1].append(text)
+                        elif text.strip():
+                            emit(text, {'style': style_names.get(style, style)})
+                        elif not paragraphs and not drawings:
+                            y_offset += 14
+                        if not paragraphs and not cells:
+                            paragraph_number += 1
+                            emit_drawings({'paragraph': paragraph_number})
+                        if pending_page and not paragraphs and not cells:
+                            new_page()
+                            pending_page = False
+                        if pending_section and not paragraphs:
+                            section += 1
+                            if pending_section in ('nextPage', 'evenPage', 'oddPage'):
+                                new_page()
+                            pending_section = None
+                    elif tag == W_NS + 'tc':
+                        cell_text = '\n'.join(cells.pop()).strip()
+                        if rows:
+                            rows[-1].append(cell_text)
+                    elif tag == W_NS + 'tr':
+                        row_text = [text for text in rows.pop() if text]
+                        text = " | ".join(row_text)
+                        if cells:
+                            # A nested table row becomes part of the enclosing cell.
+                            cells[-1].append(text)
+                        elif row_text:
+                            emit(text, {'type': 'table_row'})
+                        elif not drawings:
+                            y_offset += 14
+                        if not cells:
+                            emit_drawings({})
+                        if pending_page and not cells:
+                            new_page()
+                            pending_page = False
+                    elif tag == W_NS + 'sectPr' and depth > body_depth:
+                        # A section break in a paragraph's properties ends the
+                        # section with that paragraph; the body's own sectPr
+                        # describes the last section.
+                        section_type = elem.find(W_NS + 'type')
+                        pending_section = section_type.get(W_NS + 'val') if section_type is not None else 'nextPage'
+
+                    if depth == body_depth and body is not None:
+                        # A top-level paragraph or table is done; drop it.
+                        body.clear()
+
+                    if ready:
+                        yield from ready
+                        ready.clear()
+
+        info['sections'] = section + 1
+
+    def _convert_python_docx(self, file_path: str) -> ConvertedDocument:
+        from docx import Document
+        doc = Document(file_path)
+
+        blocks = []
+        lines = []
+        y_offset = 0
+        for para in doc.paragraphs:
+            text = para.text
+            if text.strip():
+                lines.append(text)
+                blocks.append(TextBlock(
+                    text=text,
+                    page=0,
+                    x=0,
+                    y=y_offset,
+                    width=len(text) * 7,
+                    height=14,
+                    metadata={'style': para.style.name if para.style else 'Normal'}
+                ))
+            y_offset += 14
+
+        for table in doc.tables:
+            for row in table.rows:
+                row_text = []
+                for cell in row.cells:
+                    cell_text = cell.text.strip()
+                    if cell_text:
+                        row_text.append(cell_text)
+                if row_text:
+                    text = " | ".join(row_text)
+                    lines.append(text)
                     blocks.append(TextBlock(
                         text=text,
                         page=0,
@@ -33,64 +386,27 @@ class DOCXConverter(BaseConverter):
                         y=y_offset,
                         width=len(text) * 7,
                         height=14,
-                        metadata={'style': para.style.name if para.style else 'Normal'}
+                        metadata={'type': 'table_row'}
                     ))
                 y_offset += 14
 
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        cell_text = cell.text.strip()
-                        if cell_text:
-                            row_text.append(cell_text)
-                    if row_text:
-                        text = " | ".join(row_text)
-                        full_text += text + "\n"
-                        blocks.append(TextBlock(
-                            text=text,
-                            page=0,
-                            x=0,
-                            y=y_offset,
-                            width=len(text) * 7,
-                            height=14,
-                            metadata={'type': 'table_row'}
-                        ))
-                    y_offset += 14
-
-        except ImportError:
-            import subprocess
-            try:
-                result = subprocess.run(
-                    ['pandoc', '-t', 'plain', file_path],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                full_text = result.stdout
-                lines = full_text.split('\n')
-                y_offset = 0
-                for line in lines:
-                    if line.strip():
-                        blocks.append(TextBlock(
-                            text=line,
-                            page=0,
-                            x=0,
-                            y=y_offset,
-                            width=len(line) * 7,
-                            height=12
-                        ))
-                    y_offset += 12
-            except FileNotFoundError:
-                raise RuntimeError(
-                    "Neither python-docx nor pandoc is available. "
-                    "Install python-docx or pandoc."
-                )
-
         return ConvertedDocument(
             blocks=blocks,
-            full_text=full_text,
+            full_text="".join(line + "\n" for line in lines),
             page_count=1,
             source_path=file_path,
             source_type='docx'
         )
+
+    def _convert_pandoc(self, file_path: str) -> ConvertedDocument:
+        try:
+            return ConvertedDocument.from_lines(
+                output_lines(['pandoc', '-t', 'plain', file_path]),
+                source_path=file_path,
+                source_type='docx'
+            )
+        except FileNotFoundError:
+            raise RuntimeError(
+                "Neither python-docx nor pandoc is available. "
+                "Install python-docx or pandoc."
+            )
@@ -1,21 +1,85 @@
 import os
-from typing import List
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from .base import BaseConverter, ConvertedDocument, TextBlock
+from .ocr import get_ocr_backend, prepare_image, PreprocessOptions
+from .image_hash import image_hashes, hash_distance
+from .cache import file_digest
 
 
 class ImageConverter(BaseConverter):
     """Converter for image files using OCR or pixel comparison."""
 
+    # Largest perceptual-hash distance (in bits) at which two images count
+    # as the same picture and OCR is skipped.
+    HASH_THRESHOLD = 2
+
+    version = 3
+
+    def __init__(self, use_ocr: bool = True, jobs: int = 1, lang: str = 'eng', cache=None,
+                 tile_size: int = 1024, tile_overlap: int = 64,
+                 preprocess: Optional[PreprocessOptions] = None):
+        self.use_ocr = use_ocr
+        self.jobs = jobs
+        self.lang = lang
+        self.cache = cache
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.preprocess = preprocess or PreprocessOptions()
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        return {'use_ocr': self.use_ocr, 'lang': self.lang,
+                'tile_size': self.tile_size, 'tile_overlap': self.tile_overlap,
+                'preprocess': self.preprocess.to_dict()}
+
+    def ocr_backend(self):
+        """Return the shared OCR backend, warm across conversions.
+
+        Raises:
+            ImportError: If no OCR library is installed.
+        """
+        return get_ocr_backend(self.jobs, self.lang)
+
+    def hashes(self, file_path: str) -> Dict[str, str]:
+        """Perceptual hashes of an image, cached by file content when possible."""
+        if self.cache is None:
+            return image_hashes(file_path)
+        key = f"image-hash-{file_digest(file_path)}"
+        hashes = self.cache.get(key)
+        if hashes is None:
+            hashes = image_hashes(file_path)
+            self.cache.put(key, hashes)
+        return hashes
+
+    def near_identical(self, old_path: str, new_path: str,
+                       threshold: Optional[int] = None) -> Optional[int]:
+        """Return the hash distance if two images look the same, else None.
+
+        This is far cheaper than OCR, so callers can skip OCR for pairs that
+        differ only in encoding, metadata or compression noise.
+        """
+        try:
+            distance = hash_distance(self.hashes(old_path), self.hashes(new_path))
+        except (ImportError, OSError):
+            return None
+        if threshold is None:
+            threshold = self.HASH_THRESHOLD
+        return distance if distance <= threshold else None
+
     @property
     def supported_extensions(self) -> List[str]:
-        return ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp']
+        return ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.tif', '.webp']
 
-    def convert(self, file_path: str, use_ocr: bool = True) -> ConvertedDocument:
+    def convert(self, file_path: str, use_ocr: Optional[bool] = None) -> ConvertedDocument:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        blocks = []
-        full_text = ""
+        if use_ocr is None:
+            use_ocr = self.use_ocr
+
         metadata = {}
 
         try:
@@ -25,92 +89,13 @@ class ImageConverter(BaseConverter):
             metadata['height'] = img.height
             metadata['mode'] = img.mode
             metadata['format'] = img.format
+            frame_count = getattr(img, 'n_frames', 1)
 
-            if use_ocr:
-                try:
-                    import pytesseract
-                    data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
-
-                    n_boxes = len(data['text'])
-                    current_line = []
-                    current_line_top = None
-                    line_threshold = 10
-
-                    for i in range(n_boxes):
-                        text = data['text'][i].strip()
-                        if text:
-                            top = data['top'][i]
-
-                            if current_line_top is None:
-                                current_line_top = top
-
-                            if abs(top - current_line_top) > line_threshold:
-                                if current_line:
-                                    line_text = ' '.join([w['text'] for w in current_line])
-                                    full_text += line_text + "\n"
-                                    min_x = min(w['x'] for w in current_line)
-                                    min_y = min(w['y'] for w in current_line)
-                                    max_x = max(w['x'] + w['width'] for w in current_line)
-                                    max_y = max(w['y'] + w['height'] for w in current_line)
-                                    blocks.append(TextBlock(
-                                        text=line_text,
-                                        page=0,
-                                        x=min_x,
-                                        y=min_y,
-                                        width=max_x - min_x,
-                                        height=max_y - min_y,
-                                        metadata={'type': 'ocr_line'}
-                                    ))
-                                current_line = []
-                                current_line_top = top
-
-                            current_line.append({
-                                'text': text,
-                                'x': data['left'][i],
-                                'y': data['top'][i],
-                                'width': data['width'][i],
-                                'height': data['height'][i]
-                            })
-
-                    if current_line:
-                        line_text = ' '.join([w['text'] for w in current_line])
-                        full_text += line_text + "\n"
-                        min_x = min(w['x'] for w in current_line)
-                        min_y = min(w['y'] for w in current_line)
-                        max_x = max(w['x'] + w['width'] for w in current_line)
-                        max_y = max(w['y'] + w['height'] for w in current_line)
-                        blocks.append(TextBlock(
-                            text=line_text,
-                            page=0,
-                            x=min_x,
-                            y=min_y,
-                            width=max_x - min_x,
-                            height=max_y - min_y,
-                            metadata={'type': 'ocr_line'}
-                        ))
-
-                except ImportError:
-                    full_text = f"[Image: {img.width}x{img.height} {img.mode}]"
-                    blocks.append(TextBlock(
-                        text=full_text,
-                        page=0,
-                        x=0,
-                        y=0,
-                        width=img.width,
-                        height=img.height,
-                        metadata={'type': 'image_placeholder'}
-                    ))
+            if frame_count > 1:
+                metadata['frames'] = frame_count
+                blocks, full_text = self._convert_frames(img, frame_count, use_ocr)
             else:
-                full_text = f"[Image: {img.width}x{img.height} {img.mode}]"
-                blocks.append(TextBlock(
-                    text=full_text,
-                    page=0,
-                    x=0,
-                    y=0,
-                    width=img.width,
-                    height=img.height,
-                    metadata={'type': 'image_placeholder'}
-                ))
+                blocks, full_text = self._convert_frame(img, 0, use_ocr)
 
             img.close()
 
@@ -122,8 +107,207 @@ class ImageConverter(BaseConverter):
         return ConvertedDocument(
             blocks=blocks,
             full_text=full_text,
-            page_count=1,
+            page_count=frame_count,
             metadata=metadata,
             source_path=file_path,
             source_type='image'
         )
+
+    def _convert_frame(self, img, page: int, use_ocr: bool) -> Tuple[List[TextBlock], str]:
+        """OCR one image or frame, or describe it when OCR is unavailable."""
+        if use_ocr:
+            try:
+                backend = self.ocr_backend()
+                work, (sx, sy, ox, oy) = prepare_image(img, self.preprocess)
+                words = [
+                    dict(w, x=w['x'] / sx + ox, y=w['y'] / sy + oy,
+                         width=w['width'] / sx, height=w['height'] / sy)
+                    for w in self._ocr_words(work, backend)
+                ]
+                blocks, full_text = self._group_lines(words)
+                for block in blocks:
+                    block.page = page
+                return blocks, full_text
+            except ImportError:
+                pass
+
+        full_text = f"[Image: {img.width}x{img.height} {img.mode}]"
+        return [TextBlock(
+            text=full_text,
+            page=page,
+            x=0,
+            y=0,
+            width=img.width,
+            height=img.height,
+            metadata={'type': 'image_placeholder'}
+        )], full_text
+
+    def _convert_frames(self, img, frame_count: int, use_ocr: bool) -> Tuple[List[TextBlock], str]:
+        """Convert every frame of a multi-page TIFF or animated GIF.
+
+        Frames are keyed by a hash of their pixels, so repeated frames and
+        frames already converted in an earlier run (via the cache) are not
+        converted again. The remaining frames run in parallel.
+        """
+        options = json.dumps(dict(self.options, use_ocr=use_ocr), sort_keys=True, default=str)
+        prefix = f"image-frame-{self.version}-{hashlib.sha256(options.encode('utf-8')).hexdigest()[:16]}"
+
+        digests = []
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        pending: Dict[str, Any] = {}
+        for index in range(frame_count):
+            img.seek(index)
+            digest = hashlib.sha256(f"{img.mode}{img.size}".encode('ascii'))
+            digest.update(img.tobytes())
+            key = f"{prefix}-{digest.hexdigest()}"
+            digests.append(key)
+            if key in results or key in pending:
+                continue
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = img.copy()
+
+        def convert_frame(frame) -> List[Dict[str, Any]]:
+            return [b.to_dict() for b in self._convert_frame(frame, 0, use_ocr)[0]]
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, self.jobs)) as pool:
+                converted = dict(zip(pending, pool.map(convert_frame, pending.values())))
+            results.update(converted)
+            if self.cache is not None:
+                self.cache.put_many(converted)
+
+        blocks = []
+        full_text = ""
+        for index, key in enumerate(digests):
+            header = f"=== Frame {index + 1} ==="
+            full_text += header + "\n"
+            blocks.append(TextBlock(
+                text=header,
+                page=index,
+                metadata={'type': 'frame_header', 'frame_hash': key.rsplit('-', 1)[-1]}
+            ))
+            for data in results[key]:
+                block = TextBlock.from_dict(data)
+                block.page = index
+                blocks.append(block)
+                full_text += block.text + "\n"
+
+        return blocks, full_text
+
+    def _tiles(self, width: int, height: int) -> List[Tuple[Tuple[int, int, int, int], Tuple[float, float, float, float]]]:
+        """Split an image into overlapping tiles.
+
+        Returns ``(box, core)`` pairs. Cores partition the image along the
+        middle of each overlap, so a word is kept only by the tile whose
+        core holds its center.
+        """
+        def spans(length: int) -> List[Tuple[int, int, float, float]]:
+            if self.tile_size <= 0 or length <= self.tile_size:
+                return [(0, length, 0.0, float(length))]
+            size = self.tile_size
+            stride = size - self.tile_overlap
+            starts = list(range(0, length - size, stride)) + [length - size]
+            result = []
+            for i, start in enumerate(starts):
+                lo = 0.0 if i == 0 else (starts[i - 1] + size + start) / 2
+                hi = float(length) if i == len(starts) - 1 else (start + size + starts[i + 1]) / 2
+                result.append((start, start + size, lo, hi))
+            return result
+
+        tiles = []
+        for y0, y1, y_lo, y_hi in spans(height):
+            for x0, x1, x_lo, x_hi in spans(width):
+                tiles.append(((x0, y0, x1, y1), (x_lo, y_lo, x_hi, y_hi)))
+        return tiles
+
+    def _ocr_words(self, img, backend) -> List[Dict[str, Any]]:
+        """OCR an image tile by tile, reusing cached words for unchanged tiles."""
+        tiles = self._tiles(img.width, img.height)
+        if len(tiles) == 1 and self.cache is None:
+            return backend.recognize(img)
+
+        crops = [img.crop(box) for box, _ in tiles]
+        tile_words: List[Optional[List[Dict[str, Any]]]] = [None] * len(tiles)
+        keys = []
+        for i, crop in enumerate(crops):
+            digest = hashlib.sha256(f"{crop.mode}{crop.size}".encode('ascii'))
+            digest.update(crop.tobytes())
+            keys.append(f"ocr-tile-{self.version}-{backend.name}-{self.lang}-{digest.hexdigest()}")
+            if self.cache is not None:
+                tile_words[i] = self.cache.get(keys[i])
+
+        missing = [i for i, words in enumerate(tile_words) if words is None]
+        misses = {}
+        for i, words in zip(missing, backend.recognize_many([crops[i] for i in missing])):
+            tile_words[i] = words
+            misses[keys[i]] = words
+        if self.cache is not None:
+            self.cache.put_many(misses)
+
+        stitched = []
+        for ((x, y, _, _), (x_lo, y_lo, x_hi, y_hi)), words in zip(tiles, tile_words):
+            for word in words:
+                word = dict(word, x=word['x'] + x, y=word['y'] + y)
+                cx = word['x'] + word['width'] / 2
+                cy = word['y'] + word['height'] / 2
+                if x_lo <= cx < x_hi and y_lo <= cy < y_hi:
+                    stitched.append(word)
+        return stitched
+
+    @staticmethod
+    def _group_lines(words: List[Dict[str, Any]]):
+        """Join OCR words into line blocks by geometry.
+
+        A word joins a line when their vertical extents overlap by at least
+        half of the smaller height, so baseline drift and mixed font sizes
+        do not split lines. Words in a line are ordered left to right, and a
+        horizontal gap wider than three line heights starts a new block, so
+        side-by-side columns stay apart.
+        """
+        lines: List[Dict[str, Any]] = []
+        for word in sorted(words, key=lambda w: (w['y'] + w['height'] / 2, w['x'])):
+            top, bottom = word['y'], word['y'] + word['height']
+            for line in reversed(lines[-8:]):
+                overlap = min(bottom, line['bottom']) - max(top, line['top'])
+                if overlap >= 0.5 * min(word['height'], line['bottom'] - line['top']):
+                    line['words'].append(word)
+                    line['top'] = min(line['top'], top)
+                    line['bottom'] = max(line['bottom'], bottom)
+                    break
+            else:
+                lines.append({'top': top, 'bottom': bottom, 'words': [word]})
+
+        segments = []
+        for line in lines:
+            gap_limit = 3 * max(1, line['bottom'] - line['top'])
+            current = []
+            for word in sorted(line['words'], key=lambda w: w['x']):
+                if current and word['x'] - max(w['x'] + w['width'] for w in current) > gap_limit:
+                    segments.append(current)
+                    current = []
+                current.append(word)
+            segments.append(current)
+
+        blocks = []
+        full_text = ""
+        for segment in sorted(segments, key=lambda seg: (min(w['y'] for w in seg), seg[0]['x'])):
+            line_text = ' '.join([w['text'] for w in segment])
+            full_text += line_text + "\n"
+            min_x = min(w['x'] for w in segment)
+            min_y = min(w['y'] for w in segment)
+            max_x = max(w['x'] + w['width'] for w in segment)
+            max_y = max(w['y'] + w['height'] for w in segment)
+            blocks.append(TextBlock(
+                text=line_text,
+                page=0,
+                x=min_x,
+                y=min_y,
+                width=max_x - min_x,
+                height=max_y - min_y,
+                metadata={'type': 'ocr_line'}
+            ))
+
+        return blocks, full_text
@@ -0,0 +1,86 @@
+"""Perceptual image hashes computed with NumPy.
+
+All three hashes are 64-bit and work on a small grayscale thumbnail, so
+they ignore file encoding, metadata and minor compression noise:
+
+- aHash: pixels brighter than the mean of an 8x8 thumbnail.
+- dHash: horizontal brightness gradients of a 9x8 thumbnail.
+- pHash: low DCT frequencies of a 32x32 thumbnail above their median.
+"""
+
+import math
+from typing import Dict
+
+HASH_SIZE = 8
+PHASH_SIZE = 32
+HASH_KINDS = ('ahash', 'dhash', 'phash')
+
+_dct_matrix = None
+
+
+def _bits_to_hex(bits) -> str:
+    value = 0
+    for bit in bits.ravel().tolist():
+        value = (value << 1) | int(bit)
+    return f"{value:0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def _thumbnail(img, width: int, height: int):
+    import numpy as np
+    from PIL import Image
+
+    small = img.convert('L').resize((width, height), Image.BOX)
+    return np.asarray(small, dtype=np.float64)
+
+
+def _dct(size: int):
+    """Orthonormal DCT-II matrix, built once."""
+    global _dct_matrix
+    if _dct_matrix is None or _dct_matrix.shape[0] != size:
+        import numpy as np
+        n = np.arange(size)
+        matrix = np.cos(math.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size))
+        matrix[0] *= 1 / math.sqrt(2)
+        _dct_matrix = matrix * math.sqrt(2 / size)
+    return _dct_matrix
+
+
+def image_hashes(file_path: str) -> Dict[str, str]:
+    """Return the aHash, dHash and pHash of an image as hex strings."""
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(file_path) as img:
+        # JPEG can decode at reduced scale, which is all a thumbnail needs.
+        img.draft('L', (PHASH_SIZE * 4, PHASH_SIZE * 4))
+        img.load()
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGBA')
+            background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+            img = Image.alpha_composite(background, img)
+
+        pixels = _thumbnail(img, HASH_SIZE, HASH_SIZE)
+        ahash = _bits_to_hex(pixels > pixels.mean())
+
+        pixels = _thumbnail(img, HASH_SIZE + 1, HASH_SIZE)
+        dhash = _bits_to_hex(pixels[:, 1:] > pixels[:, :-1])
+
+        pixels = _thumbnail(img, PHASH_SIZE, PHASH_SIZE)
+
+    dct = _dct(PHASH_SIZE)
+    low = (dct @ pixels @ dct.T)[:HASH_SIZE, :HASH_SIZE]
+    # The DC term only reflects overall brightness, so it is left out of the median.
+    median = np.median(low.ravel()[1:])
+    phash = _bits_to_hex(low > median)
+
+    return {'ahash': ahash, 'dhash': dhash, 'phash': phash}
+
+
+def hamming(a: str, b: str) -> int:
+    """Number of differing bits between two hex hashes."""
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+def hash_distance(old: Dict[str, str], new: Dict[str, str]) -> int:
+    """Largest Hamming distance over the hash kinds both images have."""
+    return max(hamming(old[kind], new[kind]) for kind in HASH_KINDS)
@@ -0,0 +1,281 @@
+"""OCR backends shared by image conversions.
+
+Starting tesseract and loading its language data dominates OCR time for
+small images, so backends are created once per process and reused. When
+``tesserocr`` is installed, a pool of warm ``PyTessBaseAPI`` instances
+handles images in parallel threads (tesserocr releases the GIL while
+recognizing). Otherwise ``pytesseract`` runs one tesseract process per
+image, as before.
+"""
+
+import atexit
+import math
+import queue
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+_backends: Dict[tuple, 'OCRBackend'] = {}
+_backends_lock = threading.Lock()
+
+
+class OCRBackend(ABC):
+    """Recognizes words in PIL images, optionally several at a time."""
+
+    name = 'base'
+
+    def __init__(self, jobs: int = 1, lang: str = 'eng'):
+        self.jobs = max(1, jobs)
+        self.lang = lang
+        self._executor = None
+
+    @abstractmethod
+    def recognize(self, img) -> List[Dict[str, Any]]:
+        """Return words as dicts with text, x, y, width, height and conf."""
+        pass
+
+    def recognize_many(self, images: Iterable) -> List[List[Dict[str, Any]]]:
+        """Recognize several images, up to ``jobs`` at once, preserving order."""
+        images = list(images)
+        if self.jobs == 1 or len(images) < 2:
+            return [self.recognize(img) for img in images]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.jobs)
+        return list(self._executor.map(self.recognize, images))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+class PytesseractBackend(OCRBackend):
+    """One tesseract process per image via pytesseract."""
+
+    name = 'pytesseract'
+
+    def __init__(self, jobs: int = 1, lang: str = 'eng'):
+        import pytesseract
+        super().__init__(jobs, lang)
+        self._pytesseract = pytesseract
+
+    def recognize(self, img) -> List[Dict[str, Any]]:
+        pytesseract = self._pytesseract
+        data = pytesseract.image_to_data(img, lang=self.lang, output_type=pytesseract.Output.DICT)
+        words = []
+        for i in range(len(data['text'])):
+            text = data['text'][i].strip()
+            if text:
+                words.append({
+                    'text': text,
+                    'x': data['left'][i],
+                    'y': data['top'][i],
+                    'width': data['width'][i],
+                    'height': data['height'][i],
+                    'conf': float(data['conf'][i])
+                })
+        return words
+
+
+class TesserocrBackend(OCRBackend):
+    """Pool of long-lived tesseract API instances, one per worker."""
+
+    name = 'tesserocr'
+
+    def __init__(self, jobs: int = 1, lang: str = 'eng'):
+        import tesserocr
+        super().__init__(jobs, lang)
+        self._tesserocr = tesserocr
+        self._apis: 'queue.Queue' = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._apis.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.jobs:
+                self._created += 1
+                return self._tesserocr.PyTessBaseAPI(lang=self.lang)
+        return self._apis.get()
+
+    def recognize(self, img) -> List[Dict[str, Any]]:
+        tesserocr = self._tesserocr
+        level = tesserocr.RIL.WORD
+        api = self._acquire()
+        try:
+            api.SetImage(img)
+            api.Recognize()
+            words = []
+            iterator = api.GetIterator()
+            if iterator is None:
+                return words
+            for word in tesserocr.iterate_level(iterator, level):
+                try:
+                    text = word.GetUTF8Text(level)
+                except RuntimeError:
+                    continue
+                box = word.BoundingBox(level)
+                if not text or not text.strip() or box is None:
+                    continue
+                x1, y1, x2, y2 = box
+                words.append({
+                    'text': text.strip(),
+                    'x': x1,
+                    'y': y1,
+                    'width': x2 - x1,
+                    'height': y2 - y1,
+                    'conf': word.Confidence(level)
+                })
+            return words
+        finally:
+            api.Clear()
+            self._apis.put(api)
+
+    def close(self):
+        super().close()
+        while True:
+            try:
+                self._apis.get_nowait().End()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+@dataclass
+class PreprocessOptions:
+    """How images are prepared before OCR.
+
+    ``dpi`` is the resolution tesseract works at; images that declare a
+    higher DPI are downscaled (0 disables). 200 dpi leaves body text
+    large enough for tesseract while a 300-dpi scan shrinks to less than
+    half its pixels. ``scale`` is a further factor for images
+    without a useful DPI, such as 0.5 for HiDPI screenshots. ``roi`` is
+    an optional ``(x, y, width, height)`` region in original pixels.
+    ``binarize`` applies a local-mean threshold over ``window``-pixel
+    squares.
+    """
+    dpi: int = 200
+    scale: float = 1.0
+    grayscale: bool = True
+    binarize: bool = False
+    window: int = 31
+    roi: Optional[Tuple[int, int, int, int]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _binarize(img, window: int, bias: float = 0.15):
+    """Threshold each pixel against the mean of its neighborhood.
+
+    Neighborhood sums come from an integral image, so the cost does not
+    depend on the window size.
+    """
+    import numpy as np
+    from PIL import Image
+
+    pixels = np.array(img, dtype=np.float64)
+    height, width = pixels.shape
+    r = window // 2
+    # Integral image with r extra rows and columns on each side: zeros
+    # before the image, copies of the last row and column after it, so
+    # windows at the edges are clipped and every corner is a plain slice.
+    integral = np.zeros((height + 1 + 2 * r, width + 1 + 2 * r))
+    inner = integral[r + 1:r + 1 + height, r + 1:r + 1 + width]
+    np.cumsum(pixels, axis=0, out=inner)
+    np.cumsum(inner, axis=1, out=inner)
+    integral[r + 1 + height:] = integral[r + height]
+    integral[:, r + 1 + width:] = integral[:, r + width, None]
+
+    d = 2 * r + 1
+    sums = integral[d:d + height, d:d + width] - integral[:height, d:d + width]
+    sums -= integral[d:d + height, :width]
+    sums += integral[:height, :width]
+
+    rows = np.arange(height)
+    columns = np.arange(width)
+    counts_y = np.minimum(rows + r + 1, height) - np.maximum(rows - r, 0)
+    counts_x = np.minimum(columns + r + 1, width) - np.maximum(columns - r, 0)
+
+    sums *= 1.0 - bias
+    pixels *= counts_y[:, None]
+    pixels *= counts_x[None, :]
+    binary = pixels > sums
+    return Image.fromarray(binary.astype(np.uint8) * np.uint8(255), 'L')
+
+
+def prepare_image(img, options: PreprocessOptions):
+    """Prepare an opened, not yet loaded image for OCR.
+
+    Returns the processed image and ``(scale_x, scale_y, offset_x,
+    offset_y)``; a point in the processed image maps back to
+    ``(x / scale_x + offset_x, y / scale_y + offset_y)``.
+    """
+    from PIL import Image
+
+    orig_w, orig_h = img.size
+    scale = options.scale
+    dpi = img.info.get('dpi')
+    if options.dpi and dpi:
+        source_dpi = max(float(dpi[0]), float(dpi[1]))
+        if source_dpi > options.dpi:
+            scale *= options.dpi / source_dpi
+
+    if scale < 1.0:
+        # JPEG decodes straight to a reduced size (and to gray) here.
+        img.draft('L' if options.grayscale else img.mode,
+                  (math.ceil(orig_w * scale), math.ceil(orig_h * scale)))
+    decoded = img.width / orig_w
+
+    x, y, width, height = options.roi or (0, 0, orig_w, orig_h)
+    x, y = max(0, x), max(0, y)
+    width, height = min(width, orig_w - x), min(height, orig_h - y)
+    if options.roi:
+        img = img.crop((round(x * decoded), round(y * decoded),
+                        round((x + width) * decoded), round((y + height) * decoded)))
+
+    target = (max(1, round(width * scale)), max(1, round(height * scale)))
+    if img.size != target:
+        img = img.resize(target, Image.LANCZOS, reducing_gap=2.0)
+
+    if options.grayscale and img.mode != 'L':
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGBA')
+            background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+            img = Image.alpha_composite(background, img)
+        img = img.convert('L')
+
+    if options.binarize:
+        img = _binarize(img if img.mode == 'L' else img.convert('L'), options.window)
+
+    return img, (img.width / width, img.height / height, x, y)
+
+
+def get_ocr_backend(jobs: int = 1, lang: str = 'eng') -> OCRBackend:
+    """Return the shared OCR backend for this process.
+
+    Raises:
+        ImportError: If neither tesserocr nor pytesseract is installed.
+    """
+    key = (jobs, lang)
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            try:
+                backend = TesserocrBackend(jobs, lang)
+            except ImportError:
+                backend = PytesseractBackend(jobs, lang)
+            _backends[key] = backend
+        return backend
+
+
+@atexit.register
+def _close_backends():
+    for backend in _backends.values():
+        backend.close()
+    _backends.clear()
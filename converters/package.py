@@ -0,0 +1,90 @@
+"""Parts of ZIP-based Office documents, identified by their central directory.
+
+DOCX, XLSX and PPTX files are ZIP packages whose central directory stores
+a CRC-32 and the uncompressed size of every part. Reading it decompresses
+nothing, so parts that did not change between two revisions are known
+before any XML is parsed. Converters key their per-part cache entries on
+these values, so an unchanged sheet or slide is converted once and reused.
+The same values identify embedded media, so pictures are compared by CRC
+and size without being read or decoded.
+"""
+
+import hashlib
+import zipfile
+import posixpath
+from typing import Dict, Iterable, Optional, Set, Tuple
+from xml.etree.ElementTree import iterparse
+
+
+def part_digests(file_path: str) -> Dict[str, str]:
+    """Part names mapped to ``"<crc32>-<size>"`` from the central directory."""
+    with zipfile.ZipFile(file_path) as zf:
+        return {info.filename: f"{info.CRC:08x}-{info.file_size}" for info in zf.infolist()}
+
+
+def unchanged_parts(old_path: str, new_path: str) -> Optional[Set[str]]:
+    """Names of parts with the same CRC and size in both packages.
+
+    Returns None unless both files are ZIP packages.
+    """
+    if not (zipfile.is_zipfile(old_path) and zipfile.is_zipfile(new_path)):
+        return None
+    old = part_digests(old_path)
+    new = part_digests(new_path)
+    return {name for name, digest in old.items() if new.get(name) == digest}
+
+
+def part_key(prefix: str, digests: Dict[str, str], parts: Iterable[Optional[str]], *extra) -> str:
+    """Cache key for content converted from ``parts``.
+
+    Only the parts' CRCs and sizes go into the key, not their names, so a
+    sheet or slide that moved within the package still matches. ``extra``
+    holds anything else the output depends on.
+    """
+    digest = hashlib.sha256()
+    for value in extra:
+        digest.update(repr(value).encode('utf-8'))
+    for part in parts:
+        digest.update(b'|' + digests.get(part, '-').encode('ascii'))
+    return f"{prefix}-{digest.hexdigest()}"
+
+
+def rels_part(part: str) -> str:
+    """Path of the relationships part that belongs to ``part``."""
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, '_rels', name + '.rels')
+
+
+def relationships(zf: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, str]]:
+    """Relationship ids of a part mapped to ``(type, target part)``.
+
+    The type is the last segment of the relationship type URI, such as
+    ``image`` or ``slideLayout``. External targets are left out.
+    """
+    directory = posixpath.dirname(part)
+    rels: Dict[str, Tuple[str, str]] = {}
+    try:
+        f = zf.open(rels_part(part))
+    except KeyError:
+        return rels
+    with f:
+        for _, elem in iterparse(f):
+            if elem.tag.rsplit('}', 1)[-1] == 'Relationship' and elem.get('TargetMode') != 'External':
+                target = elem.get('Target', '')
+                if target.startswith('/'):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join(directory, target))
+                rels[elem.get('Id')] = (elem.get('Type', '').rsplit('/', 1)[-1], target)
+    return rels
+
+
+def media_text(part: str, digest: str) -> str:
+    """Line text for an embedded picture: format, size and CRC, not its part name.
+
+    Office renames media parts when a file is saved again, so the name
+    would show changes that are not there.
+    """
+    crc, size = digest.rsplit('-', 1)
+    extension = posixpath.splitext(part)[1].lstrip('.').lower() or 'bin'
+    return f"[Image: {extension}, {int(size):,} bytes, crc {crc}]"
@@ -1,11 +1,75 @@
-import subprocess
+import hashlib
+import re
+import shutil
 import os
-from typing import List
-from .base import BaseConverter, ConvertedDocument, TextBlock
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+from xml.etree.ElementTree import iterparse, ParseError
+from .base import BaseConverter, ConvertedDocument, PageBreak, TextBlock
+from .process import open_output, output_lines
+
+
+# Smallest page range handed to a worker; shorter documents are extracted serially.
+MIN_CHUNK_PAGES = 8
+
+# Indirect reference such as ``12 0 R`` in an object's source.
+_REFERENCE = re.compile(r'\b(\d+) \d+ R\b')
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _page_ranges(page_count: int, jobs: int) -> List[Tuple[int, int]]:
+    """Split ``[0, page_count)`` into contiguous chunks for ``jobs`` workers."""
+    return _split_spans([(0, page_count)], jobs)
+
+
+def _split_spans(spans: List[Tuple[int, int]], jobs: int) -> List[Tuple[int, int]]:
+    """Split page spans ``[start, stop)`` into contiguous chunks for ``jobs`` workers.
+
+    A few chunks per worker keep the pool busy when pages differ in cost.
+    """
+    total = sum(stop - start for start, stop in spans)
+    chunk = max(MIN_CHUNK_PAGES, -(-total // (jobs * 4)))
+    return [(first, min(first + chunk, stop))
+            for start, stop in spans for first in range(start, stop, chunk)]
+
+
+def _spans(page_numbers: List[int]) -> List[Tuple[int, int]]:
+    """Group sorted page numbers into contiguous spans ``[start, stop)``."""
+    spans: List[Tuple[int, int]] = []
+    for page_num in page_numbers:
+        if spans and spans[-1][1] == page_num:
+            spans[-1] = (spans[-1][0], page_num + 1)
+        else:
+            spans.append((page_num, page_num + 1))
+    return spans
+
+
+def _extract_pymupdf_range(file_path: str, start: int, stop: int) -> List[List[TextBlock]]:
+    """Worker entry point: extract pages ``[start, stop)`` with one open document."""
+    import pymupdf
+
+    flags = getattr(pymupdf, 'TEXTFLAGS_TEXT', 0)
+    with pymupdf.open(file_path) as doc:
+        return [PDFConverter._page_blocks(doc[page_num], page_num, flags)
+                for page_num in range(start, stop)]
 
 
 class PDFConverter(BaseConverter):
-    """Converter for PDF files using pdftotext."""
+    """Converter for PDF files using pdftotext or pymupdf.
+
+    Each backend makes a single extraction pass that yields line text,
+    line bounding boxes and the page count together.
+    """
+
+    version = 3
+    streaming = True
+
+    def __init__(self, jobs: int = 1, cache=None):
+        self.jobs = jobs
+        self.cache = cache
 
     @property
     def supported_extensions(self) -> List[str]:
@@ -15,89 +79,306 @@ class PDFConverter(BaseConverter):
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        blocks = []
-        full_text = ""
+        backend, pages = self._pages(file_path)
+        return ConvertedDocument.from_blocks(
+            self._page_stream(pages),
+            final_newline=False,
+            metadata={'backend': backend},
+            source_path=file_path,
+            source_type='pdf'
+        )
 
+    def iter_blocks(self, file_path: str) -> Iterator[Union[TextBlock, PageBreak]]:
+        """Yield line blocks page by page as each page is extracted."""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        _, pages = self._pages(file_path)
+        yield from self._page_stream(pages)
+
+    def _pages(self, file_path: str) -> Tuple[str, Iterator[List[TextBlock]]]:
+        """Pick a backend and return it with an iterator over extracted pages.
+
+        With a cache (and pymupdf to digest pages), only pages missing
+        from it are extracted, still by the chosen backend and in
+        parallel when there are enough of them.
+        """
+        backend = self._backend()
+
+        if self.cache is not None and self._has_pymupdf():
+            return backend, self._pages_incremental(file_path, backend)
+        if self.jobs > 1:
+            page_count = self._page_count(file_path)
+            if page_count >= 2 * MIN_CHUNK_PAGES:
+                return backend, self._pages_parallel(file_path, backend, [(0, page_count)])
+        if backend == 'pdftotext':
+            return backend, self._pages_pdftotext(file_path)
+        return backend, self._pages_pymupdf(file_path)
+
+    def _extract(self, file_path: str, backend: str,
+                 spans: List[Tuple[int, int]]) -> Iterator[List[TextBlock]]:
+        """Extract the pages in ``spans``, in parallel chunks when there are enough."""
+        if self.jobs > 1 and sum(stop - start for start, stop in spans) >= 2 * MIN_CHUNK_PAGES:
+            return self._pages_parallel(file_path, backend, spans)
+        if backend == 'pdftotext':
+            return (page for start, stop in spans
+                    for page in self._pages_pdftotext(file_path, start + 1, stop))
+        return self._pages_pymupdf(file_path, spans)
+
+    @staticmethod
+    def _page_stream(pages: Iterator[List[TextBlock]]) -> Iterator[Union[TextBlock, PageBreak]]:
+        """Number the lines of extracted pages and open each page with a PageBreak."""
+        line_number = 0
+        for page_num, page_blocks in enumerate(pages):
+            yield PageBreak(page_num)
+            for block in page_blocks:
+                line_number += 1
+                block.metadata['line_number'] = line_number
+                yield block
+
+    @staticmethod
+    def _backend() -> str:
+        if shutil.which('pdftotext'):
+            return 'pdftotext'
         try:
-            result = subprocess.run(
-                ['pdftotext', '-layout', file_path, '-'],
-                capture_output=True,
-                text=True,
-                check=True
+            import pymupdf
+        except ImportError:
+            raise RuntimeError(
+                "Neither pdftotext nor pymupdf is available. "
+                "Install poppler-utils or pymupdf."
             )
-            full_text = result.stdout
+        return 'pymupdf'
 
-            page_result = subprocess.run(
-                ['pdfinfo', file_path],
-                capture_output=True,
-                text=True
-            )
-            page_count = 1
-            for line in page_result.stdout.split('\n'):
+    @staticmethod
+    def _has_pymupdf() -> bool:
+        try:
+            import pymupdf
+        except ImportError:
+            return False
+        return True
+
+    @staticmethod
+    def _page_count(file_path: str) -> int:
+        """Read the page count up front, as needed to split work across jobs."""
+        try:
+            import pymupdf
+            with pymupdf.open(file_path) as doc:
+                return len(doc)
+        except ImportError:
+            pass
+
+        try:
+            for line in output_lines(['pdfinfo', file_path]):
                 if line.startswith('Pages:'):
-                    page_count = int(line.split(':')[1].strip())
-                    break
+                    return int(line.split(':')[1].strip())
+        except (FileNotFoundError, RuntimeError):
+            pass
+        return 0
 
-            lines = full_text.split('\n')
-            current_page = 0
-            page_marker = '\x0c'
+    def _pages_parallel(self, file_path: str, backend: str,
+                        spans: List[Tuple[int, int]]) -> Iterator[List[TextBlock]]:
+        """Extract the pages in ``spans`` concurrently and yield them in page order.
 
-            y_offset = 0
-            for line in lines:
-                if page_marker in line:
-                    current_page += 1
-                    y_offset = 0
-                    line = line.replace(page_marker, '')
+        pdftotext chunks run as separate processes driven from threads;
+        pymupdf chunks run in worker processes, each opening the document once.
+        Pages of a chunk are yielded as soon as it and the chunks before it
+        are done.
+        """
+        ranges = _split_spans(spans, self.jobs)
 
-                if line.strip():
-                    blocks.append(TextBlock(
-                        text=line,
-                        page=current_page,
-                        x=0,
-                        y=y_offset,
-                        width=len(line) * 7,
-                        height=12
-                    ))
-                y_offset += 12
+        if backend == 'pdftotext':
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                results = pool.map(
+                    lambda r: list(self._pages_pdftotext(file_path, r[0] + 1, r[1])),
+                    ranges
+                )
+                for chunk in results:
+                    yield from chunk
+        else:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                results = pool.map(
+                    _extract_pymupdf_range,
+                    [file_path] * len(ranges),
+                    [start for start, _ in ranges],
+                    [stop for _, stop in ranges]
+                )
+                for chunk in results:
+                    yield from chunk
+
+    def _pages_pdftotext(self, file_path: str, first_page: Optional[int] = None,
+                         last_page: Optional[int] = None) -> Iterator[List[TextBlock]]:
+        """Extract lines with bounding boxes from ``pdftotext -bbox-layout``.
 
-        except FileNotFoundError:
+        The XHTML output is parsed as it streams from the process and each
+        page is yielded when its ``<page>`` element closes, so no separate
+        ``pdfinfo`` call is needed. ``first_page``/``last_page`` are
+        1-based and inclusive, as for ``pdftotext -f/-l``.
+        """
+        page_num = (first_page or 1) - 2
+        page_blocks: Optional[List[TextBlock]] = None
+        cmd = ['pdftotext', '-bbox-layout']
+        if first_page is not None:
+            cmd += ['-f', str(first_page)]
+        if last_page is not None:
+            cmd += ['-l', str(last_page)]
+        cmd += [file_path, '-']
+
+        parse_error = None
+        with open_output(cmd) as stdout:
             try:
-                import pymupdf
-                doc = pymupdf.open(file_path)
-                page_count = len(doc)
-                
-                for page_num, page in enumerate(doc):
-                    text = page.get_text()
-                    full_text += text + "\n"
-                    
-                    text_dict = page.get_text("dict")
-                    for block in text_dict.get("blocks", []):
-                        if "lines" in block:
-                            for line in block["lines"]:
-                                line_text = ""
-                                for span in line.get("spans", []):
-                                    line_text += span.get("text", "")
-                                if line_text.strip():
-                                    bbox = block.get("bbox", [0, 0, 0, 0])
-                                    blocks.append(TextBlock(
-                                        text=line_text,
-                                        page=page_num,
-                                        x=bbox[0],
-                                        y=bbox[1],
-                                        width=bbox[2] - bbox[0],
-                                        height=bbox[3] - bbox[1]
-                                    ))
-                doc.close()
-            except ImportError:
-                raise RuntimeError(
-                    "Neither pdftotext nor pymupdf is available. "
-                    "Install poppler-utils or pymupdf."
-                )
+                words: List[str] = []
+                for event, elem in iterparse(stdout, events=('start', 'end')):
+                    name = _local_name(elem.tag)
+                    if event == 'start':
+                        if name == 'page':
+                            page_num += 1
+                            page_blocks = []
+                        continue
 
-        return ConvertedDocument(
-            blocks=blocks,
-            full_text=full_text,
-            page_count=page_count,
-            source_path=file_path,
-            source_type='pdf'
+                    if name == 'word':
+                        if elem.text:
+                            words.append(elem.text)
+                    elif name == 'line':
+                        text = ' '.join(words)
+                        words = []
+                        if text.strip() and page_blocks is not None:
+                            page_blocks.append(self._bbox_block(text, page_num, elem.attrib))
+                        elem.clear()
+                    elif name == 'page':
+                        elem.clear()
+                        yield page_blocks
+                        page_blocks = None
+            except ParseError as e:
+                # Let pdftotext finish, so a failure is reported with its own message.
+                parse_error = e
+                for _ in iter(lambda: stdout.read(1 << 16), b''):
+                    pass
+
+        if parse_error is not None:
+            raise RuntimeError(f"Could not parse pdftotext output for {file_path}: {parse_error}")
+
+    @staticmethod
+    def _bbox_block(text: str, page: int, attrib: Dict[str, Any]) -> TextBlock:
+        x_min = float(attrib.get('xMin', 0))
+        y_min = float(attrib.get('yMin', 0))
+        x_max = float(attrib.get('xMax', 0))
+        y_max = float(attrib.get('yMax', 0))
+        return TextBlock(
+            text=text,
+            page=page,
+            x=x_min,
+            y=y_min,
+            width=x_max - x_min,
+            height=y_max - y_min
         )
+
+    def _pages_pymupdf(self, file_path: str,
+                       spans: Optional[List[Tuple[int, int]]] = None) -> Iterator[List[TextBlock]]:
+        """Extract lines with bounding boxes using one ``get_text("dict")`` per page.
+
+        ``spans`` limits extraction to those page ranges; by default every
+        page is extracted.
+        """
+        import pymupdf
+
+        flags = getattr(pymupdf, 'TEXTFLAGS_TEXT', 0)
+        with pymupdf.open(file_path) as doc:
+            for start, stop in spans if spans is not None else [(0, len(doc))]:
+                for page_num in range(start, stop):
+                    yield self._page_blocks(doc[page_num], page_num, flags)
+
+    def _pages_incremental(self, file_path: str, backend: str) -> Iterator[List[TextBlock]]:
+        """Extract only pages whose content digest is not in the page cache.
+
+        Unchanged pages of a new revision reuse the blocks cached from an
+        earlier conversion, so the cost scales with the edited pages. The
+        digests only pick the pages; ``backend`` extracts them.
+        """
+        import pymupdf
+
+        with pymupdf.open(file_path) as doc:
+            objects: Dict[int, str] = {}
+            keys = [f"pdf-page-{self.version}-{backend}-{self._page_digest(doc, page, objects)}"
+                    for page in doc]
+        cached = [self.cache.get(key) for key in keys]
+        extracted = self._extract(file_path, backend,
+                                  _spans([n for n, data in enumerate(cached) if data is None]))
+
+        misses = {}
+        for page_num, key in enumerate(keys):
+            data, cached[page_num] = cached[page_num], None
+            if data is not None:
+                blocks = [TextBlock.from_dict(b) for b in data]
+                for block in blocks:
+                    block.page = page_num
+            else:
+                blocks = next(extracted, None)
+                if blocks is None:
+                    raise RuntimeError(
+                        f"{backend} extracted fewer pages than the {len(keys)} in {file_path}"
+                    )
+                misses[key] = [b.to_dict() for b in blocks]
+            yield blocks
+
+        if next(extracted, None) is not None:
+            raise RuntimeError(f"{backend} extracted more pages than the {len(keys)} in {file_path}")
+        self.cache.put_many(misses)
+
+    @classmethod
+    def _page_digest(cls, doc, page, objects: Dict[int, str]) -> str:
+        """Digest of a page's raw content streams and the resources they use.
+
+        Fonts are digested with everything they refer to, so a changed
+        font program or ToUnicode map changes the digest even when the
+        content stream does not. ``objects`` memoizes object digests
+        across the pages of ``doc``, so a shared font is read once.
+        Streams are read undecoded, so this is far cheaper than extraction.
+        """
+        digest = hashlib.sha256()
+        digest.update(repr((tuple(page.rect), page.rotation)).encode('ascii'))
+        for xref in page.get_contents():
+            digest.update(doc.xref_stream_raw(xref) or b'')
+        digest.update(repr(doc.xref_get_key(page.xref, 'Resources')).encode('utf-8'))
+        fonts = page.get_fonts()
+        digest.update(repr(fonts).encode('utf-8'))
+        for font in fonts:
+            digest.update(cls._object_digest(doc, font[0], objects).encode('ascii'))
+        for xobject in page.get_xobjects():
+            digest.update(doc.xref_stream_raw(xobject[0]) or b'')
+        return digest.hexdigest()
+
+    @classmethod
+    def _object_digest(cls, doc, xref: int, objects: Dict[int, str]) -> str:
+        """Digest of an object, its raw stream and the objects it refers to."""
+        if xref in objects:
+            return objects[xref]
+        if not 0 < xref < doc.xref_length():
+            return ''
+        # Marks the object as in progress, so reference cycles end here.
+        objects[xref] = ''
+        source = doc.xref_object(xref, compressed=True)
+        digest = hashlib.sha256(source.encode('utf-8'))
+        if doc.xref_is_stream(xref):
+            digest.update(doc.xref_stream_raw(xref) or b'')
+        for ref in _REFERENCE.findall(source):
+            digest.update(cls._object_digest(doc, int(ref), objects).encode('ascii'))
+        objects[xref] = digest.hexdigest()
+        return objects[xref]
+
+    @staticmethod
+    def _page_blocks(page, page_num: int, flags: int) -> List[TextBlock]:
+        blocks = []
+        text_dict = page.get_text("dict", flags=flags)
+        for block in text_dict.get("blocks", []):
+            for line in block.get("lines", []):
+                line_text = ''.join(span.get("text", "") for span in line.get("spans", []))
+                if line_text.strip():
+                    x0, y0, x1, y1 = line.get("bbox", (0, 0, 0, 0))
+                    blocks.append(TextBlock(
+                        text=line_text,
+                        page=page_num,
+                        x=x0,
+                        y=y0,
+                        width=x1 - x0,
+                        height=y1 - y0
+                    ))
+        return blocks
@@ -1,10 +1,288 @@
 import os
-from typing import List
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from xml.etree.ElementTree import iterparse, ParseError
 from .base import BaseConverter, ConvertedDocument, TextBlock
+from .package import part_digests, part_key, relationships, rels_part, media_text
+from .process import output_lines
+
+A_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+P_NS = '{http://schemas.openxmlformats.org/presentationml/2006/main}'
+R_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+EMU_PER_INCH = 914400
+
+# Smallest slide range handed to a worker; shorter decks are parsed serially.
+MIN_CHUNK_SLIDES = 16
+
+# Placeholder types a layout placeholder inherits its position from on the master.
+MASTER_PLACEHOLDER = {
+    'ctrTitle': 'title', 'title': 'title',
+    'dt': 'dt', 'ftr': 'ftr', 'sldNum': 'sldNum',
+}
+
+# Shape-tree elements that are tracked while a slide is parsed.
+SHAPES = ('sp', 'pic', 'graphicFrame', 'grpSp')
+
+Geometry = Tuple[float, float, float, float]
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _slide_ranges(slide_count: int, jobs: int) -> List[Tuple[int, int]]:
+    """Split ``[0, slide_count)`` into contiguous chunks for ``jobs`` workers."""
+    chunk = max(MIN_CHUNK_SLIDES, -(-slide_count // (jobs * 4)))
+    return [(start, min(start + chunk, slide_count)) for start in range(0, slide_count, chunk)]
+
+
+def _placeholder_key(elem) -> Tuple[str, int]:
+    return elem.get('type', 'obj'), int(elem.get('idx', 0))
+
+
+def _placeholders(zf: zipfile.ZipFile, part: str) -> Dict[Tuple[str, int], Optional[Geometry]]:
+    """Placeholder ``(type, idx)`` of a layout or master mapped to its own geometry."""
+    found: Dict[Tuple[str, int], Optional[Geometry]] = {}
+    key = None
+    geometry = None
+    with zf.open(part) as f:
+        for event, elem in iterparse(f, events=('start', 'end')):
+            name = _local_name(elem.tag)
+            if event == 'start':
+                if name == 'sp':
+                    key, geometry = None, None
+                continue
+            if name == 'ph':
+                key = _placeholder_key(elem)
+            elif name == 'xfrm' and geometry is None:
+                geometry = _geometry(elem)
+            elif name == 'sp':
+                if key is not None:
+                    found[key] = geometry
+                elem.clear()
+    return found
+
+
+def _geometry(xfrm) -> Optional[Geometry]:
+    off = xfrm.find(A_NS + 'off')
+    ext = xfrm.find(A_NS + 'ext')
+    if off is None or ext is None:
+        return None
+    return (int(off.get('x', 0)), int(off.get('y', 0)), int(ext.get('cx', 0)), int(ext.get('cy', 0)))
+
+
+class _Layouts:
+    """Placeholder geometry inherited from slide layouts and masters, read once per part."""
+
+    def __init__(self, zf: zipfile.ZipFile):
+        self.zf = zf
+        self.parts: Dict[str, Dict[Tuple[str, int], Optional[Geometry]]] = {}
+        self.masters: Dict[str, Optional[str]] = {}
+
+    def _placeholders(self, part: str):
+        if part not in self.parts:
+            self.parts[part] = _placeholders(self.zf, part)
+        return self.parts[part]
+
+    def master(self, layout: str) -> Optional[str]:
+        if layout not in self.masters:
+            self.masters[layout] = _related(self.zf, layout, 'slideMaster')
+        return self.masters[layout]
+
+    def inherited(self, layout: Optional[str], key: Tuple[str, int]) -> Optional[Geometry]:
+        """Geometry of the layout placeholder with the same idx, else of its master."""
+        if layout is None:
+            return None
+        ph_type, idx = key
+        match = next(((k, g) for k, g in self._placeholders(layout).items() if k[1] == idx), None)
+        if match is None:
+            return None
+        (layout_type, _), geometry = match
+        if geometry is not None:
+            return geometry
+        master = self.master(layout)
+        if master is None:
+            return None
+        base_type = MASTER_PLACEHOLDER.get(layout_type, 'body')
+        return next((g for k, g in self._placeholders(master).items() if k[0] == base_type), None)
+
+
+def _related(zf: zipfile.ZipFile, part: str, kind: str) -> Optional[str]:
+    """The first part of relationship type ``kind`` from ``part``, if any."""
+    return next((target for rel_kind, target in relationships(zf, part).values() if rel_kind == kind), None)
+
+
+def _extract_slides(file_path: str, slides: List[Tuple[int, str]]) -> List[List[TextBlock]]:
+    """Worker entry point: parse ``(slide number, part)`` pairs with one open package."""
+    digests = part_digests(file_path)
+    with zipfile.ZipFile(file_path) as zf:
+        layouts = _Layouts(zf)
+        return [_slide_blocks(zf, part, slide_num, layouts, digests) for slide_num, part in slides]
+
+
+def _slide_blocks(zf: zipfile.ZipFile, part: str, slide_num: int, layouts: _Layouts,
+                  digests: Dict[str, str]) -> List[TextBlock]:
+    """Text frames, table rows and pictures of one slide, in shape-tree order, in one pass.
+
+    Pictures are identified by the CRC and size of their media part, taken
+    from ``digests``; the media itself is never read.
+    """
+    rels = relationships(zf, part)
+    layout = next((target for kind, target in rels.values() if kind == 'slideLayout'), None)
+    blocks: List[TextBlock] = []
+    y_offset = 24
+
+    # Open shapes, groups and graphic frames, innermost last.
+    shapes: List[Dict[str, Any]] = []
+    # Group transforms as (x offset, y offset, x scale, y scale), outermost first.
+    transforms: List[Tuple[float, float, float, float]] = []
+    paragraphs: List[List[str]] = []
+    cells: List[List[str]] = []
+    rows: List[List[str]] = []
+
+    def place(geometry: Optional[Geometry]) -> Optional[Geometry]:
+        if geometry is None:
+            return None
+        x, y, cx, cy = geometry
+        for ox, oy, sx, sy in reversed(transforms):
+            x, y, cx, cy = ox + x * sx, oy + y * sy, cx * sx, cy * sy
+        return x, y, cx, cy
+
+    with zf.open(part) as f:
+        for event, elem in iterparse(f, events=('start', 'end')):
+            name = _local_name(elem.tag)
+            if event == 'start':
+                if name in SHAPES:
+                    shapes.append({'kind': name, 'texts': [], 'rows': [], 'geometry': None,
+                                   'placeholder': None, 'shape_type': 'AUTO_SHAPE'})
+                elif name == 'p' and elem.tag == A_NS + 'p':
+                    paragraphs.append([])
+                elif name == 'tr':
+                    rows.append([])
+                elif name == 'tc':
+                    cells.append([])
+                continue
+
+            if name == 't' and paragraphs:
+                paragraphs[-1].append(elem.text or '')
+            elif name == 'br' and paragraphs:
+                paragraphs[-1].append('\n')
+            elif name == 'p' and elem.tag == A_NS + 'p':
+                text = ''.join(paragraphs.pop())
+                if cells:
+                    cells[-1].append(text)
+                elif shapes:
+                    shapes[-1]['texts'].append(text)
+            elif name == 'tc':
+                cell_text = '\n'.join(cells.pop()).strip()
+                if rows:
+                    rows[-1].append(cell_text)
+            elif name == 'tr':
+                row_text = [text for text in rows.pop() if text]
+                if row_text and shapes:
+                    shapes[-1]['rows'].append(" | ".join(row_text))
+            elif name == 'ph' and shapes:
+                shapes[-1]['placeholder'] = _placeholder_key(elem)
+                shapes[-1]['shape_type'] = 'PLACEHOLDER'
+            elif name == 'cNvPr' and shapes:
+                shapes[-1]['name'] = elem.get('name', '')
+            elif name == 'blip' and shapes:
+                shapes[-1]['media'] = rels.get(elem.get(R_NS + 'embed'), (None, None))[1]
+            elif name == 'cNvSpPr' and shapes and elem.get('txBox') in ('1', 'true'):
+                shapes[-1]['shape_type'] = 'TEXT_BOX'
+            elif name == 'custGeom' and shapes and shapes[-1]['shape_type'] == 'AUTO_SHAPE':
+                shapes[-1]['shape_type'] = 'FREEFORM'
+            elif name == 'xfrm' and shapes and shapes[-1]['geometry'] is None and not cells:
+                shape = shapes[-1]
+                shape['geometry'] = _geometry(elem)
+                if shape['kind'] == 'grpSp' and shape['geometry'] is not None:
+                    ch_off = elem.find(A_NS + 'chOff')
+                    ch_ext = elem.find(A_NS + 'chExt')
+                    x, y, cx, cy = place(shape['geometry'])
+                    if ch_off is not None and ch_ext is not None:
+                        ccx = int(ch_ext.get('cx', 0)) or cx or 1
+                        ccy = int(ch_ext.get('cy', 0)) or cy or 1
+                        sx, sy = cx / ccx, cy / ccy
+                        transforms.append((x - int(ch_off.get('x', 0)) * sx,
+                                           y - int(ch_off.get('y', 0)) * sy, sx, sy))
+                    else:
+                        transforms.append((x, y, 1.0, 1.0))
+                    shape['transform'] = True
+            elif name in SHAPES and shapes and shapes[-1]['kind'] == name:
+                shape = shapes.pop()
+                if name == 'grpSp':
+                    if shape.get('transform'):
+                        transforms.pop()
+                    elem.clear()
+                    continue
+
+                geometry = place(shape['geometry'])
+                if geometry is None and shape['placeholder'] is not None:
+                    geometry = layouts.inherited(layout, shape['placeholder'])
+                left, top, width, height = geometry or (0, 0, 0, 0)
+                box = {
+                    'x': left / EMU_PER_INCH if left else 0,
+                    'y': top / EMU_PER_INCH if top else y_offset,
+                    'width': width / EMU_PER_INCH if width else 100,
+                    'height': height / EMU_PER_INCH if height else 20,
+                }
+                text = '\n'.join(shape['texts']).strip()
+                if text:
+                    blocks.append(TextBlock(text=text, page=slide_num,
+                                            metadata={'shape_type': shape['shape_type']}, **box))
+                    y_offset += 20
+                media = shape.get('media')
+                if name == 'pic' and media in digests:
+                    blocks.append(TextBlock(
+                        text=media_text(media, digests[media]),
+                        page=slide_num,
+                        metadata={
+                            'type': 'image',
+                            'shape_type': 'PICTURE',
+                            'name': shape.get('name', ''),
+                            'part': media,
+                            'media_hash': digests[media]
+                        },
+                        **box
+                    ))
+                    y_offset += 20
+                for row_text in shape['rows']:
+                    blocks.append(TextBlock(
+                        text=row_text,
+                        page=slide_num,
+                        x=0,
+                        y=y_offset,
+                        width=len(row_text) * 7,
+                        height=14,
+                        metadata={'type': 'table_row'}
+                    ))
+                    y_offset += 14
+                elem.clear()
+
+    return blocks
 
 
 class PPTXConverter(BaseConverter):
-    """Converter for Microsoft PowerPoint PPTX files."""
+    """Converter for Microsoft PowerPoint PPTX files.
+
+    Slide parts are parsed straight from the package with ``iterparse``,
+    one pass per slide for text frames, table cells and shape geometry.
+    Pictures become ``image`` blocks identified by the CRC and size of
+    their media part, so embedded media is never read. With ``jobs`` > 1, ranges of slides are
+    parsed in worker processes.
+
+    With a ``cache``, slides are stored under a key built from the CRCs of
+    the slide, its layout and its master, so unchanged slides are reused
+    rather than parsed again.
+    """
+
+    version = 4
+
+    def __init__(self, jobs: int = 1, cache=None):
+        self.jobs = jobs
+        self.cache = cache
 
     @property
     def supported_extensions(self) -> List[str]:
@@ -14,103 +292,194 @@ class PPTXConverter(BaseConverter):
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        blocks = []
-        full_text = ""
+        if zipfile.is_zipfile(file_path):
+            try:
+                return self._convert_xml(file_path)
+            except (KeyError, ParseError):
+                pass
 
         try:
-            from pptx import Presentation
-            prs = Presentation(file_path)
-
-            for slide_num, slide in enumerate(prs.slides):
-                full_text += f"=== Slide {slide_num + 1} ===\n"
-                blocks.append(TextBlock(
-                    text=f"=== Slide {slide_num + 1} ===",
-                    page=slide_num,
-                    x=0,
-                    y=0,
-                    width=200,
-                    height=20,
-                    metadata={'type': 'slide_header'}
-                ))
-
-                y_offset = 24
-                for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        text = shape.text.strip()
-                        full_text += text + "\n"
-
-                        left = shape.left / 914400 if shape.left else 0
-                        top = shape.top / 914400 if shape.top else y_offset
-                        width = shape.width / 914400 if shape.width else 100
-                        height = shape.height / 914400 if shape.height else 20
-
-                        blocks.append(TextBlock(
-                            text=text,
-                            page=slide_num,
-                            x=left,
-                            y=top,
-                            width=width,
-                            height=height,
-                            metadata={'shape_type': shape.shape_type.name if hasattr(shape.shape_type, 'name') else str(shape.shape_type)}
-                        ))
-                        y_offset += 20
-
-                    if hasattr(shape, "table"):
-                        table = shape.table
-                        for row in table.rows:
-                            row_text = []
-                            for cell in row.cells:
-                                if cell.text.strip():
-                                    row_text.append(cell.text.strip())
-                            if row_text:
-                                text = " | ".join(row_text)
-                                full_text += text + "\n"
-                                blocks.append(TextBlock(
-                                    text=text,
-                                    page=slide_num,
-                                    x=0,
-                                    y=y_offset,
-                                    width=len(text) * 7,
-                                    height=14,
-                                    metadata={'type': 'table_row'}
-                                ))
-                                y_offset += 14
-
-                full_text += "\n"
-
+            return self._convert_python_pptx(file_path)
         except ImportError:
-            import subprocess
-            try:
-                result = subprocess.run(
-                    ['pandoc', '-t', 'plain', file_path],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                full_text = result.stdout
-                lines = full_text.split('\n')
-                y_offset = 0
-                for line in lines:
-                    if line.strip():
-                        blocks.append(TextBlock(
-                            text=line,
-                            page=0,
-                            x=0,
-                            y=y_offset,
-                            width=len(line) * 7,
-                            height=12
-                        ))
-                    y_offset += 12
-            except FileNotFoundError:
-                raise RuntimeError(
-                    "Neither python-pptx nor pandoc is available. "
-                    "Install python-pptx: pip install python-pptx"
+            return self._convert_pandoc(file_path)
+
+    @staticmethod
+    def _slide_parts(zf: zipfile.ZipFile) -> List[str]:
+        """Slide part paths in presentation order."""
+        rels = relationships(zf, 'ppt/presentation.xml')
+        parts = []
+        with zf.open('ppt/presentation.xml') as f:
+            for _, elem in iterparse(f):
+                if elem.tag == P_NS + 'sldId':
+                    rel = rels.get(elem.get(R_NS + 'id'))
+                    if rel is not None:
+                        parts.append(rel[1])
+                elif elem.tag == P_NS + 'sldIdLst':
+                    break
+        return parts
+
+    def _slide_keys(self, file_path: str, parts: List[str]) -> List[str]:
+        """Per-slide cache keys from the package's central directory.
+
+        A slide's text and geometry depend on its own part and, through
+        inherited placeholder positions, on its layout and master; its
+        picture blocks depend on the media parts it links to.
+        """
+        digests = part_digests(file_path)
+        keys = []
+        with zipfile.ZipFile(file_path) as zf:
+            layouts = _Layouts(zf)
+            for part in parts:
+                rels = relationships(zf, part).values()
+                layout = next((target for kind, target in rels if kind == 'slideLayout'), None)
+                master = layouts.master(layout) if layout else None
+                media = sorted(target for kind, target in rels if kind == 'image')
+                dependencies = [part, rels_part(part), layout, layout and rels_part(layout), master] + media
+                keys.append(part_key('pptx-slide', digests, dependencies, self.version))
+        return keys
+
+    def _convert_xml(self, file_path: str) -> ConvertedDocument:
+        with zipfile.ZipFile(file_path) as zf:
+            parts = self._slide_parts(zf)
+        keys = self._slide_keys(file_path, parts)
+
+        slides: List[Optional[List[TextBlock]]] = [None] * len(parts)
+        if self.cache is not None:
+            for slide_num, key in enumerate(keys):
+                cached = self.cache.get(key)
+                if cached is not None:
+                    slides[slide_num] = [TextBlock.from_dict(b) for b in cached]
+                    for block in slides[slide_num]:
+                        block.page = slide_num
+        pending = [(slide_num, part) for slide_num, part in enumerate(parts) if slides[slide_num] is None]
+
+        ranges = _slide_ranges(len(pending), max(1, self.jobs))
+        if self.jobs > 1 and len(ranges) > 1:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                results = pool.map(
+                    _extract_slides,
+                    [file_path] * len(ranges),
+                    [pending[start:stop] for start, stop in ranges]
                 )
+                converted = [slide for chunk in results for slide in chunk]
+        else:
+            converted = _extract_slides(file_path, pending)
+
+        misses = {}
+        for (slide_num, _), slide_blocks in zip(pending, converted):
+            slides[slide_num] = slide_blocks
+            if self.cache is not None:
+                misses[keys[slide_num]] = [b.to_dict() for b in slide_blocks]
+        if self.cache is not None:
+            self.cache.put_many(misses)
+
+        blocks = []
+        lines = []
+        for slide_num, slide_blocks in enumerate(slides):
+            header = f"=== Slide {slide_num + 1} ==="
+            lines.append(header)
+            blocks.append(TextBlock(
+                text=header,
+                page=slide_num,
+                x=0,
+                y=0,
+                width=200,
+                height=20,
+                metadata={'type': 'slide_header', 'part_hash': keys[slide_num]}
+            ))
+            for block in slide_blocks:
+                lines.append(block.text)
+                blocks.append(block)
+            lines.append("")
 
         return ConvertedDocument(
             blocks=blocks,
-            full_text=full_text,
-            page_count=len(prs.slides) if 'prs' in locals() else 1,
+            full_text="".join(line + "\n" for line in lines),
+            page_count=len(parts) or 1,
             source_path=file_path,
             source_type='pptx'
         )
+
+    def _convert_python_pptx(self, file_path: str) -> ConvertedDocument:
+        from pptx import Presentation
+        prs = Presentation(file_path)
+
+        blocks = []
+        lines = []
+        for slide_num, slide in enumerate(prs.slides):
+            lines.append(f"=== Slide {slide_num + 1} ===")
+            blocks.append(TextBlock(
+                text=f"=== Slide {slide_num + 1} ===",
+                page=slide_num,
+                x=0,
+                y=0,
+                width=200,
+                height=20,
+                metadata={'type': 'slide_header'}
+            ))
+
+            y_offset = 24
+            for shape in slide.shapes:
+                if hasattr(shape, "text") and shape.text.strip():
+                    text = shape.text.strip()
+                    lines.append(text)
+
+                    left = shape.left / EMU_PER_INCH if shape.left else 0
+                    top = shape.top / EMU_PER_INCH if shape.top else y_offset
+                    width = shape.width / EMU_PER_INCH if shape.width else 100
+                    height = shape.height / EMU_PER_INCH if shape.height else 20
+
+                    blocks.append(TextBlock(
+                        text=text,
+                        page=slide_num,
+                        x=left,
+                        y=top,
+                        width=width,
+                        height=height,
+                        metadata={'shape_type': shape.shape_type.name if hasattr(shape.shape_type, 'name') else str(shape.shape_type)}
+                    ))
+                    y_offset += 20
+
+                if hasattr(shape, "table"):
+                    table = shape.table
+                    for row in table.rows:
+                        row_text = []
+                        for cell in row.cells:
+                            if cell.text.strip():
+                                row_text.append(cell.text.strip())
+                        if row_text:
+                            text = " | ".join(row_text)
+                            lines.append(text)
+                            blocks.append(TextBlock(
+                                text=text,
+                                page=slide_num,
+                                x=0,
+                                y=y_offset,
+                                width=len(text) * 7,
+                                height=14,
+                                metadata={'type': 'table_row'}
+                            ))
+                            y_offset += 14
+
+            lines.append("")
+
+        return ConvertedDocument(
+            blocks=blocks,
+            full_text="".join(line + "\n" for line in lines),
+            page_count=len(prs.slides),
+            source_path=file_path,
+            source_type='pptx'
+        )
+
+    def _convert_pandoc(self, file_path: str) -> ConvertedDocument:
+        try:
+            return ConvertedDocument.from_lines(
+                output_lines(['pandoc', '-t', 'plain', file_path]),
+                source_path=file_path,
+                source_type='pptx'
+            )
+        except FileNotFoundError:
+            raise RuntimeError(
+                "Neither python-pptx nor pandoc is available. "
+                "Install python-pptx: pip install python-pptx"
+            )
@@ -0,0 +1,108 @@
+"""External tools run with their output streamed.
+
+Converters that shell out (pdftotext, pandoc, ssconvert) read the tool's
+stdout while it is being written instead of capturing it whole, so blocks
+are built as the output arrives and memory does not grow with it. A timer
+kills a tool that runs past its timeout, and reading fails once the
+output grows beyond a size limit.
+"""
+
+import io
+import os
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import IO, Iterator, List, Optional
+
+# Seconds a tool may run before it is killed.
+DEFAULT_TIMEOUT = 600
+# Bytes of output read from a tool before giving up on it.
+DEFAULT_MAX_OUTPUT = 1 << 30
+
+
+class _LimitedReader(io.RawIOBase):
+    """Raw stream over a pipe that fails once ``limit`` bytes have been read."""
+
+    def __init__(self, raw: IO[bytes], limit: Optional[int], tool: str):
+        self.raw = raw
+        self.limit = limit
+        self.tool = tool
+        self.size = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = self.raw.readinto(buffer) or 0
+        self.size += count
+        if self.limit is not None and self.size > self.limit:
+            raise RuntimeError(f"{self.tool} output exceeds {self.limit:,} bytes")
+        return count
+
+
+@contextmanager
+def open_output(cmd: List[str], timeout: Optional[float] = DEFAULT_TIMEOUT,
+                max_output: Optional[int] = DEFAULT_MAX_OUTPUT) -> Iterator[IO[bytes]]:
+    """Run ``cmd`` and yield its stdout as a buffered binary stream.
+
+    Leaving the block waits for the tool; if the block raises, the tool
+    is killed first. Stderr goes to a temporary file and is only read
+    for the error message.
+
+    Raises:
+        FileNotFoundError: If the tool is not installed.
+        RuntimeError: If the tool times out, writes more than
+            ``max_output`` bytes or exits with a non-zero status.
+    """
+    tool = os.path.basename(cmd[0])
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        expired = threading.Event()
+
+        def expire():
+            expired.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, expire) if timeout else None
+        if timer is not None:
+            timer.daemon = True
+            timer.start()
+        try:
+            try:
+                yield io.BufferedReader(_LimitedReader(proc.stdout, max_output, tool), 1 << 16)
+            except BaseException as e:
+                proc.kill()
+                if expired.is_set():
+                    raise RuntimeError(f"{tool} timed out after {timeout} s") from e
+                raise
+            finally:
+                proc.stdout.close()
+                returncode = proc.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        if expired.is_set():
+            raise RuntimeError(f"{tool} timed out after {timeout} s")
+        if returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode('utf-8', errors='replace').strip()
+            raise RuntimeError(f"{tool} failed with exit status {returncode}: {message}")
+
+
+def output_lines(cmd: List[str], timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 max_output: Optional[int] = DEFAULT_MAX_OUTPUT,
+                 encoding: str = 'utf-8') -> Iterator[str]:
+    """Yield the lines ``cmd`` writes, without line endings, as they arrive.
+
+    Lines are those of ``stdout.split('\\n')`` on the decoded output, so
+    output ending in a newline yields an empty last line.
+    """
+    with open_output(cmd, timeout, max_output) as stdout:
+        ended = True
+        for line in io.TextIOWrapper(stdout, encoding=encoding, errors='replace'):
+            ended = line.endswith('\n')
+            yield line[:-1] if ended else line
+        if ended:
+            yield ''
@@ -1,10 +1,68 @@
+import io
 import os
-from typing import List
-from .base import BaseConverter, ConvertedDocument, TextBlock
+import codecs
+from typing import IO, Iterator, List, Optional, Union
+from .base import BaseConverter, BlockStore, ConvertedDocument, PageBreak, TextBlock
+
+# Bytes inspected to choose an encoding.
+SAMPLE_SIZE = 1 << 16
+
+# UTF-32 first: its little-endian BOM starts with the UTF-16 one.
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Bytes that cp1252 leaves undefined; text containing them is read as Latin-1.
+CP1252_UNDEFINED = b'\x81\x8d\x8f\x90\x9d'
+
+
+def _single_byte(data: bytes) -> str:
+    return 'latin-1' if any(byte in data for byte in CP1252_UNDEFINED) else 'cp1252'
+
+
+def detect_encoding(sample: bytes, complete: bool = False) -> str:
+    """Choose the codec for text that starts with ``sample``.
+
+    A byte order mark decides first. Without one, text with a NUL in every
+    other byte is UTF-16, and a sample that validates as UTF-8 is UTF-8;
+    a character cut off at the end of the sample is not an error unless
+    ``complete`` says the sample is the whole file. Anything else is
+    cp1252, or Latin-1 if it uses bytes cp1252 does not define.
+    """
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    pairs = len(sample) // 2
+    if pairs:
+        even_nuls = sample[0:pairs * 2:2].count(0)
+        odd_nuls = sample[1:pairs * 2:2].count(0)
+        if odd_nuls > pairs * 0.4 and even_nuls < pairs * 0.05:
+            return 'utf-16-le'
+        if even_nuls > pairs * 0.4 and odd_nuls < pairs * 0.05:
+            return 'utf-16-be'
+
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=complete)
+    except UnicodeDecodeError:
+        return _single_byte(sample)
+    return 'utf-8'
 
 
 class TextConverter(BaseConverter):
-    """Converter for plain text files."""
+    """Converter for plain text files.
+
+    Files are read once as bytes; the encoding is chosen from a sample by
+    ``detect_encoding`` and recorded in the document metadata.
+    """
+
+    # Reading the file again is as cheap as reading a cached copy.
+    cacheable = False
+    streaming = True
 
     @property
     def supported_extensions(self) -> List[str]:
@@ -17,41 +75,78 @@ class TextConverter(BaseConverter):
             '.log', '.csv', '.tsv'
         ]
 
-    def convert(self, file_path: str) -> ConvertedDocument:
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252', 'ascii']
-        full_text = None
+    @staticmethod
+    def open_text(file_path: str, newline: Optional[str] = None) -> IO[str]:
+        """Open a file for reading text in the encoding its first bytes suggest.
 
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    full_text = f.read()
-                break
-            except (UnicodeDecodeError, UnicodeError):
-                continue
+        Bytes that turn out not to decode further on are replaced rather
+        than retried with other encodings, so the file is read only once.
+        """
+        f = open(file_path, 'rb')
+        encoding = detect_encoding(f.read(SAMPLE_SIZE))
+        f.seek(0)
+        return io.TextIOWrapper(f, encoding=encoding, errors='replace', newline=newline)
 
-        if full_text is None:
-            with open(file_path, 'rb') as f:
-                raw = f.read()
-            full_text = raw.decode('utf-8', errors='replace')
+    def _read_lines(self, file_path: str) -> Iterator[str]:
+        """Yield every line without its line ending, including an empty last one."""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        with self.open_text(file_path) as f:
+            rest = ''
+            while True:
+                block = f.read(1 << 20)
+                if not block:
+                    break
+                lines = (rest + block).split('\n')
+                rest = lines.pop()
+                yield from lines
+            yield rest
 
-        blocks = []
-        lines = full_text.split('\n')
+    def iter_lines(self, file_path: str) -> Iterator[str]:
+        """Yield the file's lines without line endings, reading incrementally."""
+        lines = self._read_lines(file_path)
+        previous = next(lines)
+        for line in lines:
+            yield previous
+            previous = line
+        if previous:
+            yield previous
 
-        y_offset = 0
-        for i, line in enumerate(lines):
-            blocks.append(TextBlock(
+    def iter_blocks(self, file_path: str) -> Iterator[Union[TextBlock, PageBreak]]:
+        """Yield the blocks ``convert`` builds, one line at a time."""
+        yield PageBreak(0)
+        for i, line in enumerate(self._read_lines(file_path)):
+            yield TextBlock(
                 text=line,
                 page=0,
-                x=0,
-                y=y_offset,
-                width=len(line) * 7,
-                height=12,
+                y=i * 12.0,
+                width=len(line) * 7.0,
+                height=12.0,
                 metadata={'line_number': i + 1}
-            ))
-            y_offset += 12
+            )
+
+    def convert(self, file_path: str) -> ConvertedDocument:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+
+        encoding = detect_encoding(raw[:SAMPLE_SIZE], complete=len(raw) <= SAMPLE_SIZE)
+        try:
+            full_text = raw.decode(encoding)
+        except UnicodeDecodeError:
+            # Invalid bytes beyond the sample.
+            if encoding == 'utf-8':
+                encoding = _single_byte(raw)
+                full_text = raw.decode(encoding)
+            else:
+                full_text = raw.decode(encoding, errors='replace')
+        del raw
+        if '\r' in full_text:
+            full_text = full_text.replace('\r\n', '\n').replace('\r', '\n')
+
+        blocks = BlockStore.from_lines(full_text)
 
         ext = os.path.splitext(file_path)[1].lower()
 
@@ -60,9 +155,10 @@ class TextConverter(BaseConverter):
             full_text=full_text,
             page_count=1,
             metadata={
-                'line_count': len(lines),
+                'line_count': len(blocks),
                 'char_count': len(full_text),
-                'extension': ext
+                'extension': ext,
+                'encoding': encoding
             },
             source_path=file_path,
             source_type='text'
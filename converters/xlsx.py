@@ -1,109 +1,398 @@
 import os
-from typing import List
-from .base import BaseConverter, ConvertedDocument, TextBlock
+import zipfile
+import posixpath
+from typing import List, Dict, Iterator, Tuple, Optional, Any, Union
+from xml.etree.ElementTree import iterparse
+from .base import BaseConverter, ConvertedDocument, PageBreak, TextBlock
+from .csv_converter import column_index, resolve_columns
+from .package import part_digests, part_key
+from .process import output_lines
+
+Row = Tuple[int, Tuple[Any, ...]]
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _number(text: str):
+    """Parse a stored numeric value the way openpyxl does."""
+    try:
+        if '.' in text or 'E' in text or 'e' in text:
+            return float(text)
+        return int(text)
+    except ValueError:
+        return text
+
+
+def _trim(values) -> Tuple[Any, ...]:
+    """Drop trailing empty cells from a row."""
+    end = len(values)
+    while end and (values[end - 1] is None or values[end - 1] == ''):
+        end -= 1
+    return tuple(values[:end])
 
 
 class XLSXConverter(BaseConverter):
-    """Converter for Microsoft Excel XLSX files."""
+    """Converter for Microsoft Excel XLSX files.
+
+    Sheets are streamed row by row, either through openpyxl's read-only
+    mode or, without openpyxl, by parsing the sheet XML directly, so
+    memory use does not depend on the workbook's cell object model.
+
+    With a ``cache``, converted rows are stored per sheet under a key built
+    from the CRCs of the sheet part, the shared strings and the styles, so
+    sheets that did not change since an earlier conversion (or between the
+    two files being compared) are not parsed again.
+    """
+
+    version = 3
+    streaming = True
+
+    def __init__(self, sheets: Optional[List[str]] = None, columns: Optional[List[str]] = None,
+                 cache=None):
+        self.sheets = sheets
+        self.columns = columns
+        self.cache = cache
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        return {'sheets': self.sheets, 'columns': self.columns}
 
     @property
     def supported_extensions(self) -> List[str]:
         return ['.xlsx', '.xls']
 
+    def _selected(self, sheet_names: List[str]) -> List[str]:
+        """Sheet names to convert, in workbook order.
+
+        Raises:
+            RuntimeError: If a requested sheet does not exist.
+        """
+        if not self.sheets:
+            return list(sheet_names)
+        missing = [name for name in self.sheets if name not in sheet_names]
+        if missing:
+            raise RuntimeError(
+                f"Sheet not found: {', '.join(missing)} (available: {', '.join(sheet_names)})"
+            )
+        return [name for name in sheet_names if name in self.sheets]
+
+    def _project(self, rows: Iterator[Row], selection: Optional[Dict[str, Any]] = None) -> Iterator[Row]:
+        """Keep only the selected columns, resolved against the first non-blank row.
+
+        ``selection`` receives the resolved indices so a reader can skip
+        the other cells of later rows entirely.
+        """
+        if not self.columns:
+            yield from rows
+            return
+        indices = None
+        for row_idx, values in rows:
+            if indices is None:
+                if not any(v is not None and str(v).strip() for v in values):
+                    continue
+                indices = resolve_columns(values, self.columns)
+                if selection is not None:
+                    selection['columns'] = set(indices)
+            yield row_idx, _trim([values[i] if i < len(values) else None for i in indices])
+
     def convert(self, file_path: str) -> ConvertedDocument:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        blocks = []
-        full_text = ""
-
         try:
-            from openpyxl import load_workbook
-            wb = load_workbook(file_path, data_only=True)
-
-            page_num = 0
-            for sheet_name in wb.sheetnames:
-                sheet = wb[sheet_name]
-                full_text += f"=== Sheet: {sheet_name} ===\n"
-                blocks.append(TextBlock(
-                    text=f"=== Sheet: {sheet_name} ===",
-                    page=page_num,
-                    x=0,
-                    y=0,
-                    width=200,
-                    height=16,
-                    metadata={'type': 'sheet_header', 'sheet': sheet_name}
-                ))
-
-                y_offset = 20
-                for row_idx, row in enumerate(sheet.iter_rows(), start=1):
-                    row_values = []
-                    for cell in row:
-                        value = cell.value
-                        if value is not None:
-                            row_values.append(str(value))
-                        else:
-                            row_values.append("")
-
-                    if any(v.strip() for v in row_values):
-                        text = " | ".join(row_values)
-                        full_text += text + "\n"
-                        blocks.append(TextBlock(
-                            text=text,
-                            page=page_num,
-                            x=0,
-                            y=y_offset,
-                            width=len(text) * 7,
-                            height=14,
-                            metadata={
-                                'type': 'row',
-                                'sheet': sheet_name,
-                                'row': row_idx
-                            }
-                        ))
-                    y_offset += 14
-
-                page_num += 1
-                full_text += "\n"
-
-            wb.close()
+            sheets = self.iter_tables(file_path)
+        except RuntimeError:
+            return self._convert_ssconvert(file_path)
 
-        except ImportError:
-            try:
-                import csv
-                import subprocess
-                result = subprocess.run(
-                    ['ssconvert', '--export-type=Gnumeric_stf:stf_csv', file_path, 'fd://1'],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    full_text = result.stdout
-                    lines = full_text.split('\n')
-                    y_offset = 0
-                    for line in lines:
-                        if line.strip():
-                            blocks.append(TextBlock(
-                                text=line,
-                                page=0,
-                                x=0,
-                                y=y_offset,
-                                width=len(line) * 7,
-                                height=12
-                            ))
-                        y_offset += 12
-                else:
-                    raise RuntimeError("ssconvert failed")
-            except (FileNotFoundError, RuntimeError):
-                raise RuntimeError(
-                    "Neither openpyxl nor ssconvert is available. "
-                    "Install openpyxl: pip install openpyxl"
-                )
-
-        return ConvertedDocument(
-            blocks=blocks,
-            full_text=full_text,
-            page_count=max(1, page_num),
+        return ConvertedDocument.from_blocks(
+            self._sheet_blocks(file_path, sheets),
+            page_gap=True,
             source_path=file_path,
             source_type='xlsx'
         )
+
+    def iter_blocks(self, file_path: str) -> Iterator[Union[TextBlock, PageBreak]]:
+        """Yield each sheet's header and row blocks as the rows are read."""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        try:
+            sheets = self.iter_tables(file_path)
+        except RuntimeError:
+            yield from super().iter_blocks(file_path)
+            return
+        yield from self._sheet_blocks(file_path, sheets)
+
+    def _sheet_blocks(self, file_path: str,
+                      sheets: Iterator[Tuple[str, Iterator[Row]]]) -> Iterator[Union[TextBlock, PageBreak]]:
+        """One page per sheet: a header block, then its rows, cached or parsed."""
+        keys = self._sheet_keys(file_path) if zipfile.is_zipfile(file_path) else {}
+        misses = {}
+
+        for page_num, (sheet_name, rows) in enumerate(sheets):
+            yield PageBreak(page_num)
+            header = f"=== Sheet: {sheet_name} ==="
+            key = keys.get(sheet_name)
+            metadata = {'type': 'sheet_header', 'sheet': sheet_name}
+            if key is not None:
+                metadata['part_hash'] = key
+            yield TextBlock(
+                text=header,
+                page=page_num,
+                x=0,
+                y=0,
+                width=200,
+                height=16,
+                metadata=metadata
+            )
+
+            cached = self.cache.get(key) if self.cache is not None and key is not None else None
+            if cached is not None:
+                for data in cached:
+                    block = TextBlock.from_dict(data)
+                    block.page = page_num
+                    yield block
+                continue
+
+            stored = [] if self.cache is not None and key is not None else None
+            for block in self._row_blocks(sheet_name, rows, page_num):
+                if stored is not None:
+                    stored.append(block.to_dict())
+                yield block
+            if stored is not None:
+                misses[key] = stored
+
+        if self.cache is not None:
+            self.cache.put_many(misses)
+
+    @staticmethod
+    def _row_blocks(sheet_name: str, rows: Iterator[Row], page_num: int) -> Iterator[TextBlock]:
+        for row_idx, values in rows:
+            if not any(v is not None and str(v).strip() for v in values):
+                continue
+            text = " | ".join("" if v is None else str(v) for v in values)
+            yield TextBlock(
+                text=text,
+                page=page_num,
+                x=0,
+                y=20 + (row_idx - 1) * 14,
+                width=len(text) * 7,
+                height=14,
+                metadata={
+                    'type': 'row',
+                    'sheet': sheet_name,
+                    'row': row_idx
+                }
+            )
+
+    def _sheet_keys(self, file_path: str) -> Dict[str, str]:
+        """Per-sheet cache keys from the package's central directory.
+
+        A sheet's rows depend on its own part, the shared strings and the
+        number formats in the styles, and on which reader produced them.
+        """
+        try:
+            with zipfile.ZipFile(file_path) as zf:
+                sheet_parts = self._sheet_parts(zf)
+        except KeyError:
+            return {}
+        digests = part_digests(file_path)
+        reader = 'openpyxl' if self._has_openpyxl() else 'xml'
+        return {
+            name: part_key('xlsx-sheet', digests, [part, 'xl/sharedStrings.xml', 'xl/styles.xml'],
+                           self.version, reader, self.columns, name)
+            for name, part in sheet_parts
+        }
+
+    @staticmethod
+    def _has_openpyxl() -> bool:
+        try:
+            import openpyxl
+        except ImportError:
+            return False
+        return True
+
+    def iter_tables(self, file_path: str) -> Iterator[Tuple[str, Iterator[Row]]]:
+        """Yield ``(sheet name, rows)`` for the selected sheets.
+
+        Rows are ``(row number, values)`` tuples with typed cell values,
+        produced lazily and already projected to the selected columns.
+
+        Raises:
+            RuntimeError: If neither openpyxl nor the XML reader can open the file.
+        """
+        try:
+            return self._sheets_openpyxl(file_path)
+        except ImportError:
+            if zipfile.is_zipfile(file_path):
+                return self._sheets_xml(file_path)
+        raise RuntimeError(
+            "Reading cell values needs openpyxl or an .xlsx workbook. "
+            "Install openpyxl: pip install openpyxl"
+        )
+
+    def _sheets_openpyxl(self, file_path: str) -> Iterator[Tuple[str, Iterator[Row]]]:
+        """Open the workbook read-only; rows are produced lazily per sheet."""
+        from openpyxl import load_workbook
+
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+
+        def generate():
+            try:
+                for sheet_name in self._selected(wb.sheetnames):
+                    sheet = wb[sheet_name]
+                    rows = (
+                        (row_idx, _trim(values))
+                        for row_idx, values in enumerate(sheet.iter_rows(values_only=True), start=1)
+                    )
+                    yield sheet_name, self._project(rows)
+            finally:
+                wb.close()
+
+        return generate()
+
+    def _sheets_xml(self, file_path: str) -> Iterator[Tuple[str, Iterator[Row]]]:
+        """Stream sheets straight from the package XML, without openpyxl.
+
+        Cells hold their stored values: shared and inline strings are
+        resolved, but number formats (such as dates) are not applied.
+        """
+        with zipfile.ZipFile(file_path) as zf:
+            parts = dict(self._sheet_parts(zf))
+            shared = self._shared_strings(zf)
+            for sheet_name in self._selected(list(parts)):
+                selection = {'columns': None}
+                rows = self._xml_rows(zf, parts[sheet_name], shared, selection)
+                yield sheet_name, self._project(rows, selection)
+
+    @staticmethod
+    def _sheet_parts(zf: zipfile.ZipFile) -> List[Tuple[str, str]]:
+        """Sheet names and their part paths, in workbook order."""
+        targets = {}
+        with zf.open('xl/_rels/workbook.xml.rels') as f:
+            for _, elem in iterparse(f):
+                if _local_name(elem.tag) == 'Relationship':
+                    target = elem.get('Target', '')
+                    if target.startswith('/'):
+                        target = target[1:]
+                    else:
+                        target = posixpath.normpath(posixpath.join('xl', target))
+                    targets[elem.get('Id')] = target
+
+        sheets = []
+        with zf.open('xl/workbook.xml') as f:
+            for _, elem in iterparse(f):
+                if _local_name(elem.tag) == 'sheet':
+                    rel_id = next((v for k, v in elem.attrib.items() if _local_name(k) == 'id'), None)
+                    if rel_id in targets:
+                        sheets.append((elem.get('name'), targets[rel_id]))
+        return sheets
+
+    @staticmethod
+    def _shared_strings(zf: zipfile.ZipFile) -> List[str]:
+        strings = []
+        try:
+            f = zf.open('xl/sharedStrings.xml')
+        except KeyError:
+            return strings
+        with f:
+            parts: List[str] = []
+            phonetic_start = 0
+            root = None
+            for event, elem in iterparse(f, events=('start', 'end')):
+                name = _local_name(elem.tag)
+                if event == 'start':
+                    if root is None:
+                        root = elem
+                    elif name == 'rPh':
+                        phonetic_start = len(parts)
+                    continue
+                if name == 't':
+                    parts.append(elem.text or '')
+                elif name == 'rPh':
+                    # Phonetic hints are not part of the cell text.
+                    del parts[phonetic_start:]
+                elif name == 'si':
+                    strings.append(''.join(parts))
+                    parts = []
+                    root.clear()
+        return strings
+
+    @staticmethod
+    def _xml_rows(zf: zipfile.ZipFile, part: str, shared: List[str],
+                  selection: Optional[Dict[str, Any]] = None) -> Iterator[Row]:
+        """Yield ``(row number, values)`` from a sheet part.
+
+        Once ``selection['columns']`` is set, cells in other columns are
+        skipped without resolving their values.
+        """
+        last_row = 0
+        wanted = None
+        with zf.open(part) as f:
+            values: List[Any] = []
+            cell_type = None
+            cell_value: Optional[str] = None
+            inline: List[str] = []
+            column = 0
+            sheet_data = None
+            for event, elem in iterparse(f, events=('start', 'end')):
+                name = _local_name(elem.tag)
+                if event == 'start':
+                    if name == 'sheetData':
+                        sheet_data = elem
+                    elif name == 'row':
+                        values = []
+                        column = 0
+                        wanted = selection['columns'] if selection else None
+                    elif name == 'c':
+                        cell_type = elem.get('t')
+                        ref = elem.get('r')
+                        column = column_index(ref) if ref else len(values)
+                        cell_value = None
+                        inline = []
+                    continue
+
+                if name == 'v':
+                    cell_value = elem.text
+                elif name == 't':
+                    inline.append(elem.text or '')
+                elif name == 'c':
+                    if wanted is not None and column not in wanted:
+                        value = None
+                    elif cell_type == 'inlineStr':
+                        value = ''.join(inline)
+                    elif cell_value is None:
+                        value = None
+                    elif cell_type == 's':
+                        value = shared[int(cell_value)]
+                    elif cell_type == 'b':
+                        value = cell_value == '1'
+                    elif cell_type in (None, 'n'):
+                        value = _number(cell_value)
+                    else:
+                        value = cell_value
+                    if value is not None:
+                        values.extend([None] * (column - len(values)))
+                        values.append(value)
+                    elem.clear()
+                elif name == 'row':
+                    row_idx = int(elem.get('r') or last_row + 1)
+                    last_row = row_idx
+                    # Drop parsed rows so memory stays flat on large sheets.
+                    sheet_data.clear()
+                    yield row_idx, _trim(values)
+
+    def _convert_ssconvert(self, file_path: str) -> ConvertedDocument:
+        try:
+            return ConvertedDocument.from_lines(
+                output_lines(['ssconvert', '--export-type=Gnumeric_stf:stf_csv', file_path, 'fd://1']),
+                source_path=file_path,
+                source_type='xlsx'
+            )
+        except FileNotFoundError:
+            raise RuntimeError(
+                "Neither openpyxl nor ssconvert is available. "
+                "Install openpyxl: pip install openpyxl"
+            )
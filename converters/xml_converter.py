@@ -0,0 +1,296 @@
+import os
+import hashlib
+from html.parser import HTMLParser
+from typing import List, Dict, Any, Optional
+from xml.etree.ElementTree import ParseError, iterparse
+
+from .base import BaseConverter, ConvertedDocument, TextBlock
+from .text import TextConverter
+
+
+ID_ATTRIBUTES = ('id', '{http://www.w3.org/XML/1998/namespace}id')
+
+HTML_VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+
+# Elements whose open instance is implicitly closed by a new sibling of these tags.
+HTML_AUTO_CLOSE = {
+    'li': {'li'},
+    'p': {'p'},
+    'tr': {'tr', 'td', 'th'},
+    'td': {'td', 'th'},
+    'th': {'td', 'th'},
+    'dt': {'dt', 'dd'},
+    'dd': {'dt', 'dd'},
+    'option': {'option'},
+}
+
+CHUNK_SIZE = 1 << 20
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _xpath_literal(value: str) -> str:
+    """Quote ``value`` as an XPath string literal, whatever quotes it contains."""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in value.split("'")) + ")"
+
+
+class _FlatTreeBuilder:
+    """Parser target that records elements in document order.
+
+    Each element becomes one node in a flat pre-order list together with the
+    size of its subtree, so a subtree is the contiguous range
+    ``[index, index + size)``. Hashes are computed bottom-up when an element
+    closes, which lets the tree diff skip unchanged subtrees in O(1); each
+    child's hash is folded in as it closes, so only the open elements are
+    kept besides the nodes themselves.
+    """
+
+    def __init__(self):
+        self.nodes: List[Dict[str, Any]] = []
+        # Namespace URI -> prefix declared for it in the document.
+        self.prefixes: Dict[str, str] = {}
+        self._stack: List[Dict[str, Any]] = []
+
+    def _step(self, tag: str):
+        """XPath name test for ``tag`` and the sibling count key it is positioned by.
+
+        Namespaced elements use their document prefix; without one (such
+        as a default namespace) they are matched by local name.
+        """
+        if not tag.startswith('{'):
+            return tag, tag
+        uri, name = tag[1:].split('}', 1)
+        prefix = self.prefixes.get(uri)
+        if prefix:
+            return f"{prefix}:{name}", tag
+        return f"*[local-name()={_xpath_literal(name)}]", ('local', name)
+
+    def start(self, tag: str, attrs: Dict[str, str]):
+        ident = next((attrs[a] for a in ID_ATTRIBUTES if a in attrs), None)
+        step, key = self._step(tag)
+        if not self._stack:
+            xpath = f"/{step}"
+        else:
+            parent = self._stack[-1]
+            # Every same-name sibling counts towards positions, with or without an id.
+            counts = parent['counts']
+            counts[tag] = counts.get(tag, 0) + 1
+            local = ('local', _local_name(tag))
+            counts[local] = counts.get(local, 0) + 1
+            if ident is not None:
+                xpath = f"{parent['xpath']}/{step}[@id={_xpath_literal(ident)}]"
+            else:
+                xpath = f"{parent['xpath']}/{step}[{counts[key]}]"
+
+        self.nodes.append({
+            'tag': tag,
+            'id': ident,
+            'xpath': xpath,
+            'depth': len(self._stack),
+        })
+        self._stack.append({
+            'index': len(self.nodes) - 1,
+            'xpath': xpath,
+            'attrs': attrs,
+            'counts': {},
+            'text': [],
+            'children': hashlib.blake2b(digest_size=8),
+        })
+
+    def data(self, data: str):
+        if self._stack:
+            self._stack[-1]['text'].append(data)
+
+    def end(self, tag: str = None):
+        frame = self._stack.pop()
+        node = self.nodes[frame['index']]
+        text = ' '.join(''.join(frame['text']).split())
+        attrs = frame['attrs']
+
+        own = '\x00'.join([node['tag'], *(f'{k}={attrs[k]}' for k in sorted(attrs)), text])
+        node_hash = hashlib.blake2b(own.encode('utf-8'), digest_size=8).hexdigest()
+        subtree = frame['children']
+        subtree.update(node_hash.encode('ascii'))
+
+        node['node_hash'] = node_hash
+        node['hash'] = subtree.hexdigest()
+        node['size'] = len(self.nodes) - frame['index']
+        node['text'] = self._format_line(node['xpath'], attrs, node['id'], text)
+
+        if self._stack:
+            self._stack[-1]['children'].update(node['hash'].encode('ascii'))
+
+    def close(self):
+        while self._stack:
+            self.end()
+        return self.nodes
+
+    @staticmethod
+    def _format_line(xpath: str, attrs: Dict[str, str], ident: Optional[str], text: str) -> str:
+        line = xpath
+        shown = [
+            f'{_local_name(k)}="{" ".join(v.split())}"'
+            for k, v in attrs.items()
+            if not (k in ID_ATTRIBUTES and v == ident)
+        ]
+        if shown:
+            line += ' {' + ' '.join(shown) + '}'
+        if text:
+            line += f': {text}'
+        return line
+
+
+class _HTMLEventParser(HTMLParser):
+    """Forgiving HTML parser that feeds balanced events into a tree builder."""
+
+    def __init__(self, target: _FlatTreeBuilder):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+        self._open: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        closes = HTML_AUTO_CLOSE.get(tag)
+        if closes and self._open and self._open[-1] in closes:
+            self._close_to(len(self._open) - 1)
+        self.target.start(tag, {k: v or '' for k, v in attrs})
+        if tag in HTML_VOID_ELEMENTS:
+            self.target.end(tag)
+        else:
+            self._open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag, {k: v or '' for k, v in attrs})
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self._open) - 1, -1, -1):
+            if self._open[depth] == tag:
+                self._close_to(depth)
+                break
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+    def close(self):
+        super().close()
+        self._close_to(0)
+
+    def _close_to(self, depth: int):
+        while len(self._open) > depth:
+            self.target.end(self._open.pop())
+
+
+class XMLConverter(BaseConverter):
+    """Converter for XML and HTML files as a tree of elements.
+
+    Produces one block per element, in document order, carrying its XPath
+    and bottom-up subtree hash for use with ``DiffEngine.diff_tree``.
+    Malformed XML falls back to plain text conversion.
+    """
+
+    version = 3
+
+    @property
+    def supported_extensions(self) -> List[str]:
+        return ['.xml', '.html', '.htm', '.xhtml', '.svg']
+
+    def convert(self, file_path: str) -> ConvertedDocument:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        ext = os.path.splitext(file_path)[1].lower()
+        syntax = 'html' if ext in ('.html', '.htm') else 'xml'
+
+        try:
+            if syntax == 'html':
+                nodes = self._parse_html(file_path)
+            else:
+                nodes = self._parse_xml(file_path)
+        except ParseError:
+            return TextConverter().convert(file_path)
+
+        blocks = []
+        lines = []
+        for i, node in enumerate(nodes):
+            text = node.pop('text')
+            lines.append(text)
+            node['line_number'] = i + 1
+            if node['id'] is None:
+                del node['id']
+            blocks.append(TextBlock(
+                text=text,
+                page=0,
+                x=node['depth'] * 14,
+                y=i * 12,
+                width=len(text) * 7,
+                height=12,
+                metadata=node
+            ))
+
+        full_text = '\n'.join(lines)
+
+        return ConvertedDocument(
+            blocks=blocks,
+            full_text=full_text,
+            page_count=1,
+            metadata={
+                'element_count': len(nodes),
+                'syntax': syntax,
+                'extension': ext
+            },
+            source_path=file_path,
+            source_type='xml'
+        )
+
+    def _parse_xml(self, file_path: str) -> List[Dict[str, Any]]:
+        """Stream elements with ``iterparse``, clearing each one once it is recorded.
+
+        An element's text is its own text plus the tails of its children,
+        taken as each child is passed, so closed children are dropped
+        from their parent straight away.
+        """
+        target = _FlatTreeBuilder()
+        # Open elements with the last child closed in each.
+        open_elements: List[List[Any]] = []
+        for event, elem in iterparse(file_path, events=('start-ns', 'start', 'end')):
+            if event == 'start-ns':
+                prefix, uri = elem
+                target.prefixes.setdefault(uri, prefix)
+                continue
+            if event == 'start':
+                if open_elements:
+                    parent, last = open_elements[-1]
+                    target.data((parent.text if last is None else last.tail) or '')
+                    del parent[:]
+                target.start(elem.tag, dict(elem.attrib))
+                open_elements.append([elem, None])
+                continue
+
+            _, last = open_elements.pop()
+            target.data((elem.text if last is None else last.tail) or '')
+            target.end(elem.tag)
+            # The tail may not have been parsed yet; the parent reads it later.
+            tail = elem.tail
+            elem.clear()
+            elem.tail = tail
+            if open_elements:
+                open_elements[-1][1] = elem
+        return target.nodes
+
+    def _parse_html(self, file_path: str) -> List[Dict[str, Any]]:
+        target = _FlatTreeBuilder()
+        parser = _HTMLEventParser(target)
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
+                parser.feed(chunk)
+        parser.close()
+        return target.close()
@@ -1,3 +1,3 @@
-from .engine import DiffEngine, DiffResult, DiffHunk, DiffType
+from .engine import DiffEngine, DiffResult, DiffHunk, DiffType, ReportBuilder
 
-__all__ = ['DiffEngine', 'DiffResult', 'DiffHunk', 'DiffType']
+__all__ = ['DiffEngine', 'DiffResult', 'DiffHunk', 'DiffType', 'ReportBuilder']
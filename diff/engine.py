@@ -1,9 +1,37 @@
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Callable, Iterable, Optional, Tuple
 import difflib
-
-from converters.base import ConvertedDocument, TextBlock
+from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor
+
+from converters.base import BlockStore, ConvertedDocument, TextBlock
+from .tree import tree_opcodes
+from .pixel import DEFAULT_THRESHOLD, load_pixels, compare_pixels, label_regions
+from .tabular import DEFAULT_RTOL, DEFAULT_ATOL, iter_table_pairs, compare_columns, mismatched_cells
+from .keyed import DEFAULT_MEMORY, read_header, sorted_rows, merge_join
+from .unordered import count_differences
+from converters.csv_converter import resolve_columns
+
+
+def _key_indices(header: List[str], key: List[str], sheet: str) -> List[int]:
+    """Resolve ``key`` against a table header, naming the sheet on failure.
+
+    Raises:
+        RuntimeError: If a key column is not in the header.
+    """
+    if not header:
+        return []
+    indices = []
+    for column in key:
+        try:
+            indices.extend(resolve_columns(header, [column]))
+        except RuntimeError:
+            where = f" in sheet {sheet}" if sheet else ""
+            raise RuntimeError(
+                f"Key column {column} not found{where} (available: {', '.join(h for h in header if h)})"
+            ) from None
+    return indices
 
 
 class DiffType(Enum):
@@ -67,6 +95,107 @@ class DiffResult:
         return [h for h in self.hunks if h.diff_type != DiffType.EQUAL]
 
 
+class ReportBuilder:
+    """Builds a DiffResult for comparisons that have no natural line text.
+
+    Each recorded row becomes one line in a synthetic old and new document,
+    so renderers that walk ``full_text`` line by line show the report.
+    Consecutive equal rows share a hunk; every other row gets its own hunk
+    carrying its metadata.
+    """
+
+    def __init__(self):
+        self.rows: List[Tuple[DiffType, Optional[str], Optional[str], Dict[str, Any]]] = []
+
+    def equal(self, text: str, metadata: Optional[Dict[str, Any]] = None):
+        self.rows.append((DiffType.EQUAL, text, text, metadata or {}))
+
+    def insert(self, new_text: str, metadata: Optional[Dict[str, Any]] = None):
+        self.rows.append((DiffType.INSERT, None, new_text, metadata or {}))
+
+    def delete(self, old_text: str, metadata: Optional[Dict[str, Any]] = None):
+        self.rows.append((DiffType.DELETE, old_text, None, metadata or {}))
+
+    def replace(self, old_text: str, new_text: str, metadata: Optional[Dict[str, Any]] = None):
+        self.rows.append((DiffType.REPLACE, old_text, new_text, metadata or {}))
+
+    def build(self, old_doc: ConvertedDocument, new_doc: ConvertedDocument,
+              similarity: float) -> DiffResult:
+        """Return the result, with report documents standing in for the inputs."""
+        old_blocks: List[TextBlock] = []
+        new_blocks: List[TextBlock] = []
+        hunks: List[DiffHunk] = []
+        stats = {'insertions': 0, 'deletions': 0, 'modifications': 0, 'unchanged': 0}
+        counters = {
+            DiffType.EQUAL: 'unchanged',
+            DiffType.INSERT: 'insertions',
+            DiffType.DELETE: 'deletions',
+            DiffType.REPLACE: 'modifications',
+        }
+
+        for diff_type, old_text, new_text, metadata in self.rows:
+            stats[counters[diff_type]] += 1
+            i, j = len(old_blocks), len(new_blocks)
+            row_old = [self._block(old_text, i + 1, metadata)] if old_text is not None else []
+            row_new = [self._block(new_text, j + 1, metadata)] if new_text is not None else []
+            old_blocks.extend(row_old)
+            new_blocks.extend(row_new)
+
+            if diff_type == DiffType.EQUAL and hunks and hunks[-1].diff_type == DiffType.EQUAL:
+                hunk = hunks[-1]
+                hunk.old_end, hunk.new_end = len(old_blocks), len(new_blocks)
+                hunk.old_text += '\n' + old_text
+                hunk.new_text += '\n' + new_text
+                hunk.old_blocks.extend(row_old)
+                hunk.new_blocks.extend(row_new)
+                continue
+
+            hunks.append(DiffHunk(
+                diff_type=diff_type,
+                old_text=old_text or "",
+                new_text=new_text or "",
+                old_start=i,
+                old_end=len(old_blocks),
+                new_start=j,
+                new_end=len(new_blocks),
+                old_blocks=row_old,
+                new_blocks=row_new,
+                metadata={} if diff_type == DiffType.EQUAL else dict(metadata)
+            ))
+
+        return DiffResult(
+            hunks=hunks,
+            old_doc=self._document(old_doc, old_blocks),
+            new_doc=self._document(new_doc, new_blocks),
+            similarity_ratio=similarity,
+            stats=stats
+        )
+
+    @staticmethod
+    def _block(text: str, line_number: int, metadata: Dict[str, Any]) -> TextBlock:
+        bbox = metadata.get('bbox', [0, 0, 0, 0])
+        return TextBlock(
+            text=text,
+            page=metadata.get('page', 0),
+            x=bbox[0],
+            y=bbox[1],
+            width=bbox[2],
+            height=bbox[3],
+            metadata=dict(metadata, line_number=line_number)
+        )
+
+    @staticmethod
+    def _document(doc: ConvertedDocument, blocks: List[TextBlock]) -> ConvertedDocument:
+        return ConvertedDocument(
+            blocks=blocks,
+            full_text='\n'.join(b.text for b in blocks),
+            page_count=doc.page_count,
+            metadata=dict(doc.metadata, report=True),
+            source_path=doc.source_path,
+            source_type=doc.source_type
+        )
+
+
 class DiffEngine:
     """Engine for computing differences between documents."""
 
@@ -174,8 +303,452 @@ class DiffEngine:
             stats=stats
         )
 
+    def diff_tree(self, old_doc: ConvertedDocument, new_doc: ConvertedDocument) -> DiffResult:
+        """Compare XML/HTML documents structurally, skipping unchanged subtrees.
+
+        Both documents must come from ``XMLConverter``; anything else falls
+        back to the line diff. Hunks carry the XPath of the changed element.
+        """
+        if old_doc.source_type != 'xml' or new_doc.source_type != 'xml':
+            return self.diff(old_doc, new_doc)
+
+        old_nodes = [b.metadata for b in old_doc.blocks]
+        new_nodes = [b.metadata for b in new_doc.blocks]
+        opcodes = tree_opcodes(old_nodes, new_nodes)
+
+        hunks = []
+        stats = {'insertions': 0, 'deletions': 0, 'modifications': 0, 'unchanged': 0}
+
+        for tag, i1, i2, j1, j2 in opcodes:
+            old_blocks = old_doc.blocks[i1:i2]
+            new_blocks = new_doc.blocks[j1:j2]
+            old_text = '\n'.join(b.text for b in old_blocks)
+            new_text = '\n'.join(b.text for b in new_blocks)
+            metadata = {}
+
+            if tag == 'equal':
+                diff_type = DiffType.EQUAL
+                stats['unchanged'] += i2 - i1
+            elif tag == 'insert':
+                diff_type = DiffType.INSERT
+                stats['insertions'] += j2 - j1
+                metadata['xpath'] = new_blocks[0].metadata['xpath']
+            elif tag == 'delete':
+                diff_type = DiffType.DELETE
+                stats['deletions'] += i2 - i1
+                metadata['xpath'] = old_blocks[0].metadata['xpath']
+            elif tag == 'replace':
+                diff_type = DiffType.REPLACE
+                stats['modifications'] += max(i2 - i1, j2 - j1)
+                metadata['xpath'] = new_blocks[0].metadata['xpath']
+
+            hunks.append(DiffHunk(
+                diff_type=diff_type,
+                old_text=old_text,
+                new_text=new_text,
+                old_start=i1,
+                old_end=i2,
+                new_start=j1,
+                new_end=j2,
+                old_blocks=old_blocks,
+                new_blocks=new_blocks,
+                metadata=metadata
+            ))
+
+        total = len(old_nodes) + len(new_nodes)
+        similarity = 2.0 * stats['unchanged'] / total if total else 1.0
+
+        return DiffResult(
+            hunks=hunks,
+            old_doc=old_doc,
+            new_doc=new_doc,
+            similarity_ratio=similarity,
+            stats=stats
+        )
+
+    def diff_pixels(self, old_doc: ConvertedDocument, new_doc: ConvertedDocument,
+                    threshold: int = DEFAULT_THRESHOLD, align: bool = True,
+                    jobs: int = 1) -> DiffResult:
+        """Compare two images pixel by pixel and report changed regions.
+
+        Both documents must come from ``ImageConverter``; anything else falls
+        back to the line diff. Pixels are read from the source files, and
+        each connected changed region becomes a hunk whose metadata holds
+        its bbox, changed-pixel ratio and similarity. With ``align``, a
+        shifted or rescaled new image is first registered onto the old one,
+        and kept only if that leaves fewer changed pixels.
+
+        Multi-frame images are compared frame by frame. Frames whose pixel
+        hashes match are skipped, and the rest are compared on ``jobs``
+        threads.
+        """
+        if old_doc.source_type != 'image' or new_doc.source_type != 'image':
+            return self.diff(old_doc, new_doc)
+
+        old_frames = max(1, old_doc.page_count)
+        new_frames = max(1, new_doc.page_count)
+        multi_frame = old_frames > 1 or new_frames > 1
+        old_hashes = self._frame_hashes(old_doc)
+        new_hashes = self._frame_hashes(new_doc)
+        to_compare = [
+            index for index in range(min(old_frames, new_frames))
+            if old_hashes.get(index) is None or old_hashes.get(index) != new_hashes.get(index)
+        ]
+
+        def compare(index):
+            old_pixels = load_pixels(old_doc.source_path, index)
+            new_pixels = load_pixels(new_doc.source_path, index)
+            mask, alignment = compare_pixels(old_pixels, new_pixels, threshold, align)
+            return old_pixels.shape, new_pixels.shape, float(mask.mean()), alignment, label_regions(mask)
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            compared = dict(zip(to_compare, pool.map(compare, to_compare)))
+
+        builder = ReportBuilder()
+        changed = []
+        for index in range(max(old_frames, new_frames)):
+            header = f"=== Frame {index + 1} ==="
+            if index >= new_frames:
+                builder.delete(header, {'page': index})
+                changed.append(1.0)
+                continue
+            if index >= old_frames:
+                builder.insert(header, {'page': index})
+                changed.append(1.0)
+                continue
+            if multi_frame:
+                builder.equal(header, {'page': index})
+            if index not in compared:
+                changed.append(0.0)
+                continue
+
+            old_shape, new_shape, changed_ratio, alignment, regions = compared[index]
+            changed.append(changed_ratio)
+            old_header = f"[Image: {old_shape[1]}x{old_shape[0]}]"
+            new_header = f"[Image: {new_shape[1]}x{new_shape[0]}]"
+            if alignment is not None:
+                new_header += f" aligned: scale {alignment.scale:.3g}, shift ({alignment.dx}, {alignment.dy})"
+            if old_header == new_header:
+                builder.equal(old_header, {'page': index})
+            else:
+                builder.replace(old_header, new_header, {'page': index})
+
+            for number, region in enumerate(regions, start=1):
+                location = f"Region {number} at ({region.x}, {region.y}) {region.width}x{region.height}"
+                builder.replace(location, f"{location}: {region.changed_ratio:.1%} changed", {
+                    'type': 'pixel_region',
+                    'page': index,
+                    'bbox': [region.x, region.y, region.width, region.height],
+                    'changed_pixels': region.changed_pixels,
+                    'changed_ratio': region.changed_ratio,
+                    'similarity': region.similarity
+                })
+
+        similarity = 1.0 - sum(changed) / len(changed)
+        return builder.build(old_doc, new_doc, similarity)
+
+    def diff_tables(self, old_doc: ConvertedDocument, new_doc: ConvertedDocument,
+                    old_tables, new_tables, rtol: float = DEFAULT_RTOL,
+                    atol: float = DEFAULT_ATOL) -> DiffResult:
+        """Compare spreadsheets or CSV files cell by cell.
+
+        ``old_tables`` and ``new_tables`` are ``(name, rows)`` pairs as
+        produced by a converter's ``iter_tables``. Tables are paired by
+        name, columns by header name and rows by position. Numeric cells
+        count as equal when ``|a - b| <= atol + rtol * max(|a|, |b|)``, and
+        only cells outside that tolerance are reported, one hunk per cell.
+        """
+        import numpy as np
+
+        builder = ReportBuilder()
+        total = 0
+        differing = 0
+
+        for page, (old, new) in enumerate(iter_table_pairs(old_tables, new_tables)):
+            table = old or new
+            header = f"=== Sheet: {table.name} ===" if table.name else None
+            if new is None or old is None:
+                cells = table.row_count * len(table.columns)
+                total += cells
+                differing += cells
+                add = builder.delete if new is None else builder.insert
+                if header:
+                    add(header, {'page': page})
+                add(table.shape_text, {'type': 'table', 'sheet': table.name, 'page': page})
+                continue
+
+            if header:
+                builder.equal(header, {'page': page})
+            if old.shape_text == new.shape_text:
+                builder.equal(old.shape_text, {'page': page})
+            else:
+                builder.replace(old.shape_text, new.shape_text,
+                                {'type': 'table', 'sheet': table.name, 'page': page})
+
+            pairs, removed, added = compare_columns(old, new)
+            for column in removed:
+                total += old.row_count
+                differing += old.row_count
+                builder.delete(f"Column {column.name}", {'type': 'column', 'sheet': table.name,
+                                                         'column': column.name, 'page': page})
+            for column in added:
+                total += new.row_count
+                differing += new.row_count
+                builder.insert(f"Column {column.name}", {'type': 'column', 'sheet': table.name,
+                                                         'column': column.name, 'page': page})
+
+            count = min(old.row_count, new.row_count)
+            rows, columns = [], []
+            for position, (old_column, new_column) in enumerate(pairs):
+                index = mismatched_cells(old_column, new_column, count, rtol, atol)
+                rows.append(index)
+                columns.append(np.full(len(index), position))
+            rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+            columns = np.concatenate(columns) if columns else np.empty(0, dtype=np.int64)
+            order = np.lexsort((columns, rows))
+            total += count * len(pairs)
+            differing += len(rows)
+
+            for index, position in zip(rows[order].tolist(), columns[order].tolist()):
+                old_column, new_column = pairs[position]
+                old_row = int(old.row_numbers[index])
+                new_row = int(new.row_numbers[index])
+                builder.replace(
+                    f"Row {old_row}, {old_column.name}: {old_column.texts([index])[0]}",
+                    f"Row {new_row}, {new_column.name}: {new_column.texts([index])[0]}",
+                    {'type': 'cell', 'sheet': table.name, 'row': new_row,
+                     'column': new_column.name, 'page': page}
+                )
+
+            extra, add = (old, builder.delete) if old.row_count > count else (new, builder.insert)
+            for index in range(count, extra.row_count):
+                row = int(extra.row_numbers[index])
+                total += len(extra.columns)
+                differing += len(extra.columns)
+                add(f"Row {row}: {extra.row_text(index)}",
+                    {'type': 'row', 'sheet': table.name, 'row': row, 'page': page})
+
+        similarity = 1.0 - differing / total if total else 1.0
+        result = builder.build(old_doc, new_doc, similarity)
+        result.stats['unchanged'] = total - differing
+        return result
+
+    def diff_keyed(self, old_doc: ConvertedDocument, new_doc: ConvertedDocument,
+                   old_tables, new_tables, key: List[str],
+                   memory_limit: int = DEFAULT_MEMORY) -> DiffResult:
+        """Compare tables as sets of rows identified by ``key`` columns.
+
+        ``old_tables`` and ``new_tables`` are ``(name, rows)`` pairs from a
+        converter's ``iter_tables``, paired in order. Both sides are sorted
+        by key with an external merge sort (spilling to disk beyond
+        ``memory_limit`` bytes) and merge-joined, so reordered rows are
+        not reported and files larger than memory can be compared. Only
+        removed, added and changed rows are kept in the result.
+
+        Raises:
+            RuntimeError: If a table lacks one of the ``key`` columns.
+        """
+        builder = ReportBuilder()
+        unchanged = 0
+        total = 0
+
+        for page, (old_table, new_table) in enumerate(zip_longest(old_tables, new_tables)):
+            name = (old_table or new_table)[0]
+            old_rows = iter(old_table[1]) if old_table else iter(())
+            new_rows = iter(new_table[1]) if new_table else iter(())
+            old_header = read_header(old_rows) or []
+            new_header = read_header(new_rows) or []
+            if name:
+                builder.equal(f"=== Sheet: {name} ===", {'page': page})
+
+            common = [column for column in old_header if column in new_header]
+            for column in old_header:
+                if column not in common:
+                    builder.delete(f"Column {column}", {'type': 'column', 'sheet': name,
+                                                        'column': column, 'page': page})
+            for column in new_header:
+                if column not in common:
+                    builder.insert(f"Column {column}", {'type': 'column', 'sheet': name,
+                                                        'column': column, 'page': page})
+            old_common = [old_header.index(column) for column in common]
+            new_common = [new_header.index(column) for column in common]
+
+            # Each side holds at most half the budget at a time.
+            old_sorted = sorted_rows(old_rows, _key_indices(old_header, key, name),
+                                     len(old_header), memory_limit // 2)
+            new_sorted = sorted_rows(new_rows, _key_indices(new_header, key, name),
+                                     len(new_header), memory_limit // 2)
+
+            for old_row, new_row in merge_join(old_sorted, new_sorted):
+                row = old_row or new_row
+                metadata = {'type': 'row', 'sheet': name, 'key': list(row[0]), 'row': row[1], 'page': page}
+                label = ", ".join(row[0])
+                if new_row is None:
+                    total += 1
+                    builder.delete(f"Row {old_row[1]} [{label}]: {' | '.join(old_row[2])}", metadata)
+                    continue
+                if old_row is None:
+                    total += 1
+                    builder.insert(f"Row {new_row[1]} [{label}]: {' | '.join(new_row[2])}", metadata)
+                    continue
+
+                total += 2
+                changed = [
+                    column for column, i, j in zip(common, old_common, new_common)
+                    if old_row[2][i] != new_row[2][j]
+                ]
+                if not changed:
+                    unchanged += 1
+                    continue
+                metadata.update(row=new_row[1], changed_columns=changed)
+                builder.replace(f"Row {old_row[1]} [{label}]: {' | '.join(old_row[2])}",
+                                f"Row {new_row[1]} [{label}]: {' | '.join(new_row[2])}", metadata)
+
+        similarity = 2.0 * unchanged / total if total else 1.0
+        result = builder.build(old_doc, new_doc, similarity)
+        result.stats['unchanged'] = unchanged
+        return result
+
+    def diff_unordered(self, old_doc: ConvertedDocument, new_doc: ConvertedDocument,
+                       old_lines: Optional[Callable[[], Iterable[str]]] = None,
+                       new_lines: Optional[Callable[[], Iterable[str]]] = None,
+                       memory_limit: int = DEFAULT_MEMORY) -> DiffResult:
+        """Compare documents as multisets of lines, ignoring line order.
+
+        Lines default to each document's text; pass ``old_lines`` and
+        ``new_lines`` (callables returning a fresh line iterator, as each
+        side is read twice) to stream them from the source instead, such
+        as ``block_lines(converter.iter_blocks(path))``, which hashes lines
+        while the file is still being converted. Lines are counted by hash
+        without any alignment, and only lines whose counts differ are
+        reported, removed before added, with the surplus count.
+        """
+        if old_lines is None:
+            old_lines = old_doc.full_text.splitlines
+        if new_lines is None:
+            new_lines = new_doc.full_text.splitlines
+
+        differences, old_total, new_total = count_differences(old_lines, new_lines, memory_limit)
+        builder = ReportBuilder()
+        removed = added = 0
+
+        def label(line: str, count: int) -> str:
+            return line if count == 1 else f"{line}  (×{count})"
+
+        for line, old_count, new_count in differences:
+            if old_count > new_count:
+                count = old_count - new_count
+                removed += count
+                builder.delete(label(line, count), {'type': 'line', 'count': count})
+        for line, old_count, new_count in differences:
+            if new_count > old_count:
+                count = new_count - old_count
+                added += count
+                builder.insert(label(line, count), {'type': 'line', 'count': count})
+
+        common = old_total - removed
+        total = old_total + new_total
+        result = builder.build(old_doc, new_doc, 2.0 * common / total if total else 1.0)
+        result.stats.update(insertions=added, deletions=removed, unchanged=common)
+        return result
+
+    def diff_pages(self, old_doc: ConvertedDocument, new_doc: ConvertedDocument) -> DiffResult:
+        """Compare documents page by page, pairing pages by their index.
+
+        Each page (PDF page, slide, image frame) is diffed only against the
+        page at the same position, so an edit cannot be matched against
+        text on a distant page. Pages with identical text, or whose headers
+        carry the same ``part_hash`` (sheets and slides built from unchanged
+        package parts), are emitted as a whole without running a sequence
+        match.
+        """
+        old_pages = self._page_texts(old_doc)
+        new_pages = self._page_texts(new_doc)
+        old_hashes = self._part_hashes(old_doc)
+        new_hashes = self._part_hashes(new_doc)
+        builder = ReportBuilder()
+        unchanged = 0
+
+        for index in range(max(len(old_pages), len(new_pages))):
+            header = f"=== Page {index + 1} ==="
+            old_blocks = old_pages[index] if index < len(old_pages) else None
+            new_blocks = new_pages[index] if index < len(new_pages) else None
+
+            if new_blocks is None:
+                builder.delete(header, {'page': index})
+                for block in old_blocks:
+                    builder.delete(block.text, self._row_metadata(block))
+                continue
+            if old_blocks is None:
+                builder.insert(header, {'page': index})
+                for block in new_blocks:
+                    builder.insert(block.text, self._row_metadata(block))
+                continue
+
+            builder.equal(header, {'page': index})
+            if old_hashes.get(index) is not None and old_hashes.get(index) == new_hashes.get(index):
+                opcodes = [('equal', 0, len(old_blocks), 0, len(new_blocks))]
+            else:
+                old_texts = [b.text for b in old_blocks]
+                new_texts = [b.text for b in new_blocks]
+                if old_texts == new_texts:
+                    opcodes = [('equal', 0, len(old_texts), 0, len(new_texts))]
+                else:
+                    opcodes = difflib.SequenceMatcher(None, old_texts, new_texts).get_opcodes()
+
+            for tag, i1, i2, j1, j2 in opcodes:
+                if tag == 'equal':
+                    unchanged += i2 - i1
+                    for block in new_blocks[j1:j2]:
+                        builder.equal(block.text, self._row_metadata(block))
+                    continue
+                paired = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
+                for k in range(paired):
+                    builder.replace(old_blocks[i1 + k].text, new_blocks[j1 + k].text,
+                                    self._row_metadata(new_blocks[j1 + k]))
+                for block in old_blocks[i1 + paired:i2]:
+                    builder.delete(block.text, self._row_metadata(block))
+                for block in new_blocks[j1 + paired:j2]:
+                    builder.insert(block.text, self._row_metadata(block))
+
+        total = sum(len(p) for p in old_pages) + sum(len(p) for p in new_pages)
+        similarity = 2.0 * unchanged / total if total else 1.0
+        result = builder.build(old_doc, new_doc, similarity)
+        result.stats['unchanged'] = unchanged
+        return result
+
+    @staticmethod
+    def _page_texts(doc: ConvertedDocument) -> List[List[TextBlock]]:
+        """Content blocks of a document grouped by page, without page headers."""
+        page_count = max([doc.page_count] + [b.page + 1 for b in doc.blocks])
+        pages: List[List[TextBlock]] = [[] for _ in range(page_count)]
+        for block in doc.blocks:
+            if not block.metadata.get('type', '').endswith('_header'):
+                pages[block.page].append(block)
+        return pages
+
+    @staticmethod
+    def _row_metadata(block: TextBlock) -> Dict[str, Any]:
+        return {'page': block.page, 'bbox': [block.x, block.y, block.width, block.height]}
+
+    @staticmethod
+    def _part_hashes(doc: ConvertedDocument) -> Dict[int, str]:
+        return {
+            b.page: b.metadata['part_hash'] for b in doc.blocks
+            if b.metadata.get('type', '').endswith('_header') and 'part_hash' in b.metadata
+        }
+
+    @staticmethod
+    def _frame_hashes(doc: ConvertedDocument) -> Dict[int, str]:
+        return {
+            b.page: b.metadata['frame_hash'] for b in doc.blocks
+            if b.metadata.get('type') == 'frame_header'
+        }
+
     def _find_blocks_in_range(self, blocks: List[TextBlock], start_line: int, end_line: int) -> List[TextBlock]:
         """Find blocks that fall within the given line range."""
+        if isinstance(blocks, BlockStore):
+            return blocks.line_range(start_line, end_line)
         result = []
         for block in blocks:
             line_num = block.metadata.get('line_number', 0)
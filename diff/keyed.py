@@ -0,0 +1,121 @@
+"""Keyed row comparison for tables larger than memory.
+
+Rows are streamed from a converter, cut into runs that fit the memory
+budget, and each run is sorted by its key columns and spilled to a
+temporary CSV file. The runs are then merged with ``heapq.merge``, so the
+old and new tables come out as two sorted streams that are merge-joined
+key by key. Row order does not matter, and memory use is bounded by the
+budget rather than by the file size.
+"""
+
+import csv
+import heapq
+import os
+import sys
+import shutil
+import tempfile
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .tabular import cell_text
+
+# Rows held in memory per sorted run, in bytes (estimated).
+DEFAULT_MEMORY = 256 * 1024 * 1024
+
+# (key, row number, values); tuples compare by key, then row number.
+KeyedRow = Tuple[Tuple[str, ...], int, Tuple[str, ...]]
+
+
+def read_header(rows: Iterator[Tuple[int, Sequence[Any]]]) -> Optional[List[str]]:
+    """Consume rows up to and including the first non-blank one and return it."""
+    for _, values in rows:
+        header = [cell_text(v).strip() for v in values]
+        if any(header):
+            return header
+    return None
+
+
+def _size(values: Sequence[str]) -> int:
+    return sys.getsizeof(values) + sum(map(sys.getsizeof, values))
+
+
+def _write_run(run: List[KeyedRow], directory: str, number: int) -> str:
+    path = os.path.join(directory, f"run-{number}.csv")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        for _, row_num, values in run:
+            writer.writerow((row_num,) + values)
+    return path
+
+
+def _read_run(path: str, key_indices: Sequence[int]) -> Iterator[KeyedRow]:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for record in csv.reader(f):
+            values = tuple(record[1:])
+            yield tuple(values[i] for i in key_indices), int(record[0]), values
+
+
+def sorted_rows(rows: Iterable[Tuple[int, Sequence[Any]]], key_indices: Sequence[int],
+                width: int, memory_limit: int = DEFAULT_MEMORY) -> Iterator[KeyedRow]:
+    """Yield ``(key, row number, values)`` ordered by key, then row number.
+
+    Cell values become text of ``width`` columns. Input that fits in
+    ``memory_limit`` is sorted in memory; otherwise sorted runs are spilled
+    to a temporary directory, removed once the generator finishes.
+
+    Raises:
+        ValueError: If a key index is outside the ``width`` columns.
+    """
+    if any(not 0 <= i < width for i in key_indices):
+        raise ValueError(f"Key columns {list(key_indices)} outside a table of {width} columns")
+    run: List[KeyedRow] = []
+    used = 0
+    directory = None
+    paths: List[str] = []
+    try:
+        for row_num, values in rows:
+            values = tuple(cell_text(v) for v in values[:width]) + ("",) * (width - len(values))
+            if not any(values):
+                continue
+            run.append((tuple(values[i] for i in key_indices), row_num, values))
+            used += _size(values)
+            if used >= memory_limit:
+                if directory is None:
+                    directory = tempfile.mkdtemp(prefix='uni-diff-sort-')
+                run.sort()
+                paths.append(_write_run(run, directory, len(paths)))
+                run = []
+                used = 0
+
+        run.sort()
+        if not paths:
+            yield from run
+            return
+        if run:
+            paths.append(_write_run(run, directory, len(paths)))
+            run = []
+        yield from heapq.merge(*(_read_run(path, key_indices) for path in paths))
+    finally:
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def merge_join(old: Iterator[KeyedRow], new: Iterator[KeyedRow]
+               ) -> Iterator[Tuple[Optional[KeyedRow], Optional[KeyedRow]]]:
+    """Pair two key-sorted streams; unmatched rows come with ``None``.
+
+    Rows sharing a key are paired in their original order.
+    """
+    a = next(old, None)
+    b = next(new, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and a[0] < b[0]):
+            yield a, None
+            a = next(old, None)
+        elif a is None or b[0] < a[0]:
+            yield None, b
+            b = next(new, None)
+        else:
+            yield a, b
+            a = next(old, None)
+            b = next(new, None)
+
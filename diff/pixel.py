@@ -0,0 +1,298 @@
+"""Pixel-level image comparison with NumPy.
+
+Before comparing, the new image can be registered onto the old one: a
+scale is taken from the size ratio and a translation from FFT phase
+correlation. The difference mask is then computed in one vectorized
+pass. Changed pixels are pooled into coarse cells, and connected cells are
+grouped into regions, so labeling walks a grid that is ``cell**2`` times
+smaller than the image.
+"""
+
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+# Largest per-channel difference (0-255) still treated as unchanged.
+DEFAULT_THRESHOLD = 16
+# Side of the square cells that changed pixels are pooled into.
+DEFAULT_CELL = 8
+# Longest side of the downsampled images used for the coarse shift estimate.
+COARSE_SIZE = 512
+# Side of the full-resolution window used to refine the shift.
+REFINE_SIZE = 512
+# Aspect ratios closer than this are treated as a pure rescale.
+ASPECT_TOLERANCE = 0.01
+
+
+@dataclass
+class PixelRegion:
+    """A connected area of changed pixels."""
+    x: int
+    y: int
+    width: int
+    height: int
+    changed_pixels: int
+
+    @property
+    def changed_ratio(self) -> float:
+        area = self.width * self.height
+        return self.changed_pixels / area if area else 0.0
+
+    @property
+    def similarity(self) -> float:
+        return 1.0 - self.changed_ratio
+
+
+@dataclass
+class Alignment:
+    """Maps the new image onto the old: scale first, then shift by (dx, dy)."""
+    scale: float = 1.0
+    dx: int = 0
+    dy: int = 0
+
+    @property
+    def is_identity(self) -> bool:
+        return self.scale == 1.0 and self.dx == 0 and self.dy == 0
+
+
+def load_pixels(file_path: str, frame: int = 0):
+    """Load an image (or one frame of it) as an ``(height, width, 4)`` uint8 RGBA array."""
+    try:
+        import numpy as np
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError(
+            "Pixel comparison needs NumPy and Pillow. Install them: pip install numpy Pillow"
+        )
+
+    with Image.open(file_path) as img:
+        if frame:
+            img.seek(frame)
+        return np.asarray(img.convert('RGBA'))
+
+
+def _gray(pixels):
+    import numpy as np
+
+    rgb = pixels[..., :3].astype(np.float32)
+    return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _downsample(gray, factor: int):
+    if factor == 1:
+        return gray
+    height = gray.shape[0] // factor * factor
+    width = gray.shape[1] // factor * factor
+    return gray[:height, :width].reshape(
+        height // factor, factor, width // factor, factor).mean(axis=(1, 3))
+
+
+def _phase_correlation(old, new) -> Tuple[int, int]:
+    """Return (dy, dx) such that ``new[y + dy, x + dx]`` matches ``old[y, x]``."""
+    import numpy as np
+
+    window = np.outer(np.hanning(old.shape[0]), np.hanning(old.shape[1])).astype(np.float32)
+    f_old = np.fft.rfft2((old - old.mean()) * window)
+    f_new = np.fft.rfft2((new - new.mean()) * window)
+    cross = f_new * np.conj(f_old)
+    cross /= np.abs(cross) + 1e-9
+    corr = np.fft.irfft2(cross, s=old.shape)
+    dy, dx = np.unravel_index(int(np.argmax(corr)), corr.shape)
+    if dy > old.shape[0] // 2:
+        dy -= old.shape[0]
+    if dx > old.shape[1] // 2:
+        dx -= old.shape[1]
+    return int(dy), int(dx)
+
+
+def _rescale(pixels, width: int, height: int):
+    import numpy as np
+    from PIL import Image
+
+    img = Image.fromarray(pixels, 'RGBA').resize((width, height), Image.BILINEAR)
+    return np.asarray(img)
+
+
+def estimate_alignment(old, new) -> Optional[Alignment]:
+    """Estimate the scale and translation that register ``new`` onto ``old``.
+
+    Images whose aspect ratios differ are not rescaled, and None is
+    returned. The shift is estimated by phase correlation on downsampled
+    images, then refined at full resolution in a window around the most
+    textured area.
+    """
+    import numpy as np
+
+    old_h, old_w = old.shape[:2]
+    new_h, new_w = new.shape[:2]
+    if abs(old_w / old_h - new_w / new_h) > ASPECT_TOLERANCE * old_w / old_h:
+        return None
+
+    scale = old_w / new_w
+    if (new_w, new_h) != (old_w, old_h):
+        new = _rescale(new, old_w, old_h)
+
+    old_gray = _gray(old)
+    new_gray = _gray(new)
+
+    factor = max(1, -(-max(old_h, old_w) // COARSE_SIZE))
+    coarse_old = _downsample(old_gray, factor)
+    coarse_new = _downsample(new_gray, factor)
+    dy, dx = _phase_correlation(coarse_old, coarse_new)
+    dy, dx = dy * factor, dx * factor
+
+    if factor > 1:
+        # Center the refinement window on the coarse cell with the most detail.
+        grad = np.abs(np.diff(coarse_old, axis=0))[:, :-1] + np.abs(np.diff(coarse_old, axis=1))[:-1, :]
+        cy, cx = np.unravel_index(int(np.argmax(grad)), grad.shape)
+        size_h = min(REFINE_SIZE, old_h - abs(dy))
+        size_w = min(REFINE_SIZE, old_w - abs(dx))
+        y0 = int(np.clip(cy * factor - size_h // 2, max(0, -dy), old_h - size_h - max(0, dy)))
+        x0 = int(np.clip(cx * factor - size_w // 2, max(0, -dx), old_w - size_w - max(0, dx)))
+        if size_h > 16 and size_w > 16:
+            ry, rx = _phase_correlation(
+                old_gray[y0:y0 + size_h, x0:x0 + size_w],
+                new_gray[y0 + dy:y0 + dy + size_h, x0 + dx:x0 + dx + size_w]
+            )
+            dy, dx = dy + ry, dx + rx
+
+    return Alignment(scale=scale, dx=dx, dy=dy)
+
+
+def apply_alignment(new, old_shape, alignment: Alignment):
+    """Resample ``new`` into the old image's frame.
+
+    Returns the aligned pixels and a mask of the pixels the new image
+    covers; the uncovered border cannot be compared.
+    """
+    import numpy as np
+
+    height, width = old_shape[:2]
+    if new.shape[:2] != (height, width):
+        new = _rescale(new, width, height)
+
+    aligned = np.zeros((height, width, new.shape[2]), dtype=new.dtype)
+    covered = np.zeros((height, width), dtype=bool)
+    dy, dx = alignment.dy, alignment.dx
+    ys = slice(max(0, -dy), min(height, height - dy))
+    xs = slice(max(0, -dx), min(width, width - dx))
+    src_ys = slice(ys.start + dy, ys.stop + dy)
+    src_xs = slice(xs.start + dx, xs.stop + dx)
+    aligned[ys, xs] = new[src_ys, src_xs]
+    covered[ys, xs] = True
+    return aligned, covered
+
+
+def change_mask(old, new, threshold: int = DEFAULT_THRESHOLD):
+    """Boolean mask of pixels whose largest channel difference exceeds ``threshold``.
+
+    Arrays of different sizes are compared over their common top-left
+    area, and everything outside it counts as changed.
+    """
+    import numpy as np
+
+    height = max(old.shape[0], new.shape[0])
+    width = max(old.shape[1], new.shape[1])
+    common_h = min(old.shape[0], new.shape[0])
+    common_w = min(old.shape[1], new.shape[1])
+
+    mask = np.ones((height, width), dtype=bool)
+    a = np.ascontiguousarray(old[:common_h, :common_w])
+    b = np.ascontiguousarray(new[:common_h, :common_w])
+    # Compare whole RGBA pixels as uint32 first; only pixels that differ at
+    # all need the per-channel threshold.
+    differs = a.view(np.uint32)[..., 0] != b.view(np.uint32)[..., 0]
+    common = np.zeros((common_h, common_w), dtype=bool)
+    if differs.mean() > 0.25:
+        delta = np.maximum(a, b) - np.minimum(a, b)
+        common = delta.max(axis=2) > threshold
+    elif differs.any():
+        a_px = a[differs]
+        b_px = b[differs]
+        # max - min stays within uint8, avoiding a signed copy of the pixels.
+        delta = np.maximum(a_px, b_px) - np.minimum(a_px, b_px)
+        common[differs] = delta.max(axis=1) > threshold
+    mask[:common_h, :common_w] = common
+    return mask
+
+
+def label_regions(mask, cell: int = DEFAULT_CELL) -> List[PixelRegion]:
+    """Group changed pixels into regions of 8-connected ``cell``-sized cells.
+
+    Regions are returned top to bottom, then left to right, with bounding
+    boxes tightened to the changed pixels they contain.
+    """
+    import numpy as np
+
+    height, width = mask.shape
+    rows = -(-height // cell)
+    cols = -(-width // cell)
+    padded = np.zeros((rows * cell, cols * cell), dtype=bool)
+    padded[:height, :width] = mask
+    cells = padded.reshape(rows, cell, cols, cell).any(axis=(1, 3))
+
+    # Plain lists are much faster than NumPy scalar indexing in the flood fill.
+    grid = cells.tolist()
+    marks = [[0] * cols for _ in range(rows)]
+    boxes: List[Tuple[int, int, int, int]] = []
+    for r_start, c_start in zip(*(idx.tolist() for idx in np.nonzero(cells))):
+        if marks[r_start][c_start]:
+            continue
+        label = len(boxes) + 1
+        marks[r_start][c_start] = label
+        stack = [(r_start, c_start)]
+        r0, c0, r1, c1 = r_start, c_start, r_start, c_start
+        while stack:
+            r, c = stack.pop()
+            r0, r1 = min(r0, r), max(r1, r)
+            c0, c1 = min(c0, c), max(c1, c)
+            for nr in (r - 1, r, r + 1):
+                if nr < 0 or nr >= rows:
+                    continue
+                row, row_marks = grid[nr], marks[nr]
+                for nc in (c - 1, c, c + 1):
+                    if 0 <= nc < cols and row[nc] and not row_marks[nc]:
+                        row_marks[nc] = label
+                        stack.append((nr, nc))
+        boxes.append((r0, c0, r1, c1))
+
+    labels = np.array(marks, dtype=np.int32).reshape(rows, cols)
+    regions = []
+    for label, (r0, c0, r1, c1) in enumerate(boxes, start=1):
+        owned = labels[r0:r1 + 1, c0:c1 + 1] == label
+        owned = owned.repeat(cell, axis=0).repeat(cell, axis=1)
+        window = padded[r0 * cell:(r1 + 1) * cell, c0 * cell:(c1 + 1) * cell] & owned
+        ys = np.flatnonzero(window.any(axis=1))
+        xs = np.flatnonzero(window.any(axis=0))
+        regions.append(PixelRegion(
+            x=c0 * cell + int(xs[0]),
+            y=r0 * cell + int(ys[0]),
+            width=int(xs[-1] - xs[0]) + 1,
+            height=int(ys[-1] - ys[0]) + 1,
+            changed_pixels=int(window.sum())
+        ))
+
+    regions.sort(key=lambda region: (region.y, region.x))
+    return regions
+
+
+def compare_pixels(old, new, threshold: int = DEFAULT_THRESHOLD,
+                   align: bool = True) -> Tuple[Any, Optional[Alignment]]:
+    """Return the change mask of two images and the alignment applied, if any.
+
+    With ``align``, a registered version of ``new`` is kept only if it
+    leaves fewer changed or uncovered pixels than the plain comparison.
+    """
+    mask = change_mask(old, new, threshold)
+    if not align or not mask.any():
+        return mask, None
+
+    alignment = estimate_alignment(old, new)
+    if alignment is None or alignment.is_identity:
+        return mask, None
+    aligned, covered = apply_alignment(new, old.shape, alignment)
+    aligned_mask = change_mask(old, aligned, threshold) & covered
+    # Uncovered pixels count against the alignment, so a large bogus shift
+    # cannot win just by leaving most of the image out of the comparison.
+    if aligned_mask.sum() + (~covered).sum() < mask.sum():
+        return aligned_mask, alignment
+    return mask, None
@@ -0,0 +1,212 @@
+"""Cell-by-cell comparison of tables with a numeric tolerance.
+
+Tables are read in chunks of rows and stored column by column: every
+column gets a float64 array (NaN where a cell is not a number) and, if
+any cell is not numeric, an object array with the cell text. Cells that
+are numbers on both sides are compared with ``rtol``/``atol`` in one
+vectorized pass per column; only the remaining cells fall back to a text
+comparison, so floating-point noise such as ``0.30000000000000004`` versus
+``0.3`` is not reported.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Same defaults as math.isclose.
+DEFAULT_RTOL = 1e-9
+DEFAULT_ATOL = 0.0
+# Rows converted to arrays at a time while a table is read.
+CHUNK_ROWS = 65536
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError(
+            "Tabular comparison needs NumPy. Install it: pip install numpy"
+        )
+    return np
+
+
+def cell_text(value: Any) -> str:
+    """Display text of a cell value; whole floats drop their ``.0``."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _to_number(value: Any) -> float:
+    if value is None or isinstance(value, bool):
+        return float('nan')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+@dataclass
+class Column:
+    """One table column: numbers where cells parse as numbers, text otherwise."""
+    name: str
+    numbers: Any
+    text: Optional[Any] = None
+
+    def texts(self, index) -> Any:
+        """Display text of the cells at ``index`` (an integer array)."""
+        if self.text is not None:
+            return self.text[index]
+        np = _numpy()
+        return np.array([cell_text(None if v != v else float(v)) for v in self.numbers[index]],
+                        dtype=object)
+
+
+@dataclass
+class Table:
+    """A table read column by column; ``row_numbers`` are the source rows."""
+    name: str
+    columns: List[Column] = field(default_factory=list)
+    row_numbers: Any = None
+
+    @property
+    def row_count(self) -> int:
+        return 0 if self.row_numbers is None else len(self.row_numbers)
+
+    @property
+    def shape_text(self) -> str:
+        return f"[Table: {self.row_count} rows x {len(self.columns)} columns]"
+
+    def row_text(self, index: int) -> str:
+        return " | ".join(str(c.texts([index])[0]) for c in self.columns)
+
+
+def _column_chunk(values: Sequence[Any]):
+    """Convert one column of a row chunk to ``(numbers, text or None)``."""
+    np = _numpy()
+    if not any(map(bool.__instancecheck__, values)):
+        try:
+            return np.array(values, dtype=np.float64), None
+        except (TypeError, ValueError):
+            pass
+    numbers = np.fromiter((_to_number(v) for v in values), dtype=np.float64, count=len(values))
+    text = np.empty(len(values), dtype=object)
+    text[:] = [cell_text(v) for v in values]
+    # Booleans and other non-numbers are NaN here and compared by their text.
+    return numbers, text
+
+
+def load_table(name: str, rows: Iterable[Tuple[int, Sequence[Any]]],
+               chunk_rows: int = CHUNK_ROWS) -> Table:
+    """Read ``(row number, values)`` rows into a column-oriented table.
+
+    The first row with any content is the header; blank rows are skipped.
+    """
+    np = _numpy()
+    header: Optional[List[str]] = None
+    numbers: List[List[Any]] = []
+    texts: List[List[Optional[Any]]] = []
+    row_numbers: List[int] = []
+    chunk: List[Sequence[Any]] = []
+
+    def flush():
+        width = len(header)
+        padded = [
+            row if len(row) == width else tuple(row[:width]) + (None,) * (width - len(row))
+            for row in chunk
+        ]
+        for i, values in enumerate(zip(*padded)):
+            col_numbers, col_text = _column_chunk(values)
+            numbers[i].append(col_numbers)
+            texts[i].append(col_text)
+        chunk.clear()
+
+    for row_num, values in rows:
+        # Only rows with an empty cell can be blank; full rows skip the check.
+        if not all(values) and not any(v is not None and str(v).strip() for v in values):
+            continue
+        if header is None:
+            header = []
+            for i, value in enumerate(values):
+                base = text = cell_text(value).strip() or f"#{i + 1}"
+                copy = 1
+                while text in header:
+                    copy += 1
+                    text = f"{base} ({copy})"
+                header.append(text)
+            numbers = [[] for _ in header]
+            texts = [[] for _ in header]
+            continue
+        chunk.append(values)
+        row_numbers.append(row_num)
+        if len(chunk) >= chunk_rows:
+            flush()
+
+    table = Table(name=name, row_numbers=np.array(row_numbers, dtype=np.int64))
+    if header is None:
+        return table
+    if chunk:
+        flush()
+
+    for column_name, number_chunks, text_chunks in zip(header, numbers, texts):
+        if not number_chunks:
+            table.columns.append(Column(column_name, np.empty(0, dtype=np.float64)))
+            continue
+        text = None
+        if any(t is not None for t in text_chunks):
+            text = np.concatenate([
+                t if t is not None else np.array([cell_text(None if v != v else float(v)) for v in n],
+                                                 dtype=object)
+                for n, t in zip(number_chunks, text_chunks)
+            ])
+        table.columns.append(Column(column_name, np.concatenate(number_chunks), text))
+    return table
+
+
+def mismatched_cells(old: Column, new: Column, count: int,
+                     rtol: float = DEFAULT_RTOL, atol: float = DEFAULT_ATOL):
+    """Indices of the first ``count`` rows whose cells differ beyond tolerance."""
+    np = _numpy()
+    a = old.numbers[:count]
+    b = new.numbers[:count]
+    both = ~(np.isnan(a) | np.isnan(b))
+    with np.errstate(invalid='ignore'):
+        outside = np.abs(a - b) > atol + rtol * np.maximum(np.abs(a), np.abs(b))
+    mismatch = both & outside
+
+    rest = np.flatnonzero(~both)
+    if len(rest):
+        mismatch[rest] = old.texts(rest) != new.texts(rest)
+    return np.flatnonzero(mismatch)
+
+
+def iter_table_pairs(old_tables: Iterable[Tuple[str, Iterable]], new_tables: Iterable[Tuple[str, Iterable]],
+                     chunk_rows: int = CHUNK_ROWS) -> Iterator[Tuple[Optional[Table], Optional[Table]]]:
+    """Pair tables by name, in the old file's order followed by new-only tables."""
+    old = [load_table(name, rows, chunk_rows) for name, rows in old_tables]
+    new = {}
+    order = []
+    for name, rows in new_tables:
+        new[name] = load_table(name, rows, chunk_rows)
+        order.append(name)
+    for table in old:
+        yield table, new.pop(table.name, None)
+    for name in order:
+        if name in new:
+            yield None, new[name]
+
+
+def compare_columns(old: Table, new: Table) -> Tuple[List[Tuple[Column, Column]], List[Column], List[Column]]:
+    """Match columns by header name; returns ``(pairs, removed, added)``."""
+    new_by_name: Dict[str, Column] = {c.name: c for c in new.columns}
+    pairs = []
+    removed = []
+    for column in old.columns:
+        match = new_by_name.pop(column.name, None)
+        if match is None:
+            removed.append(column)
+        else:
+            pairs.append((column, match))
+    added = [c for c in new.columns if c.name in new_by_name]
+    return pairs, removed, added
@@ -0,0 +1,137 @@
+"""Structural diff over element trees flattened by ``XMLConverter``.
+
+Nodes are stored in pre-order with their subtree size, so the subtree of
+node ``i`` is ``nodes[i:i + size]``. Two subtrees with the same bottom-up
+hash are emitted as a single ``equal`` opcode without being visited.
+"""
+
+import difflib
+from typing import List, Dict, Any, Iterator, Tuple
+
+Opcode = Tuple[str, int, int, int, int]
+
+
+def _children(nodes: List[Dict[str, Any]], index: int) -> Iterator[int]:
+    child = index + 1
+    end = index + nodes[index]['size']
+    while child < end:
+        yield child
+        child += nodes[child]['size']
+
+
+def _top_level(nodes: List[Dict[str, Any]]) -> Iterator[int]:
+    index = 0
+    while index < len(nodes):
+        yield index
+        index += nodes[index]['size']
+
+
+def _label(node: Dict[str, Any]) -> tuple:
+    if node.get('id') is not None:
+        return ('id', node['tag'], node['id'])
+    return ('hash', node['hash'])
+
+
+class _OpcodeWriter:
+    """Collects opcodes in order, tracking the current position in both trees."""
+
+    def __init__(self):
+        self.opcodes: List[Opcode] = []
+        self.i = 0
+        self.j = 0
+
+    def emit(self, tag: str, i2: int, j2: int):
+        i1, j1 = self.i, self.j
+        if i1 == i2 and j1 == j2:
+            return
+        last = self.opcodes[-1] if self.opcodes else None
+        if tag == 'equal' and last is not None and last[0] == 'equal':
+            self.opcodes[-1] = ('equal', last[1], i2, last[3], j2)
+        else:
+            self.opcodes.append((tag, i1, i2, j1, j2))
+        self.i, self.j = i2, j2
+
+
+def _match_children(old: List[Dict[str, Any]], old_children: List[int],
+                    new: List[Dict[str, Any]], new_children: List[int]) -> List[tuple]:
+    """Align two sibling lists by subtree hash, then by tag/id."""
+    limit = min(len(old_children), len(new_children))
+    lo = 0
+    while lo < limit and old[old_children[lo]]['hash'] == new[new_children[lo]]['hash']:
+        lo += 1
+    hi = 0
+    while (hi < limit - lo and
+           old[old_children[-1 - hi]]['hash'] == new[new_children[-1 - hi]]['hash']):
+        hi += 1
+
+    actions = [('pair', a, b) for a, b in zip(old_children[:lo], new_children[:lo])]
+
+    old_mid = old_children[lo:len(old_children) - hi]
+    new_mid = new_children[lo:len(new_children) - hi]
+    matcher = difflib.SequenceMatcher(
+        None,
+        [_label(old[i]) for i in old_mid],
+        [_label(new[j]) for j in new_mid]
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            actions.extend(('pair', a, b) for a, b in zip(old_mid[i1:i2], new_mid[j1:j2]))
+            continue
+        paired = 0
+        if tag == 'replace':
+            for a, b in zip(old_mid[i1:i2], new_mid[j1:j2]):
+                if old[a]['tag'] == new[b]['tag']:
+                    actions.append(('pair', a, b))
+                else:
+                    actions.append(('delete', a))
+                    actions.append(('insert', b))
+                paired += 1
+        actions.extend(('delete', a) for a in old_mid[i1 + paired:i2])
+        actions.extend(('insert', b) for b in new_mid[j1 + paired:j2])
+
+    tail = len(old_children) - hi
+    actions.extend(('pair', a, b) for a, b in
+                   zip(old_children[tail:], new_children[len(new_children) - hi:]))
+    return actions
+
+
+def tree_opcodes(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> List[Opcode]:
+    """Compute difflib-style opcodes between two flattened element trees.
+
+    Args:
+        old: Node metadata in pre-order, each with ``hash``, ``node_hash``,
+            ``size``, ``tag`` and optional ``id``.
+        new: Same for the new tree.
+
+    Returns:
+        ``(tag, i1, i2, j1, j2)`` tuples covering both node lists in order.
+    """
+    writer = _OpcodeWriter()
+    stack = [('children', list(_top_level(old)), list(_top_level(new)))]
+
+    while stack:
+        action = stack.pop()
+        kind = action[0]
+
+        if kind == 'children':
+            actions = _match_children(old, action[1], new, action[2])
+            stack.extend(reversed(actions))
+
+        elif kind == 'pair':
+            i, j = action[1], action[2]
+            if old[i]['hash'] == new[j]['hash']:
+                writer.emit('equal', i + old[i]['size'], j + new[j]['size'])
+                continue
+            same_node = old[i]['node_hash'] == new[j]['node_hash']
+            writer.emit('equal' if same_node else 'replace', i + 1, j + 1)
+            stack.append(('children', list(_children(old, i)), list(_children(new, j))))
+
+        elif kind == 'delete':
+            i = action[1]
+            writer.emit('delete', i + old[i]['size'], writer.j)
+
+        elif kind == 'insert':
+            j = action[1]
+            writer.emit('insert', writer.i, j + new[j]['size'])
+
+    return writer.opcodes
@@ -0,0 +1,203 @@
+"""Order-insensitive comparison of line multisets.
+
+Lines are compared by a 64-bit BLAKE2b digest, which unlike the built-in
+``hash()`` is the same in every process, so partition files and results
+do not depend on ``PYTHONHASHSEED``. The first pass counts each side's
+digests in a dictionary, in linear time and without aligning anything.
+Digests whose counts differ between the sides point to the changed lines,
+and a second pass collects just those lines and counts their text exactly.
+Only one count per distinct digest is kept; beyond the memory budget the
+digests are spread over partition files by their leading bits and each
+partition is counted on its own, split again by the next bits if it is
+still too large.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import Counter
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Digest counts held in memory, in bytes.
+DEFAULT_MEMORY = 256 * 1024 * 1024
+# Partition files per side once the counts outgrow memory (a power of two).
+PARTITIONS = 64
+# Lines hashed per step.
+CHUNK_LINES = 1 << 20
+# Bytes of a line digest.
+DIGEST_SIZE = 8
+# Bytes held per distinct digest while counting: the key and its table slot.
+ENTRY_SIZE = 96
+
+LineSource = Callable[[], Iterable[str]]
+
+
+def _line_digest(line: str) -> bytes:
+    """Stable 8-byte digest of one line."""
+    return hashlib.blake2b(line.encode('utf-8', 'surrogatepass'), digest_size=DIGEST_SIZE).digest()
+
+
+def _chunks(lines: Iterable[str]):
+    """Yield ``(lines, digests)`` for consecutive chunks of a line stream."""
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, CHUNK_LINES))
+        if not chunk:
+            return
+        yield chunk, list(map(_line_digest, chunk))
+
+
+def _net_counts(old: Counter, new: Counter) -> Set[bytes]:
+    """Digests whose old and new counts differ."""
+    differing = {digest for digest, count in old.items() if new.get(digest, 0) != count}
+    differing.update(digest for digest in new if digest not in old)
+    return differing
+
+
+def _records(path: str) -> Iterator[List[bytes]]:
+    """Digests stored in a partition file, a chunk at a time."""
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(DIGEST_SIZE * CHUNK_LINES), b''):
+            yield [data[i:i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)]
+
+
+def _count(path: str, limit: Optional[int]) -> Optional[Counter]:
+    """Count the digests in ``path``, or None once they need more than ``limit`` bytes."""
+    counts = Counter()
+    for digests in _records(path):
+        counts.update(digests)
+        if limit is not None and len(counts) * ENTRY_SIZE > limit:
+            return None
+    return counts
+
+
+class _Partitions:
+    """Per-side digest files, split by the bits of one digest byte."""
+
+    def __init__(self, level: int = 0, directory: Optional[str] = None, count: int = PARTITIONS):
+        # Digest byte whose leading bits pick the partition.
+        self.level = level
+        self.count = count
+        self.shift = 8 - (count.bit_length() - 1)
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix='uni-diff-lines-')
+        else:
+            os.makedirs(directory)
+        self.directory = directory
+        self.files = [
+            [open(os.path.join(directory, f"{side}-{i}.bin"), 'wb') for i in range(count)]
+            for side in (0, 1)
+        ]
+
+    def write(self, side: int, digests: Iterable[bytes]):
+        buckets: List[List[bytes]] = [[] for _ in range(self.count)]
+        level, shift = self.level, self.shift
+        for digest in digests:
+            buckets[digest[level] >> shift].append(digest)
+        for f, bucket in zip(self.files[side], buckets):
+            if bucket:
+                f.write(b''.join(bucket))
+
+    def write_counts(self, side: int, counts: Counter):
+        """Write each digest as often as it was counted."""
+        files, level, shift = self.files[side], self.level, self.shift
+        for digest, count in counts.items():
+            f = files[digest[level] >> shift]
+            for done in range(0, count, CHUNK_LINES):
+                f.write(digest * min(count - done, CHUNK_LINES))
+
+    def _close_files(self):
+        for files in self.files:
+            for f in files:
+                f.close()
+
+    def differing(self, memory_limit: int) -> Set[bytes]:
+        self._close_files()
+        found: Set[bytes] = set()
+        last_level = self.level + 1 >= DIGEST_SIZE
+        for i, (old_file, new_file) in enumerate(zip(*self.files)):
+            limit = None if last_level else memory_limit
+            old = _count(old_file.name, limit)
+            new = None
+            if old is not None:
+                new = _count(new_file.name, None if limit is None else limit - len(old) * ENTRY_SIZE)
+            if new is not None:
+                found |= _net_counts(old, new)
+                continue
+
+            # Too many distinct digests: split this partition by the next byte.
+            old = new = None
+            sub = _Partitions(self.level + 1, os.path.join(self.directory, str(i)))
+            try:
+                for side, f in enumerate((old_file, new_file)):
+                    for digests in _records(f.name):
+                        sub.write(side, digests)
+                    os.remove(f.name)
+                found |= sub.differing(memory_limit)
+            finally:
+                sub.close()
+        return found
+
+    def close(self):
+        self._close_files()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _differing_digests(old_lines: LineSource, new_lines: LineSource,
+                       memory_limit: int) -> Tuple[Set[bytes], List[int]]:
+    """First pass: count the digests of both sides.
+
+    Returns the digests whose counts differ and the line totals.
+    """
+    counts = (Counter(), Counter())
+    totals = [0, 0]
+    partitions = None
+    try:
+        for side, source in enumerate((old_lines, new_lines)):
+            for _, digests in _chunks(source()):
+                totals[side] += len(digests)
+                if partitions is not None:
+                    partitions.write(side, digests)
+                    continue
+                counts[side].update(digests)
+                if (len(counts[0]) + len(counts[1])) * ENTRY_SIZE > memory_limit:
+                    partitions = _Partitions()
+                    for spilled_side, spilled in enumerate(counts):
+                        partitions.write_counts(spilled_side, spilled)
+                        spilled.clear()
+
+        if partitions is not None:
+            differing = partitions.differing(memory_limit)
+        else:
+            differing = _net_counts(*counts)
+    finally:
+        if partitions is not None:
+            partitions.close()
+    return differing, totals
+
+
+def count_differences(old_lines: LineSource, new_lines: LineSource,
+                      memory_limit: int = DEFAULT_MEMORY) -> Tuple[List[Tuple[str, int, int]], int, int]:
+    """Compare two line multisets.
+
+    ``old_lines`` and ``new_lines`` are callables returning a fresh line
+    iterator, since each side is read twice. Returns ``(differences,
+    old_total, new_total)``, where differences are ``(line, old count,
+    new count)`` for every line whose counts differ, sorted by line.
+    """
+    differing, totals = _differing_digests(old_lines, new_lines, memory_limit)
+
+    counts = (Counter(), Counter())
+    for side, source in enumerate((old_lines, new_lines)):
+        if not differing:
+            break
+        for chunk, digests in _chunks(source()):
+            counts[side].update(line for line, digest in zip(chunk, digests) if digest in differing)
+
+    old, new = counts
+    differences = [(line, old[line], new[line]) for line in old.keys() | new.keys()
+                   if old[line] != new[line]]
+    differences.sort()
+    return differences, totals[0], totals[1]
@@ -38,8 +38,9 @@ setup(
         "docx": ["python-docx>=0.8.0"],
         "xlsx": ["openpyxl>=3.0.0"],
         "pptx": ["python-pptx>=0.6.0"],
-        "image": ["Pillow>=9.0.0", "pytesseract>=0.3.0"],
+        "image": ["Pillow>=9.0.0", "pytesseract>=0.3.0", "numpy>=1.20.0"],
         "png": ["Pillow>=9.0.0"],
+        "tables": ["numpy>=1.20.0"],
         "all": [
             "pymupdf>=1.20.0",
             "python-docx>=0.8.0",
@@ -47,6 +48,7 @@ setup(
             "python-pptx>=0.6.0",
             "Pillow>=9.0.0",
             "pytesseract>=0.3.0",
+            "numpy>=1.20.0",
         ],
     },
     entry_points={
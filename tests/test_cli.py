@@ -137,6 +137,49 @@ class TestCLITextFiles(unittest.TestCase):
         
         self.assertIn(result.returncode, (0, 1))
 
+    def test_csv_columns_option(self):
+        """Test --columns limits the comparison to the selected columns."""
+        old_path = os.path.join(FIXTURES_DIR, 'text', 'old.csv')
+        new_path = os.path.join(FIXTURES_DIR, 'text', 'new.csv')
+
+        result = self.run_cli([old_path, new_path, '--columns', 'id,email', '--no-cache', '-f', 'json'])
+
+        self.assertEqual(result.returncode, 1)
+        data = json.loads(result.stdout)
+        self.assertEqual(data['summary']['stats']['modifications'], 0)
+        self.assertNotIn('85', result.stdout)
+
+    def test_csv_tolerance_option(self):
+        """Test --rtol compares CSV cells and reports only changes beyond tolerance."""
+        old_path = os.path.join(FIXTURES_DIR, 'text', 'old.csv')
+        new_path = os.path.join(FIXTURES_DIR, 'text', 'new.csv')
+
+        result = self.run_cli([old_path, new_path, '--rtol', '0.04', '-f', 'json'])
+
+        self.assertEqual(result.returncode, 1)
+        changes = [h['metadata'] for h in json.loads(result.stdout)['changes_only']]
+        self.assertEqual([(c['type'], c.get('row')) for c in changes],
+                         [('table', None), ('cell', 4), ('row', 5)])
+
+    def test_csv_key_option(self):
+        """Test --key matches CSV rows by key column regardless of order."""
+        new_path = os.path.join(FIXTURES_DIR, 'text', 'new.csv')
+        with open(new_path) as f:
+            lines = f.read().splitlines()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            shuffled = os.path.join(tmp_dir, 'shuffled.csv')
+            with open(shuffled, 'w') as f:
+                f.write('\n'.join([lines[0]] + lines[:0:-1]) + '\n')
+            result = self.run_cli([new_path, shuffled, '--key', 'id', '-s'])
+            self.assertEqual(result.returncode, 0)
+
+            result = self.run_cli([new_path, shuffled, '-s'])
+            self.assertEqual(result.returncode, 1)
+
+            result = self.run_cli([new_path, shuffled, '--unordered', '-s'])
+            self.assertEqual(result.returncode, 0)
+
     def test_html_diff(self):
         """Test HTML file diff."""
         old_path = os.path.join(FIXTURES_DIR, 'text', 'old.html')
@@ -295,6 +338,47 @@ class TestCLIOptions(unittest.TestCase):
             if os.path.exists(output_path):
                 os.unlink(output_path)
 
+    def test_tree_option(self):
+        """Test --tree option."""
+        old_path = os.path.join(FIXTURES_DIR, 'text', 'old.xml')
+        new_path = os.path.join(FIXTURES_DIR, 'text', 'new.xml')
+
+        result = self.run_cli([old_path, new_path, '--tree', '-f', 'json'])
+
+        self.assertEqual(result.returncode, 1)
+        data = json.loads(result.stdout)
+        self.assertTrue(any('xpath' in h['metadata'] for h in data['changes_only']))
+
+    def test_pixel_option(self):
+        """Test --pixel reports changed image regions."""
+        old_path = os.path.join(FIXTURES_DIR, 'images', 'old.png')
+        new_path = os.path.join(FIXTURES_DIR, 'images', 'new.png')
+
+        result = self.run_cli([old_path, new_path, '--pixel', '--no-cache', '-f', 'json'])
+
+        if result.returncode == 2:
+            self.skipTest(f"Pixel comparison not available: {result.stderr}")
+        self.assertEqual(result.returncode, 1)
+        data = json.loads(result.stdout)
+        self.assertTrue(all(len(h['metadata']['bbox']) == 4 for h in data['changes_only']
+                            if h['metadata'].get('type') == 'pixel_region'))
+
+    def test_cache_dir_option(self):
+        """Test --cache-dir stores results and --no-cache bypasses them."""
+        old_path = os.path.join(FIXTURES_DIR, 'text', 'old.xml')
+        new_path = os.path.join(FIXTURES_DIR, 'text', 'new.xml')
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            result = self.run_cli([old_path, new_path, '--tree', '--no-cache',
+                                   '--cache-dir', cache_dir, '-s'])
+            self.assertEqual(result.returncode, 1)
+            self.assertEqual(os.listdir(cache_dir), [])
+
+            result = self.run_cli([old_path, new_path, '--tree',
+                                   '--cache-dir', cache_dir, '-s'])
+            self.assertEqual(result.returncode, 1)
+            self.assertNotEqual(os.listdir(cache_dir), [])
+
     def test_block_diff_option(self):
         """Test --block-diff option."""
         old_path = os.path.join(FIXTURES_DIR, 'text', 'old.md')
@@ -345,6 +429,20 @@ class TestCLIOfficeFiles(unittest.TestCase):
         
         self.assertIn(result.returncode, (0, 1, 2))
 
+    def test_docx_unordered_streamed(self):
+        """Test --unordered hashes DOCX lines as they are converted."""
+        old_path = os.path.join(FIXTURES_DIR, 'office', 'old.docx')
+        new_path = os.path.join(FIXTURES_DIR, 'office', 'new.docx')
+
+        if not os.path.exists(old_path):
+            self.skipTest("DOCX fixtures not generated")
+
+        result = self.run_cli([old_path, old_path, '--unordered', '-s', '--no-cache'])
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        result = self.run_cli([old_path, new_path, '--unordered', '-f', 'json', '--no-cache'])
+        self.assertEqual(result.returncode, 1, result.stderr)
+
     def test_pptx_diff(self):
         """Test PowerPoint file diff."""
         old_path = os.path.join(FIXTURES_DIR, 'office', 'old.pptx')
@@ -6,8 +6,9 @@ import unittest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from converters import get_converter, TextConverter
-from converters.base import ConvertedDocument, TextBlock
+from converters import get_converter, TextConverter, XMLConverter, ConversionCache
+from converters.base import BlockStore, ConvertedDocument, TextBlock
+from converters.cache import file_digest
 
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
 
@@ -70,6 +71,29 @@ class TestTextConverter(unittest.TestCase):
         
         self.assertIn('id,name,email,score', doc.full_text)
 
+    def test_csv_column_projection(self):
+        """Test only the selected CSV columns are kept."""
+        path = os.path.join(FIXTURES_DIR, 'text', 'old.csv')
+        converter = get_converter(path)
+        converter.columns = ['name', '4']
+        doc = converter.convert(path)
+
+        self.assertEqual(doc.full_text.split('\n')[:2], ['name,score', 'Alice,85'])
+        self.assertNotIn('alice@example.com', doc.full_text)
+
+        converter.columns = ['phone']
+        with self.assertRaises(RuntimeError):
+            converter.convert(path)
+
+    def test_csv_column_fallback_within_header(self):
+        """Test letters and numbers only select columns the header has."""
+        from converters.csv_converter import resolve_columns
+        header = ['id', 'name', 'email', 'score']
+        self.assertEqual(resolve_columns(header, ['B', 'd', '3']), [1, 3, 2])
+        for selector in ('age', 'nam', 'E', '5'):
+            with self.assertRaisesRegex(RuntimeError, f'Column not found: {selector}'):
+                resolve_columns(header, [selector])
+
     def test_html_conversion(self):
         """Test HTML file conversion."""
         path = os.path.join(FIXTURES_DIR, 'text', 'old.html')
@@ -134,6 +158,77 @@ class TestTextConverter(unittest.TestCase):
             self.assertIn('line_number', block.metadata)
             self.assertIsInstance(block.metadata['line_number'], int)
 
+    def test_encoding_detection(self):
+        """Test the encoding is detected once and recorded in metadata."""
+        import shutil
+        import tempfile
+        samples = {
+            'utf-8': 'naïve café\r\nline two\n'.encode('utf-8'),
+            'utf-8-sig': '\ufeffnaïve café\r\nline two\n'.encode('utf-8'),
+            'utf-16': 'naïve café\r\nline two\n'.encode('utf-16'),
+            'utf-16-le': 'naïve café\r\nline two\n'.encode('utf-16-le'),
+            'cp1252': '“naïve” café\r\nline two\n'.encode('cp1252'),
+            'latin-1': 'naïve café\x81\r\nline two\n'.encode('latin-1'),
+        }
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            for encoding, data in samples.items():
+                path = os.path.join(tmp_dir, f'{encoding}.txt')
+                with open(path, 'wb') as f:
+                    f.write(data)
+                doc = TextConverter().convert(path)
+                self.assertEqual(doc.metadata['encoding'], encoding)
+                self.assertIn('café', doc.blocks[0].text)
+                self.assertEqual(doc.full_text.split('\n')[1], 'line two')
+                self.assertEqual(list(TextConverter().iter_lines(path))[0], doc.blocks[0].text)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_block_store(self):
+        """Test text blocks are kept in columns and read back as TextBlock."""
+        doc = TextConverter().convert(os.path.join(FIXTURES_DIR, 'text', 'old.txt'))
+        lines = doc.full_text.split('\n')
+        self.assertIsInstance(doc.blocks, BlockStore)
+        self.assertEqual(len(doc.blocks), len(lines))
+        self.assertEqual(doc.blocks[1], TextBlock(
+            text=lines[1], page=0, x=0.0, y=12.0, width=len(lines[1]) * 7.0,
+            height=12.0, metadata={'line_number': 2}
+        ))
+        self.assertEqual([b.text for b in doc.blocks], lines)
+        self.assertEqual([b.text for b in doc.blocks[-2:]], lines[-2:])
+        self.assertEqual([b.metadata['line_number'] for b in doc.blocks.line_range(1, 3)], [2, 3])
+
+        # Copies handed out do not change the store.
+        doc.blocks[0].metadata['line_number'] = 99
+        self.assertEqual(doc.blocks[0].metadata, {'line_number': 1})
+
+        store = BlockStore()
+        store.add('first', page=1, x=5.0, metadata={'type': 'heading'})
+        store.add('second', page=1, metadata={'type': 'heading'})
+        store.add('third', metadata={'cells': ['a', 'b']})
+        self.assertEqual(store.text, 'firstsecondthird')
+        self.assertEqual(len(store._metadata), 2)
+        self.assertFalse(store.lines_sorted)
+
+        restored = ConvertedDocument.from_dict(ConvertedDocument(blocks=store).to_dict())
+        self.assertEqual(list(restored.blocks), list(store))
+
+    def test_block_store_line_range_unnumbered(self):
+        """Test blocks without line numbers are found by position as the engine expects."""
+        from diff import DiffEngine
+        blocks = [TextBlock(f'p{i}', y=i * 14.0, metadata={'style': 'Normal'}) for i in range(50)]
+        blocks[7].metadata['line_number'] = 3
+        store = BlockStore()
+        store.extend(blocks)
+        self.assertFalse(store.lines_sorted)
+
+        engine = DiffEngine()
+        for start, end in ((0, 1), (2, 9), (10, 10), (20, 45), (0, 60)):
+            self.assertEqual(engine._find_blocks_in_range(store, start, end),
+                             engine._find_blocks_in_range(blocks, start, end))
+        store.add('late', y=0.0)
+        self.assertEqual(store.line_range(0, 1)[-1].text, 'late')
+
     def test_file_not_found(self):
         """Test handling of non-existent files."""
         converter = TextConverter()
@@ -141,6 +236,195 @@ class TestTextConverter(unittest.TestCase):
             converter.convert('/nonexistent/file.txt')
 
 
+class TestXMLConverter(unittest.TestCase):
+    """Tests for XMLConverter."""
+
+    def test_tree_converter_selected(self):
+        """Test get_converter returns XMLConverter in tree mode only."""
+        path = os.path.join(FIXTURES_DIR, 'text', 'old.xml')
+        self.assertIsInstance(get_converter(path), TextConverter)
+        self.assertIsInstance(get_converter(path, tree=True), XMLConverter)
+
+    def test_xml_elements(self):
+        """Test one block per element with XPath and subtree size."""
+        path = os.path.join(FIXTURES_DIR, 'text', 'old.xml')
+        doc = XMLConverter().convert(path)
+
+        self.assertEqual(doc.source_type, 'xml')
+        self.assertEqual(doc.blocks[0].metadata['xpath'], '/root')
+        self.assertEqual(doc.blocks[0].metadata['size'], len(doc.blocks))
+        self.assertIn("/root/item[@id='1']/name[1]: First Item", doc.full_text)
+
+    def test_html_elements(self):
+        """Test HTML is parsed into elements despite void tags."""
+        path = os.path.join(FIXTURES_DIR, 'text', 'new.html')
+        doc = XMLConverter().convert(path)
+
+        self.assertEqual(doc.metadata['syntax'], 'html')
+        self.assertIn('/html/head[1]/title[1]: Test Page - Updated', doc.full_text)
+
+    def test_malformed_xml_falls_back_to_text(self):
+        """Test malformed XML is converted as plain text."""
+        import tempfile
+        with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as f:
+            f.write('<root><unclosed></root>')
+            path = f.name
+        try:
+            doc = XMLConverter().convert(path)
+            self.assertEqual(doc.source_type, 'text')
+        finally:
+            os.unlink(path)
+
+    def test_mixed_content_and_quoted_ids(self):
+        """Test text around children is kept and ids with quotes stay valid XPath."""
+        import tempfile
+        with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as f:
+            f.write('<root>a<b id="it\'s">x</b>c<b id=\'say "it&apos;s"\'/>d</root>')
+            path = f.name
+        try:
+            doc = XMLConverter().convert(path)
+            xpaths = [block.metadata['xpath'] for block in doc.blocks]
+            self.assertEqual(xpaths, [
+                '/root',
+                '/root/b[@id="it\'s"]',
+                '/root/b[@id=concat(\'say "it\', "\'", \'s"\')]',
+            ])
+            self.assertIn('/root: acd', doc.full_text)
+            self.assertEqual(doc.blocks[0].metadata['size'], 3)
+        finally:
+            os.unlink(path)
+
+    def test_xpath_positions_and_namespaces(self):
+        """Test positions count siblings with ids and namespaced steps select their element."""
+        import tempfile
+        samples = {
+            '<root><item id="x">1</item><item>2</item><item>3</item></root>':
+                ["/root", "/root/item[@id='x']", "/root/item[2]", "/root/item[3]"],
+            '<r:root xmlns:r="urn:r"><r:a/><a/><r:a/></r:root>':
+                ["/r:root", "/r:root/r:a[1]", "/r:root/a[1]", "/r:root/r:a[2]"],
+            '<root xmlns="urn:d"><a/><b/><a/></root>':
+                ["/*[local-name()='root']", "/*[local-name()='root']/*[local-name()='a'][1]",
+                 "/*[local-name()='root']/*[local-name()='b'][1]",
+                 "/*[local-name()='root']/*[local-name()='a'][2]"],
+        }
+        for xml, expected in samples.items():
+            with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as f:
+                f.write(xml)
+                path = f.name
+            try:
+                doc = XMLConverter().convert(path)
+                self.assertEqual([block.metadata['xpath'] for block in doc.blocks], expected)
+            finally:
+                os.unlink(path)
+
+
+class TestToolOutput(unittest.TestCase):
+    """Tests for streaming the output of external tools."""
+
+    def test_lines_stream_into_document(self):
+        """Test output lines become blocks with the captured text as full_text."""
+        from converters.process import output_lines
+        script = 'print("first"); print(); print("second")'
+        lines = output_lines([sys.executable, '-c', script])
+        self.assertEqual(next(lines), 'first')
+
+        doc = ConvertedDocument.from_lines(lines, source_type='docx')
+        self.assertEqual(doc.full_text, '\nsecond\n')
+        self.assertEqual([(b.text, b.y) for b in doc.blocks], [('second', 12.0)])
+
+        doc = ConvertedDocument.from_lines(output_lines([sys.executable, '-c', script]))
+        self.assertEqual(doc.full_text, 'first\n\nsecond\n')
+        self.assertEqual([(b.text, b.y, b.width) for b in doc.blocks],
+                         [('first', 0.0, 35.0), ('second', 24.0, 42.0)])
+
+    def test_failures_and_limits(self):
+        """Test exit status, timeout and output size are enforced."""
+        from converters.process import output_lines
+        failing = 'import sys; print("partial"); sys.exit("tool broke")'
+        with self.assertRaisesRegex(RuntimeError, 'tool broke'):
+            list(output_lines([sys.executable, '-c', failing]))
+
+        with self.assertRaisesRegex(RuntimeError, 'timed out'):
+            list(output_lines([sys.executable, '-c', 'import time; time.sleep(30)'], timeout=0.5))
+
+        with self.assertRaisesRegex(RuntimeError, 'exceeds'):
+            list(output_lines([sys.executable, '-c', 'print("x" * 100000)'], max_output=1000))
+
+        with self.assertRaises(FileNotFoundError):
+            list(output_lines(['uni-diff-no-such-tool']))
+
+
+class TestConversionCache(unittest.TestCase):
+    """Tests for the on-disk conversion cache."""
+
+    def setUp(self):
+        import tempfile
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = ConversionCache(self.cache_dir)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_warm_run_skips_conversion(self):
+        """Test a cached result is returned without converting again."""
+        path = os.path.join(FIXTURES_DIR, 'text', 'old.xml')
+        converter = XMLConverter()
+        first = self.cache.convert(converter, path)
+
+        calls = []
+        converter.convert = lambda p: calls.append(p)
+        second = self.cache.convert(converter, path)
+
+        self.assertEqual(calls, [])
+        self.assertEqual(second.full_text, first.full_text)
+        self.assertEqual(second.to_dict(), first.to_dict())
+
+    def test_options_change_key(self):
+        """Test converter options are part of the cache key."""
+        from converters import ImageConverter
+        path = os.path.join(FIXTURES_DIR, 'text', 'old.txt')
+        self.assertNotEqual(
+            self.cache.key_for(ImageConverter(use_ocr=True), path),
+            self.cache.key_for(ImageConverter(use_ocr=False), path)
+        )
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted over the size limit."""
+        import time
+        self.cache.max_size = 300
+        self.cache.put('aa01', {'payload': 'x' * 100})
+        self.cache.put('aa02', {'payload': 'y' * 100})
+        past = time.time() - 60
+        os.utime(self.cache._path('aa01'), (past, past))
+        os.utime(self.cache._path('aa02'), (past - 60, past - 60))
+        self.cache.get('aa01')
+        self.cache.put('aa03', {'payload': 'z' * 100})
+
+        self.assertIsNotNone(self.cache.get('aa01'))
+        self.assertIsNone(self.cache.get('aa02'))
+        self.assertIsNotNone(self.cache.get('aa03'))
+
+    def test_eviction_walks_only_over_limit(self):
+        """Test the size is tracked so writes under the limit do not walk the cache."""
+        from unittest import mock
+        import converters.cache as cache_module
+        self.cache.max_size = 1000
+        with mock.patch.object(cache_module.os, 'walk', wraps=os.walk) as walk:
+            for i in range(8):
+                self.cache.put(f'aa{i:02d}', {'payload': 'x' * 100})
+            self.assertEqual(walk.call_count, 1)
+            self.cache.put('aa00', {'payload': 'x' * 50})
+            self.cache.put_many({'aa08': {'payload': 'x' * 100}, 'aa09': {'payload': 'x' * 100}})
+            self.assertEqual(walk.call_count, 2)
+
+        self.assertLessEqual(self.cache._size, 900)
+        self.assertEqual(self.cache._size, sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, files in os.walk(self.cache_dir) for name in files
+        ))
+
+
 class TestOfficeConverters(unittest.TestCase):
     """Tests for Office document converters (optional)."""
 
@@ -177,6 +461,131 @@ class TestOfficeConverters(unittest.TestCase):
         except ImportError:
             self.skipTest("python-docx not installed")
 
+    def test_docx_body_order_and_pages(self):
+        """Test tables stay in body order and page breaks advance the page."""
+        import shutil
+        import tempfile
+        try:
+            from docx import Document
+            from docx.enum.text import WD_BREAK
+        except ImportError:
+            self.skipTest("python-docx not installed")
+        from converters import DOCXConverter
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'order.docx')
+            document = Document()
+            document.add_heading('Contract', 1)
+            table = document.add_table(rows=1, cols=2)
+            table.rows[0].cells[0].text = 'Price'
+            table.rows[0].cells[1].text = '100'
+            document.add_paragraph('Terms').add_run().add_break(WD_BREAK.PAGE)
+            document.add_paragraph('Signature')
+            document.save(path)
+
+            doc = DOCXConverter().convert(path)
+
+            self.assertEqual(doc.full_text, "Contract\nPrice | 100\nTerms\nSignature\n")
+            self.assertEqual([b.page for b in doc.blocks], [0, 0, 0, 1])
+            self.assertEqual(doc.blocks[0].metadata['style'], 'Heading 1')
+            self.assertEqual(doc.blocks[1].metadata['type'], 'table_row')
+            self.assertEqual(doc.page_count, 2)
+
+            from converters.base import PageBreak
+            items = [(item.page, None) if isinstance(item, PageBreak) else (item.page, item.text)
+                     for item in DOCXConverter().iter_blocks(path)]
+            self.assertEqual(items, [(0, None), (0, 'Contract'), (0, 'Price | 100'),
+                                     (0, 'Terms'), (1, None), (1, 'Signature')])
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_docx_alternate_content_once(self):
+        """Test a text box stored as mc:Choice and mc:Fallback is read once."""
+        import tempfile
+        import zipfile
+        from converters import DOCXConverter
+
+        w = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+        body = (
+            f'<w:document xmlns:w="{w}"'
+            ' xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+            ' xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"'
+            ' xmlns:v="urn:schemas-microsoft-com:vml"><w:body>'
+            '<w:p><w:r><w:t>Before</w:t></w:r></w:p>'
+            '<w:p><w:r><mc:AlternateContent>'
+            '<mc:Choice Requires="wps"><wps:txbx><w:txbxContent>'
+            '<w:p><w:r><w:t>Boxed</w:t></w:r></w:p></w:txbxContent></wps:txbx></mc:Choice>'
+            '<mc:Fallback><v:textbox><w:txbxContent>'
+            '<w:p><w:r><w:t>Boxed</w:t></w:r></w:p></w:txbxContent></v:textbox></mc:Fallback>'
+            '</mc:AlternateContent></w:r></w:p>'
+            '<w:p><w:r><w:t>After</w:t></w:r></w:p>'
+            '</w:body></w:document>'
+        )
+        with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as f:
+            path = f.name
+        try:
+            with zipfile.ZipFile(path, 'w') as zf:
+                zf.writestr('word/document.xml', body)
+            doc = DOCXConverter().convert(path)
+            self.assertEqual(doc.full_text, 'Before\nBoxed\nAfter\n')
+        finally:
+            os.unlink(path)
+
+    def test_office_pictures_by_media_hash(self):
+        """Test pictures become image blocks that change only with their media."""
+        import io
+        import shutil
+        import tempfile
+        try:
+            from docx import Document
+            from pptx import Presentation
+            from pptx.util import Inches
+            from PIL import Image
+        except ImportError:
+            self.skipTest("python-docx, python-pptx or Pillow not installed")
+        from converters import DOCXConverter, PPTXConverter
+
+        def png(color):
+            data = io.BytesIO()
+            Image.new('RGB', (40, 30), color).save(data, 'PNG')
+            data.seek(0)
+            return data
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            docs = {}
+            for name, color in (('red', (255, 0, 0)), ('red2', (255, 0, 0)), ('blue', (0, 0, 255))):
+                document = Document()
+                document.add_paragraph('Chart')
+                document.add_picture(png(color), width=Inches(2))
+                path = os.path.join(tmp_dir, f'{name}.docx')
+                document.save(path)
+
+                prs = Presentation()
+                slide = prs.slides.add_slide(prs.slide_layouts[6])
+                slide.shapes.add_picture(png(color), Inches(1), Inches(2), Inches(3))
+                deck = os.path.join(tmp_dir, f'{name}.pptx')
+                prs.save(deck)
+
+                docs[name] = (DOCXConverter().convert(path), PPTXConverter().convert(deck))
+
+            for index in (0, 1):
+                red, red2, blue = (docs[name][index] for name in ('red', 'red2', 'blue'))
+                images = [b for b in red.blocks if b.metadata.get('type') == 'image']
+                self.assertEqual(len(images), 1)
+                self.assertTrue(images[0].text.startswith('[Image: png, '))
+                self.assertEqual(red.full_text, red2.full_text)
+                self.assertNotEqual(red.full_text, blue.full_text)
+
+            word_image = docs['red'][0].blocks[1]
+            self.assertEqual((word_image.width, word_image.metadata['paragraph']), (144, 2))
+            slide_image = docs['red'][1].blocks[1]
+            self.assertEqual((slide_image.x, slide_image.y, slide_image.width), (1, 2, 3))
+            self.assertEqual(slide_image.metadata['part'], 'ppt/media/image1.png')
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
     def test_xlsx_conversion(self):
         """Test Excel file conversion."""
         path = os.path.join(FIXTURES_DIR, 'office', 'old.xlsx')
@@ -192,6 +601,160 @@ class TestOfficeConverters(unittest.TestCase):
         except ImportError:
             self.skipTest("openpyxl not installed")
 
+    def test_xlsx_streaming_without_openpyxl(self):
+        """Test the direct sheet XML reader matches the openpyxl read-only path."""
+        import shutil
+        import tempfile
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            self.skipTest("openpyxl not installed")
+        from converters import XLSXConverter
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'book.xlsx')
+            wb = Workbook()
+            ws = wb.active
+            ws.title = 'Data'
+            ws.append(['Name', 'Value', None, None])
+            ws.append(['Item', 0.1 + 0.2, True, None])
+            ws.append([])
+            ws.append([None, 7, None, 'x'])
+            wb.create_sheet('Empty')
+            wb.save(path)
+
+            converter = XLSXConverter()
+            doc = converter.convert(path)
+
+            def no_openpyxl(file_path):
+                raise ImportError
+
+            converter._sheets_openpyxl = no_openpyxl
+            streamed = converter.convert(path)
+
+            self.assertEqual(doc.full_text, streamed.full_text)
+            self.assertIn("Name | Value\n", doc.full_text)
+            self.assertIn(" | 7 |  | x\n", doc.full_text)
+            self.assertEqual([b.metadata['row'] for b in streamed.blocks if b.metadata.get('type') == 'row'],
+                             [1, 2, 4])
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_xlsx_unchanged_sheets_reused(self):
+        """Test sheets whose package parts match are taken from the part cache."""
+        import shutil
+        import tempfile
+        try:
+            from openpyxl import Workbook, load_workbook
+        except ImportError:
+            self.skipTest("openpyxl not installed")
+        from converters import XLSXConverter, MemoryCache
+        from converters.package import unchanged_parts
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            old_path = os.path.join(tmp_dir, 'old.xlsx')
+            new_path = os.path.join(tmp_dir, 'new.xlsx')
+            wb = Workbook()
+            wb.active.title = 'First'
+            wb.active.append(['id', 'value'])
+            wb.active.append([1, 10])
+            second = wb.create_sheet('Second')
+            second.append(['id', 'value'])
+            second.append([2, 20])
+            wb.save(old_path)
+            wb = load_workbook(old_path)
+            wb['Second']['B2'] = 25
+            wb.save(new_path)
+
+            self.assertIn('xl/worksheets/sheet1.xml', unchanged_parts(old_path, new_path))
+            self.assertNotIn('xl/worksheets/sheet2.xml', unchanged_parts(old_path, new_path))
+
+            cache = MemoryCache()
+            XLSXConverter(cache=cache).convert(old_path)
+            converter = XLSXConverter(cache=cache)
+            parsed = []
+            row_blocks = converter._row_blocks
+            converter._row_blocks = lambda name, rows, page: parsed.append(name) or row_blocks(name, rows, page)
+            doc = converter.convert(new_path)
+
+            self.assertEqual(parsed, ['Second'])
+            self.assertEqual(doc.full_text, XLSXConverter().convert(new_path).full_text)
+            self.assertIn("2 | 25\n", doc.full_text)
+            self.assertEqual(doc.blocks[1].page, 0)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_xlsx_sheet_and_column_selection(self):
+        """Test unselected sheets and columns are dropped on both read paths."""
+        import shutil
+        import tempfile
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            self.skipTest("openpyxl not installed")
+        from converters import XLSXConverter
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'book.xlsx')
+            wb = Workbook()
+            ws = wb.active
+            ws.title = 'Notes'
+            ws.append(['skip me'])
+            ws = wb.create_sheet('Data')
+            ws.append([])
+            ws.append(['id', 'secret', 'total'])
+            ws.append([1, 'hidden', 9.5])
+            ws.append([2, 'hidden', 3])
+            wb.save(path)
+
+            converter = XLSXConverter(sheets=['Data'], columns=['total', 'A'])
+            doc = converter.convert(path)
+
+            def no_openpyxl(file_path):
+                raise ImportError
+
+            converter._sheets_openpyxl = no_openpyxl
+            streamed = converter.convert(path)
+
+            expected = "=== Sheet: Data ===\ntotal | id\n9.5 | 1\n3 | 2\n\n"
+            self.assertEqual(doc.full_text, expected)
+            self.assertEqual(streamed.full_text, expected)
+
+            with self.assertRaises(RuntimeError):
+                XLSXConverter(sheets=['Missing']).convert(path)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_iter_blocks_matches_convert(self):
+        """Test streamed blocks and page breaks match the converted document."""
+        from converters import DOCXConverter, PDFConverter, PPTXConverter, XLSXConverter
+        from converters.base import PageBreak, block_lines
+        cases = [
+            (TextConverter(), os.path.join(FIXTURES_DIR, 'text', 'old.txt')),
+            (PDFConverter(), os.path.join(FIXTURES_DIR, 'pdf', 'old.pdf')),
+            (XLSXConverter(), os.path.join(FIXTURES_DIR, 'office', 'old.xlsx')),
+            (DOCXConverter(), os.path.join(FIXTURES_DIR, 'office', 'old.docx')),
+            (PPTXConverter(), os.path.join(FIXTURES_DIR, 'office', 'old.pptx')),
+        ]
+        for converter, path in cases:
+            if not os.path.exists(path):
+                continue
+            try:
+                doc = converter.convert(path)
+            except (ImportError, RuntimeError):
+                continue
+            items = list(converter.iter_blocks(path))
+            breaks = [item.page for item in items if isinstance(item, PageBreak)]
+            self.assertEqual(breaks, list(range(doc.page_count)), path)
+            self.assertIsInstance(items[0], PageBreak)
+            self.assertEqual([item for item in items if not isinstance(item, PageBreak)],
+                             list(doc.blocks), path)
+            self.assertEqual([line for line in block_lines(items) if line.strip()],
+                             [line for line in doc.full_text.split('\n') if line.strip()], path)
+
     def test_pptx_conversion(self):
         """Test PowerPoint file conversion."""
         path = os.path.join(FIXTURES_DIR, 'office', 'old.pptx')
@@ -207,6 +770,52 @@ class TestOfficeConverters(unittest.TestCase):
         except ImportError:
             self.skipTest("python-pptx not installed")
 
+    def test_pptx_slide_xml_reader(self):
+        """Test the direct slide XML reader matches python-pptx, serially and in parallel."""
+        import shutil
+        import tempfile
+        try:
+            from pptx import Presentation
+            from pptx.util import Inches
+        except ImportError:
+            self.skipTest("python-pptx not installed")
+        from converters import PPTXConverter
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'deck.pptx')
+            prs = Presentation()
+            for i in range(20):
+                slide = prs.slides.add_slide(prs.slide_layouts[1])
+                slide.shapes.title.text = f"Title {i}"
+                slide.placeholders[1].text = f"Body {i}"
+                table = slide.shapes.add_table(1, 2, Inches(1), Inches(4), Inches(4), Inches(1)).table
+                table.cell(0, 0).text = 'Price'
+                table.cell(0, 1).text = str(i)
+            group = slide.shapes.add_group_shape()
+            group.shapes.add_textbox(Inches(5), Inches(5), Inches(2), Inches(1)).text_frame.text = 'Grouped'
+            prs.save(path)
+
+            converter = PPTXConverter()
+            doc = converter.convert(path)
+            parallel = PPTXConverter(jobs=2).convert(path)
+            legacy = converter._convert_python_pptx(path)
+
+            def layout(d):
+                return [(b.text, b.page, round(b.x, 3), round(b.y, 3), round(b.width, 3),
+                         b.metadata.get('type'), b.metadata.get('shape_type')) for b in d.blocks]
+
+            self.assertEqual(layout(doc), layout(parallel))
+            self.assertEqual(layout(doc)[:-1], layout(legacy))
+            self.assertEqual(doc.page_count, 20)
+            self.assertIn("=== Slide 20 ===\nTitle 19\nBody 19\nPrice | 19\nGrouped\n", doc.full_text)
+            title = doc.blocks[1]
+            self.assertEqual(title.metadata['shape_type'], 'PLACEHOLDER')
+            self.assertGreater(title.width, 0)
+            self.assertEqual((doc.blocks[-1].x, doc.blocks[-1].y), (5, 5))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
 
 class TestPDFConverter(unittest.TestCase):
     """Tests for PDF converter (optional)."""
@@ -225,6 +834,179 @@ class TestPDFConverter(unittest.TestCase):
         except (ImportError, RuntimeError) as e:
             self.skipTest(f"PDF converter not available: {e}")
 
+    def test_pdf_single_pass_blocks(self):
+        """Test blocks carry real bounding boxes and match full_text lines."""
+        path = os.path.join(FIXTURES_DIR, 'pdf', 'new.pdf')
+        if not os.path.exists(path):
+            self.skipTest("PDF fixture not generated")
+
+        try:
+            from converters import PDFConverter
+            doc = PDFConverter().convert(path)
+        except (ImportError, RuntimeError) as e:
+            self.skipTest(f"PDF converter not available: {e}")
+
+        self.assertEqual(doc.page_count, 1)
+        self.assertEqual([b.text for b in doc.blocks], doc.full_text.split('\n'))
+        self.assertTrue(all(b.width > 0 and b.height > 0 for b in doc.blocks))
+
+    def test_page_ranges_cover_document(self):
+        """Test page chunks are contiguous and cover every page once."""
+        from converters.pdf import _page_ranges
+        ranges = _page_ranges(1000, 4)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], 1000)
+        for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(stop, start)
+
+    def test_parallel_matches_serial(self):
+        """Test parallel extraction merges pages in order."""
+        try:
+            import pymupdf
+        except ImportError:
+            self.skipTest("pymupdf not installed")
+        import tempfile
+        from converters import PDFConverter
+
+        pdf = pymupdf.open()
+        for i in range(40):
+            pdf.new_page().insert_text((72, 72), f"Page {i} content")
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+            path = f.name
+        pdf.save(path)
+        try:
+            serial = PDFConverter().convert(path)
+            parallel = PDFConverter(jobs=3).convert(path)
+            self.assertEqual(parallel.page_count, 40)
+            self.assertEqual(parallel.to_dict(), serial.to_dict())
+        finally:
+            os.unlink(path)
+
+    def test_cached_extraction_keeps_jobs_and_backend(self):
+        """Test a page cache still extracts in parallel with the chosen backend."""
+        try:
+            import pymupdf
+        except ImportError:
+            self.skipTest("pymupdf not installed")
+        import tempfile
+        from converters import PDFConverter, MemoryCache
+
+        pdf = pymupdf.open()
+        for i in range(40):
+            pdf.new_page().insert_text((72, 72), f"Page {i} content")
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+            path = f.name
+        pdf.save(path)
+        try:
+            converter = PDFConverter(jobs=3, cache=MemoryCache())
+            converter._backend = lambda: 'pdftotext'
+            ranges = []
+
+            def fake_pdftotext(file_path, first_page=None, last_page=None):
+                ranges.append((first_page, last_page))
+                return iter([[TextBlock(text=f"pdftotext {n}", page=n)]
+                             for n in range(first_page - 1, last_page)])
+            converter._pages_pdftotext = fake_pdftotext
+
+            doc = converter.convert(path)
+            self.assertEqual(doc.metadata['backend'], 'pdftotext')
+            self.assertEqual(doc.page_count, 40)
+            self.assertEqual(doc.full_text.split('\n'), [f"pdftotext {n}" for n in range(40)])
+            self.assertGreater(len(ranges), 1)
+            self.assertEqual(sorted(ranges)[0][0], 1)
+            self.assertEqual(max(last for _, last in ranges), 40)
+
+            ranges.clear()
+            self.assertEqual(converter.convert(path).to_dict(), doc.to_dict())
+            self.assertEqual(ranges, [])
+        finally:
+            os.unlink(path)
+
+    def test_incremental_extracts_changed_pages_only(self):
+        """Test pages with cached content digests are not re-extracted."""
+        try:
+            import pymupdf
+        except ImportError:
+            self.skipTest("pymupdf not installed")
+        import shutil
+        import tempfile
+        from converters import PDFConverter, ConversionCache
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            pdf = pymupdf.open()
+            for i in range(10):
+                pdf.new_page().insert_text((72, 72), f"Page {i} content")
+            old_path = os.path.join(tmp_dir, 'old.pdf')
+            pdf.save(old_path)
+            pdf[3].insert_text((72, 144), "Revised")
+            new_path = os.path.join(tmp_dir, 'new.pdf')
+            pdf.save(new_path)
+
+            converter = PDFConverter(cache=ConversionCache(os.path.join(tmp_dir, 'cache')))
+            converter.convert(old_path)
+
+            extracted = []
+            original = PDFConverter._page_blocks
+            def tracking(page, page_num, flags):
+                extracted.append(page_num)
+                return original(page, page_num, flags)
+            converter._page_blocks = tracking
+
+            doc = converter.convert(new_path)
+            self.assertEqual(extracted, [3])
+            self.assertEqual(doc.to_dict(), PDFConverter().convert(new_path).to_dict())
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_page_digest_covers_fonts(self):
+        """Test a changed ToUnicode map changes the page digest of an unchanged content stream."""
+        try:
+            import pymupdf
+        except ImportError:
+            self.skipTest("pymupdf not installed")
+        from converters import PDFConverter
+
+        def digest(cmap):
+            pdf = pymupdf.open()
+            page = pdf.new_page()
+            page.insert_text((72, 72), "Hello")
+            font = page.get_fonts()[0][0]
+            to_unicode = pdf.get_new_xref()
+            pdf.update_object(to_unicode, "<<>>")
+            pdf.update_stream(to_unicode, cmap)
+            pdf.xref_set_key(font, "ToUnicode", f"{to_unicode} 0 R")
+            return PDFConverter._page_digest(pdf, pdf[0], {})
+
+        self.assertEqual(digest(b"map A"), digest(b"map A"))
+        self.assertNotEqual(digest(b"map A"), digest(b"map B"))
+
+    def test_incremental_page_count_mismatch(self):
+        """Test a backend returning too few pages fails with a clear error."""
+        try:
+            import pymupdf
+        except ImportError:
+            self.skipTest("pymupdf not installed")
+        import shutil
+        import tempfile
+        from converters import PDFConverter
+        from converters.cache import MemoryCache
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            pdf = pymupdf.open()
+            for i in range(3):
+                pdf.new_page().insert_text((72, 72), f"Page {i}")
+            path = os.path.join(tmp_dir, 'doc.pdf')
+            pdf.save(path)
+
+            converter = PDFConverter(cache=MemoryCache())
+            converter._extract = lambda file_path, backend, spans: iter([[], []])
+            with self.assertRaisesRegex(RuntimeError, 'fewer pages than the 3'):
+                converter.convert(path)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
 
 class TestImageConverter(unittest.TestCase):
     """Tests for image converter (optional)."""
@@ -243,6 +1025,203 @@ class TestImageConverter(unittest.TestCase):
         except (ImportError, RuntimeError) as e:
             self.skipTest(f"Image converter not available: {e}")
 
+    def test_ocr_words_grouped_into_lines(self):
+        """Test OCR words from any backend are grouped into positioned lines."""
+        from converters import ImageConverter
+        words = [
+            {'text': 'Hello', 'x': 10, 'y': 10, 'width': 40, 'height': 12, 'conf': 95.0},
+            {'text': 'world', 'x': 60, 'y': 12, 'width': 40, 'height': 12, 'conf': 95.0},
+            {'text': 'Next', 'x': 10, 'y': 40, 'width': 30, 'height': 12, 'conf': 90.0},
+        ]
+        blocks, full_text = ImageConverter._group_lines(words)
+        self.assertEqual(full_text, "Hello world\nNext\n")
+        self.assertEqual((blocks[0].x, blocks[0].y, blocks[0].width, blocks[0].height), (10, 10, 90, 14))
+        self.assertEqual(blocks[1].metadata['type'], 'ocr_line')
+
+    def test_reencoded_image_is_near_identical(self):
+        """Test perceptual hashes ignore re-encoding and are cached."""
+        import shutil
+        import tempfile
+        from converters import ImageConverter
+        try:
+            from PIL import Image
+            import numpy as np
+        except ImportError:
+            self.skipTest("NumPy and Pillow are required")
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            old_path = os.path.join(tmp_dir, 'old.png')
+            new_path = os.path.join(tmp_dir, 'new.png')
+            pixels = np.zeros((64, 64, 3), dtype=np.uint8)
+            pixels[16:48, 8:56] = 200
+            Image.fromarray(pixels).save(old_path)
+            Image.fromarray(pixels).save(new_path, compress_level=0)
+
+            cache = ConversionCache(os.path.join(tmp_dir, 'cache'))
+            converter = ImageConverter(cache=cache)
+            self.assertEqual(converter.near_identical(old_path, new_path), 0)
+            self.assertIsNotNone(cache.get(f"image-hash-{file_digest(old_path)}"))
+
+            pixels[16:48, 8:56] = 0
+            pixels[0:32, 0:32] = 255
+            Image.fromarray(pixels).save(new_path)
+            self.assertIsNone(converter.near_identical(old_path, new_path))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_tiled_ocr_reuses_unchanged_tiles(self):
+        """Test only tiles whose pixels changed are OCR'd again."""
+        import shutil
+        import tempfile
+        from converters import ImageConverter
+        try:
+            from PIL import Image
+            import numpy as np
+        except ImportError:
+            self.skipTest("NumPy and Pillow are required")
+
+        class FakeBackend:
+            name = 'fake'
+            calls = 0
+
+            def recognize(self, img):
+                FakeBackend.calls += 1
+                return [{'text': str(int(np.asarray(img).sum())), 'x': 40, 'y': 40,
+                         'width': 20, 'height': 10, 'conf': 90.0}]
+
+            def recognize_many(self, images):
+                return [self.recognize(img) for img in images]
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'page.png')
+            pixels = np.zeros((100, 300), dtype=np.uint8)
+            Image.fromarray(pixels).save(path)
+
+            converter = ImageConverter(cache=ConversionCache(tmp_dir), tile_size=100, tile_overlap=20)
+            converter.ocr_backend = FakeBackend
+            doc = converter.convert(path)
+            self.assertEqual(FakeBackend.calls, 4)
+            self.assertEqual([b.x for b in doc.blocks], [40, 120, 200])
+            self.assertEqual(len(doc.full_text.split()), 4)
+
+            pixels[0:10, 0:10] = 255
+            Image.fromarray(pixels).save(path)
+            doc = converter.convert(path)
+            self.assertEqual(FakeBackend.calls, 5)
+            self.assertEqual(doc.blocks[0].text, str(255 * 100))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_preprocessed_boxes_map_to_original(self):
+        """Test OCR boxes from a downscaled, cropped image use original coordinates."""
+        import shutil
+        import tempfile
+        from converters import ImageConverter
+        from converters.ocr import PreprocessOptions
+        try:
+            from PIL import Image
+        except ImportError:
+            self.skipTest("Pillow is required")
+
+        seen = []
+
+        class FakeBackend:
+            name = 'fake'
+
+            def recognize(self, img):
+                seen.append((img.size, img.mode))
+                return [{'text': 'word', 'x': 10, 'y': 10, 'width': 20, 'height': 10, 'conf': 90.0}]
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'scan.png')
+            Image.new('RGB', (400, 200), 'white').save(path, dpi=(600, 600))
+
+            converter = ImageConverter(preprocess=PreprocessOptions(dpi=300, roi=(50, 0, 200, 200)))
+            converter.ocr_backend = FakeBackend
+            block = converter.convert(path).blocks[0]
+
+            self.assertEqual(seen, [((100, 100), 'L')])
+            self.assertEqual((block.x, block.y, block.width, block.height), (70, 20, 40, 20))
+
+            # By default a 300-dpi scan is reduced; scale shrinks images without a DPI.
+            from converters.ocr import prepare_image
+            Image.new('RGB', (600, 300), 'white').save(path, dpi=(300, 300))
+            with Image.open(path) as img:
+                self.assertEqual(prepare_image(img, PreprocessOptions())[0].size, (400, 200))
+            Image.new('RGB', (600, 300), 'white').save(path)
+            with Image.open(path) as img:
+                work, scales = prepare_image(img, PreprocessOptions(scale=0.5))
+                self.assertEqual((work.size, scales), ((300, 150), (0.5, 0.5, 0, 0)))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_multi_frame_tiff(self):
+        """Test every TIFF frame is converted once, mapped to its page."""
+        import shutil
+        import tempfile
+        from converters import ImageConverter
+        try:
+            from PIL import Image, ImageDraw
+        except ImportError:
+            self.skipTest("Pillow is required")
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            frames = []
+            for i in range(4):
+                frame = Image.new('L', (80, 40), 255)
+                ImageDraw.Draw(frame).rectangle([i * 10, 5, i * 10 + 8, 15], fill=0)
+                frames.append(frame)
+            frames.append(frames[0].copy())
+            path = os.path.join(tmp_dir, 'fax.tiff')
+            frames[0].save(path, save_all=True, append_images=frames[1:])
+
+            converter = ImageConverter(use_ocr=False, cache=ConversionCache(os.path.join(tmp_dir, 'cache')))
+            converted = []
+            convert_frame = converter._convert_frame
+            converter._convert_frame = lambda img, page, use_ocr: converted.append(page) or convert_frame(img, page, use_ocr)
+
+            doc = converter.convert(path)
+            self.assertEqual(doc.page_count, 5)
+            self.assertEqual(len(converted), 4)
+            headers = [b for b in doc.blocks if b.metadata.get('type') == 'frame_header']
+            self.assertEqual([b.text for b in headers][-1], '=== Frame 5 ===')
+            self.assertEqual(headers[0].metadata['frame_hash'], headers[4].metadata['frame_hash'])
+            self.assertEqual(sorted({b.page for b in doc.blocks}), [0, 1, 2, 3, 4])
+
+            converter.convert(path)
+            self.assertEqual(len(converted), 4)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_ocr_backend_is_reused(self):
+        """Test the OCR backend is created once and shared across conversions."""
+        from converters.ocr import get_ocr_backend
+        try:
+            backend = get_ocr_backend(jobs=2)
+        except ImportError as e:
+            self.skipTest(f"No OCR backend available: {e}")
+        self.assertIs(get_ocr_backend(jobs=2), backend)
+
+    def test_ocr_backend_is_abstract(self):
+        """Test backends must implement recognize and inherit batching."""
+        from converters.ocr import OCRBackend
+        with self.assertRaises(TypeError):
+            OCRBackend()
+
+        class EchoBackend(OCRBackend):
+            def recognize(self, img):
+                return [{'text': img}]
+
+        backend = EchoBackend(jobs=2)
+        try:
+            self.assertEqual(backend.recognize_many(['a', 'b']), [[{'text': 'a'}], [{'text': 'b'}]])
+        finally:
+            backend.close()
+
 
 if __name__ == '__main__':
     unittest.main()
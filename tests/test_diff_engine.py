@@ -2,12 +2,14 @@
 
 import os
 import sys
+import shutil
+import tempfile
 import unittest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from converters import get_converter
-from converters.base import ConvertedDocument
+from converters.base import ConvertedDocument, TextBlock
 from diff import DiffEngine, DiffResult, DiffHunk, DiffType
 
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
@@ -182,6 +184,285 @@ class TestDiffEngine(unittest.TestCase):
         self.assertEqual(data['new_text'], 'new')
 
 
+class TestPixelDiff(unittest.TestCase):
+    """Tests for pixel-level image comparison."""
+
+    def setUp(self):
+        try:
+            import numpy as np
+            from PIL import Image
+        except ImportError:
+            self.skipTest("NumPy and Pillow are required")
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.engine = DiffEngine()
+
+    def _image_doc(self, name, pixels):
+        from PIL import Image
+        path = os.path.join(self.tmp_dir, name)
+        Image.fromarray(pixels).save(path)
+        return get_converter(path).convert(path, use_ocr=False)
+
+    def test_changed_regions_reported(self):
+        """Test each separate change becomes one region with its bbox."""
+        import numpy as np
+        old = np.full((120, 200, 3), 255, dtype=np.uint8)
+        new = old.copy()
+        new[10:20, 30:70] = 0
+        new[90:100, 150:160] = (255, 0, 0)
+
+        result = self.engine.diff_pixels(self._image_doc('old.png', old), self._image_doc('new.png', new))
+        regions = [h.metadata for h in result.changes_only]
+
+        self.assertEqual([r['bbox'] for r in regions], [[30, 10, 40, 10], [150, 90, 10, 10]])
+        self.assertEqual(regions[0]['changed_ratio'], 1.0)
+        self.assertAlmostEqual(result.similarity_ratio, 1 - 500 / 24000)
+
+    def test_shifted_image_is_aligned(self):
+        """Test a shifted screenshot only reports the real change after alignment."""
+        import numpy as np
+        rng = np.random.default_rng(0)
+        old = np.full((300, 400, 3), 255, dtype=np.uint8)
+        for _ in range(40):
+            y, x = rng.integers(0, 280), rng.integers(0, 380)
+            old[y:y + 15, x:x + 15] = rng.integers(0, 200, 3)
+        new = np.full_like(old, 255)
+        new[3:, 5:] = old[:-3, :-5]
+        new[200:220, 100:140] = (255, 0, 0)
+
+        old_doc = self._image_doc('old.png', old)
+        new_doc = self._image_doc('new.png', new)
+        result = self.engine.diff_pixels(old_doc, new_doc)
+        regions = [h.metadata for h in result.changes_only if h.metadata.get('type') == 'pixel_region']
+
+        self.assertIn('shift (5, 3)', result.new_doc.full_text)
+        self.assertEqual(len(regions), 1)
+        self.assertGreater(len(self.engine.diff_pixels(old_doc, new_doc, align=False).changes_only), 10)
+
+    def test_identical_pixels(self):
+        """Test small encoding noise below the threshold is ignored."""
+        import numpy as np
+        old = np.full((50, 50, 3), 128, dtype=np.uint8)
+        new = old + 3
+
+        result = self.engine.diff_pixels(self._image_doc('old.png', old), self._image_doc('new.png', new))
+
+        self.assertFalse(result.has_changes)
+        self.assertEqual(result.similarity_ratio, 1.0)
+
+
+class TestPageDiff(unittest.TestCase):
+    """Tests for page-aligned diff."""
+
+    def setUp(self):
+        self.engine = DiffEngine()
+
+    def _doc(self, pages):
+        blocks = [TextBlock(text=line, page=page) for page, lines in enumerate(pages) for line in lines]
+        return ConvertedDocument(blocks=blocks, page_count=len(pages),
+                                 full_text='\n'.join(b.text for b in blocks))
+
+    def test_changes_stay_on_their_page(self):
+        """Test lines are matched only against the page at the same index."""
+        old_doc = self._doc([['Title', 'Intro'], ['Body', 'Footer']])
+        new_doc = self._doc([['Title', 'Body'], ['Body', 'Footer'], ['Appendix']])
+
+        result = self.engine.diff_pages(old_doc, new_doc)
+        changes = [(h.diff_type, h.new_text, h.metadata.get('page')) for h in result.changes_only]
+
+        self.assertEqual(changes, [
+            (DiffType.REPLACE, 'Body', 0),
+            (DiffType.INSERT, '=== Page 3 ===', 2),
+            (DiffType.INSERT, 'Appendix', 2),
+        ])
+        self.assertEqual(result.stats['unchanged'], 3)
+
+    def test_multi_frame_pixel_diff(self):
+        """Test only frames with different pixels are compared."""
+        try:
+            from PIL import Image, ImageDraw
+        except ImportError:
+            self.skipTest("Pillow is required")
+        from converters import ImageConverter
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        frames = [Image.new('L', (60, 40), 255) for _ in range(3)]
+        old_path = os.path.join(tmp_dir, 'old.tiff')
+        frames[0].save(old_path, save_all=True, append_images=frames[1:])
+        ImageDraw.Draw(frames[1]).rectangle([10, 10, 19, 19], fill=0)
+        new_path = os.path.join(tmp_dir, 'new.tiff')
+        frames[0].save(new_path, save_all=True, append_images=frames[1:])
+
+        converter = ImageConverter(use_ocr=False)
+        result = self.engine.diff_pixels(converter.convert(old_path), converter.convert(new_path))
+        regions = [h.metadata for h in result.changes_only]
+
+        self.assertEqual(len(regions), 1)
+        self.assertEqual((regions[0]['page'], regions[0]['bbox']), (1, [10, 10, 10, 10]))
+
+
+class TestTableDiff(unittest.TestCase):
+    """Tests for cell-by-cell table comparison."""
+
+    def setUp(self):
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest("NumPy is required")
+        self.engine = DiffEngine()
+
+    def _tables(self, rows):
+        return [('Data', enumerate(rows, start=1))]
+
+    def _diff(self, old_rows, new_rows, **tolerance):
+        doc = ConvertedDocument(blocks=[], full_text='', source_type='xlsx')
+        return self.engine.diff_tables(doc, doc, self._tables(old_rows), self._tables(new_rows),
+                                       **tolerance)
+
+    def test_float_noise_is_ignored(self):
+        """Test numbers within tolerance are equal and only real changes are reported."""
+        old_rows = [('id', 'value', 'label'), (1, 0.1 + 0.2, 'a'), (2, 5, 'b'), (3, None, 'c')]
+        new_rows = [('id', 'value', 'label'), ('1', '0.3', 'a'), (2, 5.5, 'B'), (3, '', 'c')]
+
+        result = self._diff(old_rows, new_rows)
+        cells = [(h.metadata['row'], h.metadata['column'], h.new_text) for h in result.changes_only]
+
+        self.assertEqual(cells, [(3, 'value', 'Row 3, value: 5.5'), (3, 'label', 'Row 3, label: B')])
+        self.assertEqual(result.stats['unchanged'], 7)
+
+        result = self._diff(old_rows, new_rows, atol=1)
+        self.assertEqual([h.metadata['column'] for h in result.changes_only], ['label'])
+
+    def test_columns_and_rows_added(self):
+        """Test columns are matched by header and extra rows are reported whole."""
+        result = self._diff([('a', 'b'), (1, 2)], [('b', 'c', 'a'), (2, 9, 1), (4, 5, 6)])
+        changes = [(h.diff_type, h.metadata['type'], h.new_text) for h in result.changes_only]
+
+        self.assertEqual(changes, [
+            (DiffType.REPLACE, 'table', '[Table: 2 rows x 3 columns]'),
+            (DiffType.INSERT, 'column', 'Column c'),
+            (DiffType.INSERT, 'row', 'Row 3: 4 | 5 | 6'),
+        ])
+
+
+class TestKeyedDiff(unittest.TestCase):
+    """Tests for key-matched row comparison."""
+
+    def _diff(self, old_rows, new_rows, memory_limit):
+        doc = ConvertedDocument(blocks=[], full_text='', source_type='csv')
+        return DiffEngine().diff_keyed(doc, doc, [('', enumerate(old_rows, start=1))],
+                                       [('', enumerate(new_rows, start=1))], ['id'], memory_limit)
+
+    def test_reordered_rows_match_by_key(self):
+        """Test rows are joined by key, both in memory and through spilled runs."""
+        old_rows = [['id', 'name', 'score']] + [[str(i), f'n{i}', str(i * 10)] for i in range(1, 40)]
+        new_rows = [['id', 'score', 'name']] + [[str(i), str(i * 10), f'n{i}'] for i in range(40, 2, -1)]
+        new_rows[5][1] = '0'
+
+        for memory_limit in (1024 * 1024, 2048):
+            result = self._diff(old_rows, new_rows, memory_limit)
+            changes = [(h.diff_type, h.metadata['key'], h.metadata.get('changed_columns'))
+                       for h in result.changes_only]
+
+            self.assertEqual(changes, [
+                (DiffType.DELETE, ['1'], None),
+                (DiffType.DELETE, ['2'], None),
+                (DiffType.REPLACE, ['36'], ['score']),
+                (DiffType.INSERT, ['40'], None),
+            ])
+            self.assertEqual(result.stats['unchanged'], 36)
+
+    def test_missing_key_column(self):
+        """Test a table without the key column is reported by name, not by index."""
+        rows = [['id', 'name'], ['1', 'a']]
+        doc = ConvertedDocument(blocks=[], full_text='', source_type='csv')
+        with self.assertRaisesRegex(RuntimeError, 'Key column age not found'):
+            DiffEngine().diff_keyed(doc, doc, [('', enumerate(rows, start=1))],
+                                    [('', enumerate(rows, start=1))], ['age'])
+
+        doc = ConvertedDocument(blocks=[], full_text='', source_type='xlsx')
+        sheets = lambda: [('One', enumerate(rows, start=1)),
+                          ('Two', enumerate([['name'], ['a']], start=1))]
+        with self.assertRaisesRegex(RuntimeError, 'Key column id not found in sheet Two'):
+            DiffEngine().diff_keyed(doc, doc, sheets(), sheets(), ['id'])
+
+
+class TestUnorderedDiff(unittest.TestCase):
+    """Tests for order-insensitive line comparison."""
+
+    def test_only_count_changes_are_reported(self):
+        """Test reordered lines are equal and surplus lines are reported with counts."""
+        old_doc = ConvertedDocument(blocks=[], full_text="b\na\na\nc\nd\n")
+        new_doc = ConvertedDocument(blocks=[], full_text="a\nd\nb\ne\ne\ne\n")
+
+        for memory_limit in (1024 * 1024, 0):
+            result = DiffEngine().diff_unordered(old_doc, new_doc, memory_limit=memory_limit)
+            changes = [(h.diff_type, h.old_text or h.new_text, h.metadata['count'])
+                       for h in result.changes_only]
+
+            self.assertEqual(changes, [
+                (DiffType.DELETE, 'a', 1),
+                (DiffType.DELETE, 'c', 1),
+                (DiffType.INSERT, 'e  (\u00d73)', 3),
+            ])
+            self.assertEqual((result.stats['insertions'], result.stats['deletions'],
+                              result.stats['unchanged']), (3, 2, 3))
+
+    def test_line_hashes_are_stable(self):
+        """Test line hashes do not depend on the interpreter's hash seed."""
+        import hashlib
+        from diff.unordered import _chunks
+
+        (chunk, digests), = _chunks(['a', 'café'])
+        expected = [hashlib.blake2b(line.encode('utf-8'), digest_size=8).digest() for line in chunk]
+        self.assertEqual(digests, expected)
+
+
+class TestTreeDiff(unittest.TestCase):
+    """Tests for structural XML/HTML diff."""
+
+    def setUp(self):
+        self.engine = DiffEngine()
+
+    def test_xml_tree_diff(self):
+        """Test changes are reported with XPath locations."""
+        old_path = os.path.join(FIXTURES_DIR, 'text', 'old.xml')
+        new_path = os.path.join(FIXTURES_DIR, 'text', 'new.xml')
+
+        old_doc = get_converter(old_path, tree=True).convert(old_path)
+        new_doc = get_converter(new_path, tree=True).convert(new_path)
+
+        result = self.engine.diff_tree(old_doc, new_doc)
+        xpaths = [h.metadata['xpath'] for h in result.changes_only]
+
+        self.assertIn("/root/item[@id='1']/name[1]", xpaths)
+        self.assertIn("/root/item[@id='3']", xpaths)
+        self.assertNotIn("/root/item[@id='2']", xpaths)
+
+    def test_unchanged_subtree_is_single_hunk(self):
+        """Test identical trees collapse to one equal hunk."""
+        path = os.path.join(FIXTURES_DIR, 'text', 'old.html')
+        doc = get_converter(path, tree=True).convert(path)
+
+        result = self.engine.diff_tree(doc, doc)
+
+        self.assertEqual(len(result.hunks), 1)
+        self.assertEqual(result.hunks[0].diff_type, DiffType.EQUAL)
+        self.assertEqual(result.similarity_ratio, 1.0)
+
+    def test_tree_diff_falls_back_for_text(self):
+        """Test non-tree documents use the line diff."""
+        old_path = os.path.join(FIXTURES_DIR, 'text', 'old.xml')
+        new_path = os.path.join(FIXTURES_DIR, 'text', 'new.xml')
+
+        old_doc = get_converter(old_path).convert(old_path)
+        new_doc = get_converter(new_path).convert(new_path)
+
+        result = self.engine.diff_tree(old_doc, new_doc)
+        self.assertTrue(result.has_changes)
+
+
 class TestDiffEngineWithDifferentFileTypes(unittest.TestCase):
     """Test diff engine with various file types."""
 